@@ -0,0 +1,372 @@
+"""
+Billion Transformation Tracker - asyncio API
+Accept many concurrent submissions (e.g. from a web front end) safely
+
+DuckDB allows one writer at a time, so every write goes through one queue
+and is applied by a single writer thread, in arrival order. Reads run on a
+bounded thread pool, each thread with its own cursor on the session, so
+they never block the event loop or the writer.
+
+Submissions waiting in the queue are written together as one multi-row
+upsert (group commit, see billion_tracker.WriteBuffer), so commit cost
+doesn't dominate during submission spikes: with 300 concurrent submitters
+it writes about ten times as many weeks per second as committing each
+one. Grouped submissions take the same values as per-row ones (e.g.
+week_number=2.0 from JSON; check_write_paths.py compares the two).
+group_commit=False commits every submission on its own.
+
+Usage:
+    async with AsyncTracker() as tracker:
+        await tracker.submit(week_number=3, total_hours_worked=48.0, ...)
+        df = await tracker.metrics_df()
+
+    python billion_async.py --submitters 2000                      # measure throughput
+    python billion_async.py --submitters 2000 --no-group-commit    # one commit per submission
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Threads serving reads concurrently
+DEFAULT_READ_WORKERS = 4
+
+# Submissions waiting for the writer before submit() waits for room
+DEFAULT_MAX_PENDING = 10_000
+
+class AsyncTrackerStats(NamedTuple):
+    """Write throughput of an AsyncTracker since it started"""
+    submitted: int
+    written: int
+    failed: int
+    pending: int
+    seconds: float
+    writes_per_second: float
+
+_STOP = object()
+
+# ============================================================================
+# ASYNC TRACKER
+# ============================================================================
+
+class AsyncTracker:
+    """
+    asyncio facade over a TrackerSession with a single-writer queue
+
+    Works on the default session (DB_PATH) unless a session is given.
+    Writes are applied in the order they were awaited; a submission whose
+    caller is cancelled is still written once queued.
+
+    Consecutive queued submissions (up to `max_batch`) are committed
+    together unless `group_commit` is False; `max_delay` (seconds)
+    optionally waits for more to arrive before writing a group. Each
+    submission still fails or succeeds on its own.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        read_workers=DEFAULT_READ_WORKERS,
+        max_pending=DEFAULT_MAX_PENDING,
+        group_commit=True,
+        max_batch=tracker.WRITE_BUFFER_MAX_ROWS,
+        max_delay=0.0
+    ):
+        self.session = session or tracker.get_session()
+        self.read_workers = read_workers
+        self.max_pending = max_pending
+        self.group_commit = group_commit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._queue = None
+        self._writer_task = None
+        self._writer = None
+        self._readers = None
+        self._closed = False
+
+        self._submitted = 0
+        self._written = 0
+        self._failed = 0
+        self._first_submit = None
+        self._last_write = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __repr__(self):
+        state = "closed" if self._closed else ("running" if self._writer_task else "idle")
+        return f"AsyncTracker({self.session.db_path!r}, {state}, pending={self.pending})"
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the writer task and the thread pools (done on first use otherwise)"""
+        if self._closed:
+            raise RuntimeError("AsyncTracker is closed")
+        if self._writer_task is not None:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="billion-writer")
+        self._readers = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="billion-reader")
+        self._writer_task = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def close(self):
+        """Apply every queued submission, then stop the writer and the pools"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._writer_task is not None:
+            await self._queue.put(_STOP)
+            await self._writer_task
+
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._writer.shutdown)
+            await loop.run_in_executor(None, self._readers.shutdown)
+
+    def stats(self):
+        """Submissions so far and the write throughput since the first one"""
+        seconds = 0.0
+        if self._first_submit is not None and self._last_write is not None:
+            seconds = self._last_write - self._first_submit
+        done = self._written + self._failed
+        return AsyncTrackerStats(
+            submitted=self._submitted,
+            written=self._written,
+            failed=self._failed,
+            pending=self._submitted - done,
+            seconds=seconds,
+            writes_per_second=done / seconds if seconds > 0 else 0.0,
+        )
+
+    # ------------------------------------------------------------------------
+    # Writes (single writer)
+    # ------------------------------------------------------------------------
+
+    async def _enqueue(self, write):
+        """Queue a write (a callable, or a submission dict) and wait for it"""
+        if self._closed:
+            raise RuntimeError("AsyncTracker is closed")
+        await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self._submitted += 1
+        if self._first_submit is None:
+            self._first_submit = time.perf_counter()
+
+        await self._queue.put((write, future))
+        return await future
+
+    def _resolve(self, future, result=None, error=None):
+        if error is None:
+            self._written += 1
+            if not future.done():
+                future.set_result(result)
+        else:
+            self._failed += 1
+            if not future.done():
+                future.set_exception(error)
+
+    def _drain_submissions(self, group):
+        """Move queued submissions into `group`; returns the first other item met"""
+        while len(group) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return None
+            if item is _STOP or not isinstance(item[0], dict):
+                return item
+            group.append(item)
+        return None
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        held = None
+
+        while True:
+            item, held = held or await self._queue.get(), None
+            if item is _STOP:
+                return
+
+            write, future = item
+            if isinstance(write, dict):
+                group = [item]
+                held = self._drain_submissions(group)
+                if held is None and self.max_delay > 0 and len(group) < self.max_batch:
+                    await asyncio.sleep(self.max_delay)
+                    held = self._drain_submissions(group)
+
+                try:
+                    errors = await loop.run_in_executor(
+                        self._writer, tracker._write_submission_group, self.session, [w for w, _ in group]
+                    )
+                except Exception as exc:
+                    errors = [exc] * len(group)
+                for (_, group_future), error in zip(group, errors):
+                    self._resolve(group_future, error=error)
+            else:
+                try:
+                    result = await loop.run_in_executor(self._writer, write)
+                except Exception as exc:
+                    self._resolve(future, error=exc)
+                else:
+                    self._resolve(future, result)
+            self._last_write = time.perf_counter()
+
+    async def submit(
+        self,
+        week_number,
+        total_hours_worked,
+        automated_hours,
+        active_clients,
+        revenue_ratio_to_baseline,
+        recurring_revenue_percentage,
+        what_i_automated_this_week,
+        biggest_bottleneck_now,
+        operator_id=tracker.DEFAULT_OPERATOR_ID
+    ):
+        """Queue one week of metrics and wait until it is stored (see submit_weekly_metrics)"""
+        if self.group_commit:
+            return await self._enqueue({
+                "operator_id": operator_id,
+                "week_number": week_number,
+                "total_hours_worked": total_hours_worked,
+                "automated_hours": automated_hours,
+                "active_clients": active_clients,
+                "revenue_ratio_to_baseline": revenue_ratio_to_baseline,
+                "recurring_revenue_percentage": recurring_revenue_percentage,
+                "what_i_automated_this_week": what_i_automated_this_week,
+                "biggest_bottleneck_now": biggest_bottleneck_now,
+            })
+
+        return await self._enqueue(functools.partial(
+            self.session.submit_weekly_metrics,
+            week_number,
+            total_hours_worked,
+            automated_hours,
+            active_clients,
+            revenue_ratio_to_baseline,
+            recurring_revenue_percentage,
+            what_i_automated_this_week,
+            biggest_bottleneck_now,
+            operator_id=operator_id,
+        ))
+
+    async def submit_batch(self, submissions, operator_id=tracker.DEFAULT_OPERATOR_ID):
+        """Queue many weeks as one write (see submit_weekly_metrics_batch)"""
+        return await self._enqueue(functools.partial(
+            self.session.submit_weekly_metrics_batch, submissions, operator_id
+        ))
+
+    async def recompute_derived_metrics(self, operator_ids=None):
+        return await self._enqueue(functools.partial(self.session.recompute_derived_metrics, operator_ids))
+
+    # ------------------------------------------------------------------------
+    # Reads (bounded thread pool)
+    # ------------------------------------------------------------------------
+
+    async def run_read(self, fn, *args, **kwargs):
+        """
+        Run a blocking read on the read pool
+
+        For anything without an async method here, e.g.
+        `await tracker.run_read(build_transformation_report, "alice")`.
+        """
+        if self._closed:
+            raise RuntimeError("AsyncTracker is closed")
+        await self.start()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers, functools.partial(fn, *args, **kwargs)
+        )
+
+    async def metrics_df(self, operator_id=tracker.DEFAULT_OPERATOR_ID):
+        """One operator's metrics as a Polars DataFrame"""
+        return await self.run_read(self.session.get_metrics_df, operator_id)
+
+    async def cohort_metrics_df(self):
+        return await self.run_read(self.session.get_cohort_metrics_df)
+
+    async def operator_ids(self):
+        return await self.run_read(self.session.get_operator_ids)
+
+# ============================================================================
+# THROUGHPUT CHECK
+# ============================================================================
+
+async def measure_submit_throughput(submitters=2000, weeks=10, readers=50, seed=42, group_commit=True):
+    """
+    Fire `submitters` concurrent submissions (plus concurrent readers)
+    at the current DB_PATH and report throughput
+
+    Submissions come from the synthetic cohort generator in billion_bench.
+    Returns the AsyncTrackerStats.
+    """
+    import contextlib
+    import io
+
+    from billion_bench import synthetic_rows
+
+    rows = synthetic_rows(submitters, weeks, seed)
+    submissions = rows.to_dicts()
+    operators = rows["operator_id"].unique().to_list()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker.init_database()
+
+    async with AsyncTracker(group_commit=group_commit) as async_tracker:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await asyncio.gather(
+                *(async_tracker.submit(**submission) for submission in submissions),
+                *(async_tracker.metrics_df(operators[i % len(operators)]) for i in range(readers)),
+            )
+        stats = async_tracker.stats()
+        stored = (await async_tracker.cohort_metrics_df()).height
+
+    print(f"✅ {stats.written} of {stats.submitted} concurrent submission(s) stored "
+          f"({stored} rows in the table, {stats.failed} failed)")
+    mode = "group commit" if group_commit else "one commit per submission"
+    print(f"⚡ {stats.writes_per_second:.1f} writes/second through the single writer ({mode})")
+    return stats
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Measure concurrent submission throughput")
+    parser.add_argument("--submitters", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--no-group-commit", dest="group_commit", action="store_false",
+                        help="commit every submission on its own")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker.DB_PATH = str(Path(tmp) / "async_throughput.db")
+        asyncio.run(measure_submit_throughput(
+            args.submitters, readers=args.readers, group_commit=args.group_commit
+        ))
+        tracker.close_session()
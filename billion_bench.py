@@ -0,0 +1,375 @@
+"""
+Billion Transformation Tracker - Benchmark Suite
+Measure how the tracker scales from one week to a whole cohort
+
+Generates a seeded synthetic cohort (N operators x M weeks), loads it into a
+throwaway database and times the public functions at several table sizes.
+Results are written as JSON and can be compared with a stored baseline.
+
+Usage:
+    python billion_bench.py                              # 1, 1k and 100k rows
+    python billion_bench.py --save-baseline              # store bench_baseline.json
+    python billion_bench.py --baseline bench_baseline.json
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import plotly.io as pio
+from plotly.io.base_renderers import ExternalRenderer
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_SIZES = [1, 1_000, 100_000]
+DEFAULT_WEEKS = 12
+DEFAULT_SEED = 42
+DEFAULT_REPEATS = 5
+
+RESULTS_PATH = "bench_results.json"
+BASELINE_PATH = "bench_baseline.json"
+
+# A benchmark regresses when its median is this much slower than the
+# baseline (relative) and by more than MIN_REGRESSION_SECONDS (timer noise)
+REGRESSION_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.002
+
+AUTOMATIONS = [
+    "Email filtering with labels",
+    "Automated meeting notes with Otter.ai",
+    "Client onboarding workflow in N8N",
+    "Invoice generation from time tracking",
+    "Weekly client reports from templates",
+    "Lead qualification with an AI agent",
+    "Social media scheduling pipeline",
+    "Proposal drafts from discovery call notes",
+    "Support inbox triage and auto-replies",
+    "CRM updates from form submissions",
+]
+
+BOTTLENECKS = [
+    "Manual client onboarding taking 4+ hours per client",
+    "Custom reporting for each client",
+    "Chasing invoices and payments",
+    "Scoping calls that don't convert",
+    "Context switching between too many tools",
+    "Revisions on deliverables",
+    "Hiring and training a first contractor",
+    "Project-based pricing instead of retainers",
+    "Writing proposals from scratch",
+    "None this week",
+]
+
+# ============================================================================
+# SYNTHETIC COHORT
+# ============================================================================
+
+def generate_synthetic_cohort(operators, weeks=DEFAULT_WEEKS, seed=DEFAULT_SEED):
+    """
+    Seeded synthetic submissions for `operators` x `weeks` rows
+
+    Each operator starts from a random baseline (30-80 hours, 1-7 clients,
+    low automation and recurring revenue) and approaches a personal target
+    at a personal pace, with weekly noise. Returns a Polars DataFrame with
+    operator_id plus the submit_weekly_metrics_batch() columns.
+    """
+    rng = np.random.default_rng(seed)
+    rows = operators * weeks
+
+    operator = np.repeat(np.arange(operators), weeks)
+    week = np.tile(np.arange(1, weeks + 1), operators)
+
+    def per_operator(values):
+        return values[operator]
+
+    # Saturating progress curve, 0 at Week 1
+    pace = per_operator(rng.uniform(0.1, 0.5, operators))
+    progress = 1 - np.exp(-pace * (week - 1))
+
+    baseline_hours = per_operator(np.clip(rng.normal(55, 8, operators), 30, 80))
+    hours_cut = per_operator(rng.uniform(0.05, 0.6, operators))
+    total_hours = np.clip(
+        baseline_hours * (1 - hours_cut * progress) + rng.normal(0, 1.5, rows), 10, 90
+    ).round(1)
+
+    start_share = per_operator(rng.uniform(0.03, 0.15, operators))
+    target_share = per_operator(rng.uniform(0.3, 0.9, operators))
+    automated_share = np.clip(
+        start_share + (target_share - start_share) * progress + rng.normal(0, 0.02, rows), 0, 0.95
+    )
+    automated_hours = (total_hours * automated_share * 2).round() / 2
+
+    baseline_clients = per_operator(rng.integers(1, 8, operators))
+    client_growth = per_operator(rng.uniform(0, 1.5, operators))
+    active_clients = np.maximum(1, np.round(baseline_clients * (1 + client_growth * progress))).astype(np.int64)
+
+    revenue_growth = per_operator(rng.uniform(0, 1.2, operators))
+    revenue_ratio = np.where(
+        week == 1,
+        1.0,
+        np.maximum(0.5, 1 + revenue_growth * progress + rng.normal(0, 0.03, rows)).round(2),
+    )
+
+    start_recurring = per_operator(rng.uniform(5, 30, operators))
+    target_recurring = per_operator(rng.uniform(30, 90, operators))
+    recurring_pct = np.clip(
+        start_recurring + (target_recurring - start_recurring) * progress + rng.normal(0, 2, rows), 0, 100
+    ).round(1)
+
+    automations = np.array(AUTOMATIONS)[rng.integers(0, len(AUTOMATIONS), rows)]
+    bottlenecks = np.array(BOTTLENECKS)[rng.integers(0, len(BOTTLENECKS), rows)]
+
+    return pl.DataFrame({
+        "operator_id": np.char.add("op", np.char.zfill(operator.astype(str), 6)),
+        "week_number": week,
+        "total_hours_worked": total_hours,
+        "automated_hours": automated_hours,
+        "active_clients": active_clients,
+        "revenue_ratio_to_baseline": revenue_ratio,
+        "recurring_revenue_percentage": recurring_pct,
+        "what_i_automated_this_week": automations,
+        "biggest_bottleneck_now": bottlenecks,
+    })
+
+def synthetic_rows(rows, weeks=DEFAULT_WEEKS, seed=DEFAULT_SEED):
+    """A synthetic cohort of exactly `rows` submissions (whole operators first)"""
+    weeks = max(1, min(weeks, rows))
+    return generate_synthetic_cohort(math.ceil(rows / weeks), weeks, seed).head(rows)
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+class _DiscardRenderer(ExternalRenderer):
+    """Serializes figures as a notebook front-end would, without displaying them"""
+
+    def render(self, fig_dict):
+        pio.to_json(fig_dict, validate=False)
+
+pio.renderers["billion_bench"] = _DiscardRenderer()
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the tracker's progress printouts and figure display"""
+    renderer = pio.renderers.default
+    pio.renderers.default = "billion_bench"
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        pio.renderers.default = renderer
+
+def _time_call(fn, repeats, warmup=True):
+    """Run fn() `repeats` times; returns the list of durations in seconds"""
+    with _quiet():
+        if warmup:
+            fn()
+        durations = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - start)
+    return durations
+
+def _result(name, rows, operators, durations):
+    return {
+        "benchmark": name,
+        "rows": rows,
+        "operators": operators,
+        "repeats": len(durations),
+        "min_seconds": min(durations),
+        "median_seconds": statistics.median(durations),
+    }
+
+def benchmark_size(rows, weeks=DEFAULT_WEEKS, seed=DEFAULT_SEED, repeats=DEFAULT_REPEATS):
+    """
+    Time the public functions against a fresh database holding `rows` rows
+
+    The cohort is loaded with submit_weekly_metrics_batch() (timed once);
+    per-operator functions run against the first operator, cohort-wide
+    functions against everyone. Returns a list of result dicts.
+    """
+    cohort = synthetic_rows(rows, weeks, seed)
+    operators = cohort["operator_id"].n_unique()
+    focus = cohort["operator_id"][0]
+    latest = cohort.filter(pl.col("operator_id") == focus).row(-1, named=True)
+    latest.pop("operator_id")
+
+    results = []
+    saved_db_path = tracker.DB_PATH
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker.DB_PATH = str(Path(tmp) / "bench.db")
+        try:
+            with _quiet():
+                tracker.init_database()
+                # First batch in a process pays one-off import/registration costs
+                tracker.submit_weekly_metrics_batch(cohort.head(1))
+
+            load = _time_call(lambda: tracker.submit_weekly_metrics_batch(cohort), 1, warmup=False)
+            results.append(_result("submit_weekly_metrics_batch", rows, operators, load))
+
+            # Re-submitting the latest week is the weekly upsert of a live database
+            per_operator = {
+                "submit_weekly_metrics": lambda: tracker.submit_weekly_metrics(**latest, operator_id=focus),
+                "get_metrics_df": lambda: tracker.get_metrics_df(focus),
+                # Uncached: the result cache is emptied before every call
+                "print_progress_table": lambda: (tracker.clear_result_cache(), tracker.print_progress_table(focus)),
+                "generate_transformation_report": lambda: (
+                    tracker.clear_result_cache(), tracker.generate_transformation_report(focus)
+                ),
+                "create_visualizations": lambda: (tracker.clear_result_cache(), tracker.create_visualizations(focus)),
+                # Repeated calls with nothing submitted in between (dashboard polling)
+                "print_progress_table_cached": lambda: tracker.print_progress_table(focus),
+                "generate_transformation_report_cached": lambda: tracker.generate_transformation_report(focus),
+                "create_visualizations_cached": lambda: tracker.create_visualizations(focus),
+            }
+            cohort_wide = {
+                "get_cohort_metrics_df": tracker.get_cohort_metrics_df,
+                "scan_graduation_readiness": tracker.scan_graduation_readiness,
+                "build_transformation_reports": tracker.build_transformation_reports,
+            }
+
+            for name, fn in {**per_operator, **cohort_wide}.items():
+                results.append(_result(name, rows, operators, _time_call(fn, repeats)))
+        finally:
+            tracker.close_session()
+            tracker.DB_PATH = saved_db_path
+
+    return results
+
+def _package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+def run_benchmarks(sizes=None, weeks=DEFAULT_WEEKS, seed=DEFAULT_SEED, repeats=DEFAULT_REPEATS):
+    """Benchmark every size; returns {"meta": ..., "results": [...]}"""
+    sizes = list(sizes or DEFAULT_SIZES)
+    results = []
+
+    for rows in sizes:
+        print(f"⏱️  Benchmarking {rows:,} row(s)...")
+        results.extend(benchmark_size(rows, weeks, seed, repeats))
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "packages": {name: _package_version(name) for name in ("duckdb", "polars", "plotly", "numpy")},
+            "sizes": sizes,
+            "weeks": weeks,
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+# ============================================================================
+# RESULTS & BASELINE COMPARISON
+# ============================================================================
+
+def save_results(run, path=RESULTS_PATH):
+    Path(path).write_text(json.dumps(run, indent=2) + "\n")
+    print(f"✅ Benchmark results saved to '{path}'")
+
+def load_results(path):
+    return json.loads(Path(path).read_text())
+
+def compare_to_baseline(run, baseline, tolerance=REGRESSION_TOLERANCE, min_seconds=MIN_REGRESSION_SECONDS):
+    """
+    Compare median timings with a baseline run (dict or JSON path)
+
+    Prints one line per benchmark found in both runs and returns the
+    regressions as a list of dicts (benchmark, rows, baseline, current, ratio).
+    """
+    if not isinstance(baseline, dict):
+        baseline = load_results(baseline)
+
+    previous = {(r["benchmark"], r["rows"]): r["median_seconds"] for r in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'Benchmark':<38} {'Rows':>9} {'Baseline':>11} {'Current':>11} {'Change':>8}")
+    for r in run["results"]:
+        before = previous.get((r["benchmark"], r["rows"]))
+        if before is None:
+            continue
+
+        now = r["median_seconds"]
+        ratio = now / before if before > 0 else math.inf
+        regressed = ratio > 1 + tolerance and now - before > min_seconds
+        flag = "🐢" if regressed else ("⚡" if ratio < 1 - tolerance else "  ")
+
+        print(f"{r['benchmark']:<38} {r['rows']:>9,} {before * 1000:>9.2f}ms {now * 1000:>9.2f}ms "
+              f"{(ratio - 1) * 100:>+7.0f}% {flag}")
+
+        if regressed:
+            regressions.append({
+                "benchmark": r["benchmark"],
+                "rows": r["rows"],
+                "baseline_seconds": before,
+                "current_seconds": now,
+                "ratio": ratio,
+            })
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {tolerance:.0%} of the baseline")
+    else:
+        print("\n✅ No regressions against the baseline")
+    return regressions
+
+def print_results(run):
+    print(f"\n{'Benchmark':<38} {'Rows':>9} {'Min':>11} {'Median':>11}")
+    for r in run["results"]:
+        print(f"{r['benchmark']:<38} {r['rows']:>9,} "
+              f"{r['min_seconds'] * 1000:>9.2f}ms {r['median_seconds'] * 1000:>9.2f}ms")
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="table sizes (rows) to benchmark")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS, help="weeks per operator")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--output", default=RESULTS_PATH, help="where to write the JSON results")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"also store the results as {BASELINE_PATH}")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    run = run_benchmarks(args.sizes, args.weeks, args.seed, args.repeats)
+    print_results(run)
+    save_results(run, args.output)
+    if args.save_baseline:
+        save_results(run, BASELINE_PATH)
+
+    if args.baseline:
+        regressions = compare_to_baseline(run, args.baseline, args.tolerance)
+        sys.exit(1 if regressions else 0)
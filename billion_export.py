@@ -0,0 +1,311 @@
+"""
+Billion Transformation Tracker - Batch Dashboard Export
+Write every operator's dashboard and hours chart to HTML/PNG/SVG
+
+Usage:
+    from billion_export import export_dashboards, export_metrics
+    export_dashboards(output_dir="dashboards", formats=("html", "png"))
+    export_metrics("cohort.parquet")          # every stored week, streamed
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import itertools
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple
+
+import plotly.io as pio
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+EXPORT_FORMATS = ("html", "png", "svg", "jpeg", "webp", "pdf")
+
+# File formats of export_metrics()
+METRICS_FORMATS = ("parquet", "csv", "ndjson")
+
+# Operators sent to a worker per task (amortizes inter-process transfer)
+OPERATORS_PER_TASK = 16
+
+# Tasks queued per worker; the rest of the cohort stays in the database
+# until a worker frees up
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+class ExportStats(NamedTuple):
+    """Outcome of an export run"""
+    operators: int
+    figures: int
+    files: int
+    seconds: float
+    figures_per_second: float
+
+# ============================================================================
+# WORKER PROCESS
+# ============================================================================
+
+_worker_options = {}
+
+_HTML_PAGE = """<!doctype html>
+<html>
+<head>
+    <meta charset="utf-8" />
+    {plotlyjs}
+</head>
+<body>
+    {figure}
+</body>
+</html>
+"""
+
+def _plotlyjs_cdn_tag():
+    """
+    The <script> tag loading plotly.js from the CDN
+
+    Plotly re-reads and hashes the bundled plotly.js on every
+    include_plotlyjs="cdn" export, so the tag is rendered once per process.
+    """
+    page = pio.to_html({"data": [], "layout": {}}, include_plotlyjs="cdn", validate=False)
+    return re.search(r'<script[^>]*src="https://cdn\.plot\.ly[^"]*"[^>]*></script>', page).group(0)
+
+def _write_html(figure, path):
+    body = pio.to_html(figure, include_plotlyjs=False, full_html=False, validate=False)
+    page = _HTML_PAGE.format(plotlyjs=_worker_options["plotlyjs"], figure=body)
+    Path(path).write_text(page, encoding="utf-8")
+
+def _start_image_renderer():
+    """Start kaleido once per process so every image reuses the same browser"""
+    import kaleido
+
+    # kaleido >= 1.0 keeps a renderer alive across calls only when asked to;
+    # older releases keep their renderer process alive on their own
+    if hasattr(kaleido, "start_sync_server"):
+        kaleido.start_sync_server(silence_warnings=True)
+
+    # Render a throwaway figure so the first real export doesn't pay startup
+    pio.to_image({"data": [], "layout": {}}, format="png", validate=False)
+
+def _init_worker(formats, webgl, max_points, scale):
+    """Process pool initializer: warm the renderer and the figure template"""
+    _worker_options.update(formats=formats, webgl=webgl, max_points=max_points, scale=scale)
+
+    # The template is built once here and reused for every operator
+    tracker._dashboard_templates(bool(webgl))
+
+    if "html" in formats:
+        _worker_options["plotlyjs"] = _plotlyjs_cdn_tag()
+
+    if any(fmt != "html" for fmt in formats):
+        _start_image_renderer()
+
+def _safe_filename(operator_id):
+    return re.sub(r"[^\w.-]", "_", str(operator_id)) or "_"
+
+def _export_operators(output_dir, frames):
+    """Write both charts of each (operator_id, frame) pair; returns files written"""
+    formats = _worker_options["formats"]
+    written = 0
+
+    for operator_id, df in frames:
+        dashboard, hours = tracker.dashboard_figure_dicts(
+            df,
+            webgl=_worker_options["webgl"],
+            max_points=_worker_options["max_points"],
+        )
+        stem = Path(output_dir) / _safe_filename(operator_id)
+
+        for name, figure in (("dashboard", dashboard), ("hours", hours)):
+            for fmt in formats:
+                path = f"{stem}_{name}.{fmt}"
+                if fmt == "html":
+                    _write_html(figure, path)
+                else:
+                    pio.write_image(
+                        figure, path, format=fmt, scale=_worker_options["scale"], validate=False
+                    )
+                written += 1
+
+    return written
+
+# ============================================================================
+# EXPORT PIPELINE
+# ============================================================================
+
+def export_dashboards(
+    operator_ids=None,
+    output_dir="dashboards",
+    formats=("html",),
+    workers=None,
+    webgl=False,
+    max_points=None,
+    scale=1,
+    batch_size=tracker.ITER_BATCH_ROWS
+):
+    """
+    Export the dashboard and hours chart of many operators in parallel
+
+    Metrics are streamed from the current tracker session `batch_size`
+    rows at a time and split per operator; a process pool renders the
+    files. Only a batch and a few queued tasks per worker are in memory,
+    whatever the cohort size. Each worker builds the figure template once
+    and keeps one image renderer warm, so per operator only trace data
+    changes. Files are named <operator>_dashboard.<fmt> and
+    <operator>_hours.<fmt>. Workers are spawned, so scripts must call this
+    under `if __name__ == "__main__":`.
+
+    Returns ExportStats with the throughput in figures per second.
+    """
+    formats = tuple(fmt.lower() for fmt in formats)
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported export format(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+
+    batches = tracker.get_session().iter_metrics(
+        columns=["operator_id"] + tracker.DASHBOARD_COLUMNS,
+        operator_ids=operator_ids,
+        batch_size=batch_size,
+        whole_operators=True,
+    )
+    first = next(batches, None)
+    if first is None:
+        print("❌ No data yet. Submit your first week's metrics!")
+        return ExportStats(0, 0, 0, 0.0, 0.0)
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    operators = files = 0
+    pending = set()
+
+    # Spawned, not forked: the streaming DuckDB cursor is open in this
+    # process and a forked child would inherit its connection and threads
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(formats, webgl, max_points, scale),
+    ) as pool:
+        for batch in itertools.chain([first], batches):
+            frames = [
+                (key[0], df.drop("operator_id"))
+                for key, df in batch.partition_by("operator_id", as_dict=True, maintain_order=True).items()
+            ]
+            operators += len(frames)
+            for i in range(0, len(frames), OPERATORS_PER_TASK):
+                if len(pending) >= workers * TASKS_IN_FLIGHT_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    files += sum(future.result() for future in done)
+                pending.add(pool.submit(_export_operators, output_dir, frames[i:i + OPERATORS_PER_TASK]))
+        files += sum(future.result() for future in pending)
+
+    seconds = time.perf_counter() - start
+    figures = 2 * operators
+    stats = ExportStats(
+        operators=operators,
+        figures=figures,
+        files=files,
+        seconds=seconds,
+        figures_per_second=figures / seconds if seconds > 0 else 0.0,
+    )
+
+    print(f"✅ Exported {stats.figures} figure(s) for {stats.operators} operator(s) "
+          f"to {output_dir}/ ({stats.files} files)")
+    print(f"⚡ {stats.figures_per_second:.1f} figures/second with {workers} worker(s)")
+    return stats
+
+# ============================================================================
+# METRICS EXPORT
+# ============================================================================
+
+class MetricsExportStats(NamedTuple):
+    """Outcome of a metrics export"""
+    rows: int
+    batches: int
+    bytes_written: int
+    seconds: float
+
+def export_metrics(
+    path,
+    format=None,
+    columns=None,
+    operator_ids=None,
+    week_from=None,
+    week_to=None,
+    ordered=False,
+    batch_size=tracker.ITER_BATCH_ROWS
+):
+    """
+    Write stored metrics to a Parquet, CSV or NDJSON file, one batch at a time
+
+    Rows are streamed from the tracker with iter_metrics() (same
+    projection, filters and order) and appended to the file as they
+    arrive, so memory stays at one batch however large the cohort. The
+    format defaults to the file extension. Returns MetricsExportStats.
+    """
+    format = (format or Path(path).suffix.lstrip(".")).lower()
+    if format == "jsonl":
+        format = "ndjson"
+    if format not in METRICS_FORMATS:
+        raise ValueError(f"Unsupported metrics format: {format} (use one of {', '.join(METRICS_FORMATS)})")
+
+    start = time.perf_counter()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    batches = tracker.get_session().iter_metrics(
+        columns, operator_ids, week_from, week_to, batch_size=batch_size, ordered=ordered
+    )
+
+    rows = count = 0
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for batch in batches:
+                table = batch.to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                writer.write_table(table)
+                rows += batch.height
+                count += 1
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, "wb") as out:
+            for batch in batches:
+                if format == "csv":
+                    batch.write_csv(out, include_header=count == 0)
+                else:
+                    batch.write_ndjson(out)
+                rows += batch.height
+                count += 1
+
+    if count == 0 and format != "ndjson":
+        # Nothing matched: the file still gets the columns
+        empty = tracker.get_session().scan_metrics(columns=columns).head(0).collect()
+        if format == "parquet":
+            empty.write_parquet(path)
+        else:
+            empty.write_csv(path)
+
+    stats = MetricsExportStats(
+        rows=rows,
+        batches=count,
+        bytes_written=os.path.getsize(path),
+        seconds=time.perf_counter() - start,
+    )
+    tracker._count("bytes_written", "export_metrics", stats.bytes_written)
+    print(f"✅ Exported {stats.rows:,} week(s) to {path} in {stats.batches} batch(es) "
+          f"({stats.bytes_written / 1e6:.1f} MB, {stats.seconds:.2f}s)")
+    return stats
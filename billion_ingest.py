@@ -0,0 +1,391 @@
+"""
+Billion Transformation Tracker - Time Entry Ingestion
+Turn raw time-tracker exports into weekly submissions
+
+Reads CSV or JSONL time entries (one row per logged task, as exported by
+Toggl, Clockify or the spreadsheet in docs/time_tracking_guide.md) with
+Polars' streaming engine. Entries are classified as automated or manual,
+summed per operator and week, and written through the tracker's batch
+upsert. Memory stays flat however many entries the files hold.
+
+Usage:
+    from billion_ingest import ingest_time_entries
+    ingest_time_entries("exports/*.csv", start_dates={"alice": date(2025, 10, 6)})
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+from datetime import date, datetime
+from pathlib import Path
+
+import polars as pl
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Logical field -> column name in the export (override per tracker export,
+# e.g. {"date": "Start date", "hours": "Duration", "task": "Description"})
+TIME_ENTRY_COLUMNS = {
+    "operator_id": "operator_id",
+    "date": "date",
+    "hours": "hours",
+    "automated": "automated",
+    "task": "task",
+}
+
+# "Automated?" values that count as automated. "Partially" is manual work,
+# see "What Counts as Automated?" in docs/time_tracking_guide.md.
+AUTOMATED_VALUES = ("yes", "y", "true", "1", "automated")
+
+# Weekly rows per submit_weekly_metrics_batch() call
+INGEST_BATCH_SIZE = 10_000
+
+# Automated tasks listed in what_i_automated_this_week (most hours first)
+TOP_AUTOMATED_TASKS = 3
+
+# Distinct tasks remembered per operator, week and kind (automated or
+# manual) while streaming; past that, the ones with the fewest hours so far
+# are dropped. Task summaries are exact for weeks with fewer tasks.
+TASKS_KEPT_PER_WEEK = 100
+
+# Partial rows buffered from streamed batches before they are merged
+_MERGE_ROWS = 200_000
+
+# ============================================================================
+# SCANNING & CLASSIFICATION
+# ============================================================================
+
+def _scan(path):
+    suffix = Path(str(path)).suffix.lower()
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return pl.scan_ndjson(path)
+    if suffix == ".tsv":
+        return pl.scan_csv(path, separator="\t", try_parse_dates=True)
+    return pl.scan_csv(path, try_parse_dates=True)
+
+def _hours_expr(column, dtype):
+    """Decimal hours from a number, "1.5" or a "h:mm[:ss]" duration"""
+    if dtype.is_numeric():
+        return pl.col(column).cast(pl.Float64)
+
+    text = pl.col(column).cast(pl.String).str.strip_chars()
+    parts = text.str.split(":")
+    clock = (
+        parts.list.get(0, null_on_oob=True).cast(pl.Float64, strict=False)
+        + parts.list.get(1, null_on_oob=True).cast(pl.Float64, strict=False).fill_null(0) / 60
+        + parts.list.get(2, null_on_oob=True).cast(pl.Float64, strict=False).fill_null(0) / 3600
+    )
+    return pl.when(text.str.contains(":")).then(clock).otherwise(text.cast(pl.Float64, strict=False))
+
+def _date_expr(column, dtype):
+    if dtype == pl.Date:
+        return pl.col(column)
+    if isinstance(dtype, pl.Datetime):
+        return pl.col(column).dt.date()
+    return pl.col(column).cast(pl.String).str.to_date(strict=False)
+
+def scan_time_entries(
+    paths,
+    operator_id=tracker.DEFAULT_OPERATOR_ID,
+    columns=None,
+    automated_values=AUTOMATED_VALUES
+):
+    """
+    Lazily read time entries into a normalized LazyFrame
+
+    Columns: operator_id, date, week_start (Monday), hours, automated
+    (bool) and task (null when the export has no task column). Files
+    without an operator column belong to `operator_id`. Nothing is read
+    until the frame is collected.
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    mapping = {**TIME_ENTRY_COLUMNS, **(columns or {})}
+    automated_values = [str(value).lower() for value in automated_values]
+
+    frames = []
+    for path in paths:
+        lf = _scan(path)
+        schema = lf.collect_schema()
+
+        missing = [mapping[field] for field in ("date", "hours") if mapping[field] not in schema]
+        if missing:
+            raise ValueError(f"{path}: missing time entry column(s): {', '.join(missing)}")
+
+        if mapping["operator_id"] in schema:
+            operator = pl.col(mapping["operator_id"]).cast(pl.String)
+        else:
+            operator = pl.lit(operator_id, dtype=pl.String)
+
+        if mapping["automated"] in schema:
+            automated = (
+                pl.col(mapping["automated"]).cast(pl.String).str.strip_chars().str.to_lowercase()
+                .is_in(automated_values).fill_null(False)
+            )
+        else:
+            automated = pl.lit(False)
+
+        if mapping["task"] in schema:
+            task = pl.col(mapping["task"]).cast(pl.String)
+        else:
+            task = pl.lit(None, dtype=pl.String)
+
+        day = _date_expr(mapping["date"], schema[mapping["date"]])
+        frames.append(lf.select(
+            operator.alias("operator_id"),
+            day.alias("date"),
+            day.dt.truncate("1w").alias("week_start"),
+            _hours_expr(mapping["hours"], schema[mapping["hours"]]).alias("hours"),
+            automated.alias("automated"),
+            task.alias("task"),
+        ))
+
+    return pl.concat(frames, how="vertical")
+
+# ============================================================================
+# WEEKLY AGGREGATION
+# ============================================================================
+
+def _start_weeks(start_dates):
+    """Monday of each operator's Week 1 as a frame (operator_id, first_week)"""
+    if start_dates is None:
+        start_dates = {}
+    if isinstance(start_dates, (date, datetime)):
+        return start_dates
+    return pl.DataFrame(
+        {"operator_id": list(start_dates), "first_week": list(start_dates.values())},
+        schema={"operator_id": pl.String, "first_week": pl.Date},
+    ).with_columns(pl.col("first_week").dt.truncate("1w"))
+
+_TASK_KEYS = ["operator_id", "week_start", "automated"]
+
+def _batch_partials(batch):
+    """Per-week totals and per-task hours of one streamed batch"""
+    totals = batch.group_by("operator_id", "week_start").agg(
+        pl.col("hours").sum().alias("total_hours_worked"),
+        pl.col("hours").filter(pl.col("automated")).sum().alias("automated_hours"),
+        pl.len().alias("entries"),
+    )
+    tasks = (
+        batch.filter(pl.col("task").is_not_null() & pl.col("week_start").is_not_null())
+        .group_by(*_TASK_KEYS, "task")
+        .agg(pl.col("hours").sum().alias("task_hours"))
+    )
+    return totals, tasks
+
+def _merge_partials(totals, tasks):
+    """Sum partials into one frame each, keeping TASKS_KEPT_PER_WEEK tasks per week"""
+    totals = pl.concat(totals).group_by("operator_id", "week_start").agg(
+        pl.col("total_hours_worked").sum(),
+        pl.col("automated_hours").sum(),
+        pl.col("entries").sum(),
+    )
+    tasks = (
+        pl.concat(tasks)
+        .group_by(*_TASK_KEYS, "task")
+        .agg(pl.col("task_hours").sum())
+        .sort("task_hours", "task", descending=[True, False])
+        .filter(pl.int_range(pl.len()).over(_TASK_KEYS) < TASKS_KEPT_PER_WEEK)
+    )
+    return totals, tasks
+
+def aggregate_time_entries(
+    paths,
+    operator_id=tracker.DEFAULT_OPERATOR_ID,
+    start_dates=None,
+    columns=None,
+    automated_values=AUTOMATED_VALUES
+):
+    """
+    Stream time entries into per-operator weekly totals
+
+    Week 1 starts on the Monday of `start_dates` (a date for everyone or a
+    dict per operator), otherwise on each operator's first logged week.
+    Entries without a valid date, or before Week 1, are skipped and
+    counted. Returns a DataFrame with operator_id, week_number,
+    week_start, total_hours_worked, automated_hours, entries,
+    what_i_automated_this_week (top automated tasks by hours) and
+    biggest_bottleneck_now (the manual task with the most hours).
+
+    Totals are exact. Task summaries only remember TASKS_KEPT_PER_WEEK
+    tasks per week and kind, so a week logging more distinct tasks may
+    miss one whose hours were spread thinly across the files.
+    """
+    entries = scan_time_entries(paths, operator_id, columns, automated_values)
+
+    # One streaming pass. Each batch is reduced to partial sums, which are
+    # merged once they outgrow _MERGE_ROWS and the rows already merged;
+    # merging trims the tasks, so memory follows the weeks, not entries.
+    empty_totals, empty_tasks = _batch_partials(entries.clear().collect())
+    totals, tasks = [empty_totals], [empty_tasks]
+    buffered = merged = 0
+    for batch in entries.collect_batches():
+        batch_totals, batch_tasks = _batch_partials(batch)
+        totals.append(batch_totals)
+        tasks.append(batch_tasks)
+        buffered += batch_totals.height + batch_tasks.height
+        if buffered >= max(_MERGE_ROWS, merged):
+            merged_totals, merged_tasks = _merge_partials(totals, tasks)
+            totals, tasks = [merged_totals], [merged_tasks]
+            buffered, merged = 0, merged_totals.height + merged_tasks.height
+    totals, tasks = _merge_partials(totals, tasks)
+
+    starts = _start_weeks(start_dates)
+    if isinstance(starts, pl.DataFrame):
+        totals = totals.join(starts, on="operator_id", how="left")
+    else:
+        totals = totals.with_columns(pl.lit(starts).cast(pl.Date).dt.truncate("1w").alias("first_week"))
+
+    weekly = totals.with_columns(
+        pl.col("first_week").fill_null(pl.col("week_start").min().over("operator_id"))
+    ).with_columns(
+        ((pl.col("week_start") - pl.col("first_week")).dt.total_days() // 7 + 1)
+        .cast(pl.Int64).alias("week_number")
+    )
+
+    valid = pl.col("week_start").is_not_null() & (pl.col("week_number") >= 1)
+    skipped = weekly.filter(~valid)["entries"].sum()
+    weekly = weekly.filter(valid)
+
+    automated_tasks = (
+        tasks.filter(pl.col("automated"))
+        .sort("task_hours", "task", descending=[True, False])
+        .group_by("operator_id", "week_start", maintain_order=True)
+        .agg(pl.col("task").head(TOP_AUTOMATED_TASKS).str.join("; ").alias("what_i_automated_this_week"))
+    )
+    bottlenecks = (
+        tasks.filter(~pl.col("automated"))
+        .sort("task_hours", "task", descending=[True, False])
+        .group_by("operator_id", "week_start", maintain_order=True)
+        .agg(pl.col("task").first().alias("biggest_bottleneck_now"))
+    )
+
+    weekly = (
+        weekly
+        .join(automated_tasks, on=["operator_id", "week_start"], how="left")
+        .join(bottlenecks, on=["operator_id", "week_start"], how="left")
+        .select(
+            "operator_id",
+            "week_number",
+            "week_start",
+            "total_hours_worked",
+            "automated_hours",
+            "entries",
+            "what_i_automated_this_week",
+            "biggest_bottleneck_now",
+        )
+        .sort("operator_id", "week_number")
+    )
+
+    print(f"📥 Aggregated {weekly['entries'].sum():,} time entries into {weekly.height:,} weekly row(s) "
+          f"for {weekly['operator_id'].n_unique():,} operator(s)")
+    if skipped:
+        print(f"⚠️  Skipped {skipped:,} entries without a valid date or before Week 1")
+    return weekly
+
+# ============================================================================
+# INGESTION
+# ============================================================================
+
+_WEEKLY_INPUT_SCHEMA = {
+    "operator_id": pl.String,
+    "week_number": pl.Int64,
+    "active_clients": pl.Int64,
+    "revenue_ratio_to_baseline": pl.Float64,
+    "recurring_revenue_percentage": pl.Float64,
+    "what_i_automated_this_week": pl.String,
+    "biggest_bottleneck_now": pl.String,
+}
+
+def _weekly_submissions(session, weekly, weekly_inputs):
+    """
+    Complete the weekly totals with the fields time entries can't provide
+
+    Clients, revenue and recurring revenue come from `weekly_inputs`, else
+    from the week already stored (an upsert replaces the whole row), else
+    stay empty (Week 1 revenue defaults to the 1.0 baseline ratio). Notes
+    prefer the inputs, then the stored text, then the task summaries.
+    """
+    if weekly_inputs is None:
+        inputs = pl.DataFrame(schema=_WEEKLY_INPUT_SCHEMA)
+    else:
+        inputs = weekly_inputs if isinstance(weekly_inputs, pl.DataFrame) else pl.from_arrow(weekly_inputs)
+        if "operator_id" not in inputs.columns:
+            raise ValueError("weekly_inputs needs an operator_id column")
+        inputs = inputs.select(
+            pl.col(name).cast(dtype) if name in inputs.columns else pl.lit(None, dtype=dtype).alias(name)
+            for name, dtype in _WEEKLY_INPUT_SCHEMA.items()
+        )
+
+    con = session.cursor()
+    con.register("_ingest_weekly", weekly)
+    con.register("_ingest_inputs", inputs)
+    try:
+        return con.execute(f"""
+            SELECT
+                w.operator_id,
+                w.week_number,
+                w.total_hours_worked,
+                w.automated_hours,
+                COALESCE(i.active_clients, m.active_clients) AS active_clients,
+                COALESCE(
+                    i.revenue_ratio_to_baseline,
+                    m.revenue_ratio,
+                    CASE WHEN w.week_number = 1 THEN 1.0 END
+                )::DOUBLE AS revenue_ratio_to_baseline,
+                COALESCE(i.recurring_revenue_percentage, m.recurring_revenue_pct)::DOUBLE
+                    AS recurring_revenue_percentage,
+                COALESCE(i.what_i_automated_this_week, m.automated_this_week, w.what_i_automated_this_week)
+                    AS what_i_automated_this_week,
+                COALESCE(i.biggest_bottleneck_now, m.biggest_bottleneck, w.biggest_bottleneck_now)
+                    AS biggest_bottleneck_now
+            FROM _ingest_weekly w
+            LEFT JOIN _ingest_inputs i
+                ON i.operator_id = w.operator_id AND i.week_number = w.week_number
+            LEFT JOIN {tracker.TABLE_NAME} m
+                ON m.operator_id = w.operator_id AND m.week_number = w.week_number
+            ORDER BY w.operator_id, w.week_number
+        """).pl()
+    finally:
+        con.unregister("_ingest_weekly")
+        con.unregister("_ingest_inputs")
+
+def ingest_time_entries(
+    paths,
+    operator_id=tracker.DEFAULT_OPERATOR_ID,
+    start_dates=None,
+    weekly_inputs=None,
+    columns=None,
+    automated_values=AUTOMATED_VALUES,
+    batch_size=INGEST_BATCH_SIZE,
+    session=None
+):
+    """
+    Aggregate raw time entries and upsert them as weekly submissions
+
+    `paths` is a file, a glob ("exports/*.csv") or a list of them. Hours
+    come from the entries (see aggregate_time_entries); the other weekly
+    fields from `weekly_inputs` (a frame keyed by operator_id and
+    week_number with any SUBMISSION_COLUMNS) or the stored week. Rows are
+    written with submit_weekly_metrics_batch() in batches of `batch_size`.
+
+    Returns the number of weeks written.
+    """
+    session = session or tracker.get_session()
+
+    weekly = aggregate_time_entries(paths, operator_id, start_dates, columns, automated_values)
+    if weekly.height == 0:
+        print("❌ No time entries found")
+        return 0
+
+    submissions = _weekly_submissions(session, weekly, weekly_inputs)
+
+    written = 0
+    for batch in submissions.iter_slices(batch_size):
+        written += session.submit_weekly_metrics_batch(batch)
+    return written
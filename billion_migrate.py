@@ -0,0 +1,207 @@
+"""
+Billion Transformation Tracker - Schema Migration & Storage Layout
+Bring a database to the current schema version and report what it saved
+
+Read-write sessions apply pending MIGRATIONS (billion_tracker) on their
+own, each in its own transaction. migrate_database() does the same on
+purpose, then rewrites the file: DuckDB reuses the blocks a migration
+frees but never gives them back, so the file only shrinks when copied.
+It measures the database before and after (file size, full-scan and
+aggregate time, each column's compression) so the change is visible.
+
+Usage:
+    from billion_migrate import migrate_database
+    before, after = migrate_database("billion_tracker.db")
+
+    python billion_migrate.py --db billion_tracker.db
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import os
+import time
+from typing import NamedTuple
+
+import duckdb
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Timed scans are repeated and the fastest kept (warm cache)
+SCAN_REPEATS = 3
+
+class LayoutReport(NamedTuple):
+    """On-disk size and scan speed of a tracker database"""
+    schema_version: int
+    rows: int
+    size_bytes: int
+    scan_seconds: float         # every column into a Polars frame
+    aggregate_seconds: float    # per-operator averages of the metric columns
+    compression: dict           # column -> compressions in use ("" if computed on read)
+
+# ============================================================================
+# MEASURING
+# ============================================================================
+
+def _timed(con, query, fetch):
+    best = float("inf")
+    for _ in range(SCAN_REPEATS):
+        start = time.perf_counter()
+        fetch(con.execute(query))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure_layout(db_path=tracker.DB_PATH):
+    """
+    LayoutReport for the database at `db_path`
+
+    Opens the file with a plain connection, so nothing is migrated or
+    created by measuring it.
+    """
+    con = duckdb.connect(str(db_path))
+    try:
+        # Everything in the file, so its size is what's stored
+        con.execute("CHECKPOINT")
+        version = tracker._schema_version(con)
+        rows = con.execute(f"SELECT COUNT(*) FROM {tracker.TABLE_NAME}").fetchone()[0]
+
+        numeric = [column for column, in con.execute(f"""
+            SELECT column_name FROM duckdb_columns()
+            WHERE database_name = current_database() AND schema_name = 'main'
+              AND table_name = {tracker._sql_literal(tracker.TABLE_NAME)}
+              AND data_type IN ('FLOAT', 'DOUBLE', 'INTEGER') AND column_name <> 'week_number'
+        """).fetchall()]
+        averages = ", ".join(f"AVG({column})" for column in numeric)
+        scan_seconds = _timed(con, f"SELECT * FROM {tracker.TABLE_NAME}", lambda result: result.pl())
+        aggregate_seconds = _timed(
+            con,
+            f"SELECT operator_id, {averages} FROM {tracker.TABLE_NAME} GROUP BY operator_id",
+            lambda result: result.fetchall(),
+        )
+
+        stored = dict(con.execute(f"""
+            SELECT column_name, string_agg(DISTINCT compression, ', ' ORDER BY compression)
+            FROM pragma_storage_info({tracker._sql_literal(tracker.TABLE_NAME)})
+            WHERE segment_type <> 'VALIDITY'
+            GROUP BY column_name
+        """).fetchall())
+    finally:
+        con.close()
+
+    return LayoutReport(
+        schema_version=version,
+        rows=rows,
+        size_bytes=os.path.getsize(db_path),
+        scan_seconds=scan_seconds,
+        aggregate_seconds=aggregate_seconds,
+        compression={column: stored.get(column, "") for column in tracker.METRIC_COLUMNS},
+    )
+
+# ============================================================================
+# MIGRATING
+# ============================================================================
+
+def compact_file(db_path=tracker.DB_PATH):
+    """
+    Copy the database into a new file and swap it in, dropping free blocks
+
+    Nothing may have the database open. Returns the bytes saved.
+    """
+    before = os.path.getsize(db_path)
+    tmp = f"{db_path}.{os.getpid()}.compact"
+    for leftover in (tmp, f"{tmp}.wal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    con = duckdb.connect(str(db_path))
+    try:
+        source = con.execute("SELECT current_database()").fetchone()[0]
+        quoted = tmp.replace("'", "''")
+        con.execute(f"ATTACH '{quoted}' AS _compact")
+        with tracker._span("compact_file.copy"):
+            con.execute(f'COPY FROM DATABASE "{source}" TO _compact')
+        con.execute("CHECKPOINT _compact")
+        con.execute("DETACH _compact")
+    except Exception:
+        con.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    con.close()
+
+    os.replace(tmp, db_path)
+    return before - os.path.getsize(db_path)
+
+def _print_reports(before, after):
+    print("\n" + "="*80)
+    print(f"🔧 STORAGE LAYOUT: schema version {before.schema_version} → {after.schema_version}")
+    print("="*80)
+    for label, old, new in (
+        ("File size (MB)", before.size_bytes / 1e6, after.size_bytes / 1e6),
+        ("Bytes per row", before.size_bytes / max(before.rows, 1), after.size_bytes / max(after.rows, 1)),
+        ("Full scan (ms)", before.scan_seconds * 1e3, after.scan_seconds * 1e3),
+        ("Aggregate (ms)", before.aggregate_seconds * 1e3, after.aggregate_seconds * 1e3),
+    ):
+        change = f"{(new - old) / old * 100:+.0f}%" if old else ""
+        print(f"{label:<20}{old:>12.1f}{new:>12.1f}{change:>10}")
+    print("\nCompression per column (before → after):")
+    for column in tracker.METRIC_COLUMNS:
+        old = before.compression.get(column) or "computed"
+        new = after.compression.get(column) or "computed"
+        print(f"  {column:<28}{old} → {new}")
+    print("="*80 + "\n")
+
+@tracker._instrumented
+def migrate_database(db_path=tracker.DB_PATH, compact=True, verbose=True):
+    """
+    Apply pending schema migrations to the database at `db_path`
+
+    Then (unless `compact` is False) rewrites the file so the space the
+    migration freed is returned. Nothing else may have the database open.
+    Returns the (before, after) LayoutReports.
+    """
+    db_path = str(db_path)
+    before = measure_layout(db_path)
+
+    session = tracker.TrackerSession(db_path)
+    try:
+        applied = session.migrate_schema()
+    finally:
+        session.close()
+
+    if compact and applied:
+        saved = compact_file(db_path)
+        if verbose:
+            print(f"🗜️  Rewrote {db_path}: {saved / 1e6:.1f} MB freed")
+
+    after = measure_layout(db_path)
+    if verbose:
+        if not applied:
+            print(f"✅ {db_path} is already at schema version {after.schema_version}")
+        _print_reports(before, after)
+    return before, after
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate the tracker database to the current schema version")
+    parser.add_argument("--db", default=tracker.DB_PATH, help="tracker database")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="don't rewrite the file afterwards (it keeps its size)")
+    parser.add_argument("--report", action="store_true", help="only measure the current layout")
+    args = parser.parse_args()
+
+    if args.report:
+        report = measure_layout(args.db)
+        _print_reports(report, report)
+    else:
+        migrate_database(args.db, compact=not args.no_compact)
@@ -0,0 +1,313 @@
+"""
+Billion Transformation Tracker - Read Replicas
+Let any number of reporting processes read while one process ingests
+
+DuckDB lets only one process open a database file read-write, and that
+process locks everyone else out. publish_replica() copies the whole
+database, tables, search index and history included, into a replica file
+as of one transaction. The copy doesn't block the writer's submissions.
+The replica then replaces the previous one atomically.
+Reporting processes open the replica read-only (DuckDB allows many
+read-only processes per file), so read throughput scales with cores.
+
+A sidecar JSON file records the write generation the replica holds and
+when the writer last confirmed it current. Readers use it to enforce a
+staleness bound; publishing when nothing changed only refreshes that
+timestamp.
+
+Usage:
+    # Writer (ingestion) process
+    from billion_replica import publish_replica
+    publish_replica()                             # e.g. after each batch
+
+    python billion_replica.py --every 30          # or keep publishing
+
+    # Reporting processes
+    from billion_replica import ReplicaReader
+    with ReplicaReader(max_staleness=120) as replica:
+        df = replica.get_metrics_df("alice")
+        print(replica.info().age_seconds)
+
+    # ... or point the module-level functions at the replica
+    from billion_replica import use_replica
+    use_replica()
+    print_progress_table("alice")
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_REPLICA_PATH = "billion_tracker.replica.db"
+
+# Readers refuse a replica the writer hasn't confirmed current for this
+# many seconds (None: no bound)
+DEFAULT_MAX_STALENESS = 300.0
+
+class ReplicaInfo(NamedTuple):
+    """What a published replica holds"""
+    path: str
+    version: int
+    write_generation: int
+    published_at: datetime
+    checked_at: datetime
+    age_seconds: float      # since the writer last confirmed it current
+    size_bytes: int
+
+class StaleReplicaError(RuntimeError):
+    """The replica is older than the reader's staleness bound"""
+
+# ============================================================================
+# SIDECAR
+# ============================================================================
+
+def _sidecar_path(replica_path):
+    return Path(f"{replica_path}.json")
+
+def _read_sidecar(replica_path):
+    try:
+        return json.loads(_sidecar_path(replica_path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+def _write_sidecar(replica_path, sidecar):
+    """Replace the sidecar atomically (readers see the old or the new one)"""
+    path = _sidecar_path(replica_path)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(sidecar, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _info(replica_path, sidecar):
+    checked_at = datetime.fromisoformat(sidecar["checked_at"])
+    return ReplicaInfo(
+        path=str(replica_path),
+        version=sidecar["version"],
+        write_generation=sidecar["write_generation"],
+        published_at=datetime.fromisoformat(sidecar["published_at"]),
+        checked_at=checked_at,
+        age_seconds=max(0.0, (datetime.now(timezone.utc) - checked_at).total_seconds()),
+        size_bytes=os.path.getsize(replica_path),
+    )
+
+def replica_info(replica_path=DEFAULT_REPLICA_PATH):
+    """Version, write generation, timestamps and age of the replica (None if there is none)"""
+    sidecar = _read_sidecar(replica_path)
+    if sidecar is None or not os.path.exists(replica_path):
+        return None
+    return _info(replica_path, sidecar)
+
+def replica_age(replica_path=DEFAULT_REPLICA_PATH):
+    """Seconds since the writer last confirmed the replica current (inf if there is none)"""
+    info = replica_info(replica_path)
+    return info.age_seconds if info is not None else float("inf")
+
+# ============================================================================
+# PUBLISHING (WRITER)
+# ============================================================================
+
+@tracker._instrumented
+def publish_replica(replica_path=DEFAULT_REPLICA_PATH, session=None, force=False):
+    """
+    Publish the writer's database as a read-only replica
+
+    Copies every table as of one transaction into a new file and swaps it
+    in with an atomic rename. Readers that have the old replica open keep
+    reading it until they reopen. Skipped (only the freshness timestamp
+    is updated) if nothing was written since the last publish, unless
+    `force`. Returns ReplicaInfo.
+    """
+    session = session or tracker.get_session()
+    if session.read_only:
+        raise ValueError("publish_replica() needs the writer's read-write session")
+    if Path(replica_path).resolve() == Path(session.db_path).resolve():
+        raise ValueError("The replica path must differ from the database path")
+
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc).isoformat()
+    previous = _read_sidecar(replica_path)
+    version = session.get_cache_version()
+
+    if (not force and previous is not None and os.path.exists(replica_path)
+            and previous.get("cache_version") == list(version or ())):
+        _write_sidecar(replica_path, {**previous, "checked_at": now})
+        return _info(replica_path, {**previous, "checked_at": now})
+
+    # Replica readers are read-only and can't refresh what writes queued
+    session.update_cohort_stats()
+    session.update_search_index()
+    con = session.cursor()
+    tmp = f"{replica_path}.{os.getpid()}.tmp"
+    for leftover in (tmp, f"{tmp}.wal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    source = con.execute("SELECT current_database()").fetchone()[0]
+    quoted = tmp.replace("'", "''")
+    con.execute(f"ATTACH '{quoted}' AS _replica")
+    try:
+        # One transaction: every table is copied from the same state
+        con.begin()
+        try:
+            with tracker._span("publish_replica.copy"):
+                con.execute(f'COPY FROM DATABASE "{source}" TO _replica')
+            generation = con.execute(f"""
+                SELECT value FROM _replica.main.{tracker.STATE_TABLE} WHERE key = 'write_generation'
+            """).fetchone()[0]
+            version = session.get_cache_version()
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        # Everything in the file itself, no WAL left beside it
+        con.execute("CHECKPOINT _replica")
+    finally:
+        con.execute("DETACH _replica")
+
+    try:
+        os.replace(tmp, replica_path)
+    except Exception:
+        os.remove(tmp)
+        raise
+
+    sidecar = {
+        "version": (previous or {}).get("version", 0) + 1,
+        "write_generation": generation,
+        "cache_version": list(version or ()),
+        "published_at": now,
+        "checked_at": now,
+        "source": str(session.db_path),
+    }
+    _write_sidecar(replica_path, sidecar)
+
+    info = _info(replica_path, sidecar)
+    tracker._count("bytes_written", "publish_replica", info.size_bytes)
+    print(f"📡 Replica v{info.version} published: write generation {info.write_generation}, "
+          f"{info.size_bytes / 1e6:.1f} MB ({time.perf_counter() - start:.2f}s)")
+    return info
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def _check_staleness(replica_path, max_staleness):
+    info = replica_info(replica_path)
+    if info is None:
+        raise FileNotFoundError(f"No replica at {replica_path}, run publish_replica() in the writer first")
+    if max_staleness is not None and info.age_seconds > max_staleness:
+        raise StaleReplicaError(
+            f"Replica {replica_path} is {info.age_seconds:.0f}s old (bound: {max_staleness:.0f}s); "
+            f"is the writer still publishing?"
+        )
+    return info
+
+def open_replica(replica_path=DEFAULT_REPLICA_PATH, max_staleness=DEFAULT_MAX_STALENESS, **session_options):
+    """
+    A read-only TrackerSession on the current replica
+
+    Raises StaleReplicaError if the replica is older than `max_staleness`
+    seconds. The session keeps reading the version it opened; use
+    ReplicaReader to follow new publishes.
+    """
+    _check_staleness(replica_path, max_staleness)
+    return tracker.TrackerSession(str(replica_path), read_only=True, **session_options)
+
+class ReplicaReader:
+    """
+    Read-only access to the replica that follows each publish
+
+    Session methods are available directly (replica.get_metrics_df(...),
+    replica.scan_metrics(...), replica.as_of(...), ...). Every call checks
+    the staleness bound and, if a newer replica was published, reopens
+    onto it first. Both checks are a stat and a small JSON read.
+
+        with ReplicaReader(max_staleness=120, threads=2) as replica:
+            df = replica.get_cohort_metrics_df()
+    """
+
+    def __init__(self, replica_path=DEFAULT_REPLICA_PATH, max_staleness=DEFAULT_MAX_STALENESS, **session_options):
+        self.replica_path = str(replica_path)
+        self.max_staleness = max_staleness
+        self.session_options = session_options
+        self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"ReplicaReader({self.replica_path!r}, max_staleness={self.max_staleness})"
+
+    def __getattr__(self, name):
+        # Only reached for names ReplicaReader itself doesn't define
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.session(), name)
+
+    def session(self):
+        """The read-only session on the latest replica (reopened after a publish)"""
+        _check_staleness(self.replica_path, self.max_staleness)
+        if self._session is None or self._session.replaced:
+            if self._session is not None:
+                self._session.close()
+                tracker._count("replica_reopens", "replica_reader")
+            self._session = tracker.TrackerSession(self.replica_path, read_only=True, **self.session_options)
+        return self._session
+
+    def info(self):
+        """ReplicaInfo of the published replica"""
+        return replica_info(self.replica_path)
+
+    def close(self):
+        """Close the replica session"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+def use_replica(replica_path=DEFAULT_REPLICA_PATH, max_staleness=DEFAULT_MAX_STALENESS):
+    """
+    Point the module-level functions (get_metrics_df, print_progress_table,
+    ...) at the replica, read-only
+
+    The default session follows new publishes on its own; the staleness
+    bound is checked here, once. Returns ReplicaInfo.
+    """
+    info = _check_staleness(replica_path, max_staleness)
+    tracker.DB_PATH = str(replica_path)
+    tracker.READ_ONLY = True
+    return info
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish the tracker database as a read-only replica")
+    parser.add_argument("--db", default=tracker.DB_PATH, help="tracker database")
+    parser.add_argument("--replica", default=DEFAULT_REPLICA_PATH, help="replica file")
+    parser.add_argument("--force", action="store_true", help="copy even if nothing changed")
+    parser.add_argument("--every", type=float, default=None,
+                        help="keep publishing every N seconds")
+    args = parser.parse_args()
+
+    tracker.DB_PATH = args.db
+    publish_replica(args.replica, force=args.force)
+    while args.every:
+        time.sleep(args.every)
+        publish_replica(args.replica)
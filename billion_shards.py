@@ -0,0 +1,649 @@
+"""
+Billion Transformation Tracker - Sharding
+Spread operators over several DuckDB files and read them in parallel
+
+One DuckDB file takes writes from one process, and every cohort-wide read
+scans all of its rows. A shard directory holds N tracker databases and
+each operator lives in exactly one of them, picked by a stable hash of the
+operator id. ShardedTracker sends each submission to its operator's shard;
+a batch is split per shard and the parts are written concurrently.
+Cohort-wide reads run on every shard at once in a thread pool (DuckDB
+releases the GIL), and the partial results are merged. These reads are
+cohort tables, graduation scans, reports and cohort distributions.
+Percentile ranks and cohort quartiles are merged from each shard's stored
+cut points, weighted by the shard's operator count.
+
+    shards/
+        shards.json
+        shard-000.db
+        shard-001.db
+        ...
+
+Operators are placed by jump consistent hashing, so going from N to N+1
+shards moves only about 1/(N+1) of them. rebalance_shards() moves them
+with their history.
+
+Usage:
+    from billion_shards import ShardedTracker
+    with ShardedTracker("shards", shards=4) as shards:
+        shards.submit_weekly_metrics(3, 50, 20, 8, 1.2, 30, "Invoicing", "Sales calls",
+                                     operator_id="alice")
+        shards.submit_weekly_metrics_batch(frame)
+        readiness = shards.scan_graduation_readiness()
+        ranks = shards.get_percentile_ranks("alice")
+
+    python billion_shards.py --dir shards --from billion_tracker.db --shards 4
+    python billion_shards.py --dir shards --rebalance 8
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import polars as pl
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_SHARD_DIR = "shards"
+DEFAULT_SHARDS = 4
+MANIFEST_NAME = "shards.json"
+
+# Placement function recorded in the manifest (a different one would need
+# every operator moved)
+PLACEMENT = "jump-blake2b-64"
+
+class ReshardStats(NamedTuple):
+    """Outcome of sharding a database or changing the shard count"""
+    shards_before: int
+    shards_after: int
+    operators_moved: int
+    rows_moved: int
+    seconds: float
+
+# ============================================================================
+# PLACEMENT
+# ============================================================================
+
+def _operator_hash(operator_id):
+    """Stable 64-bit hash of an operator id (the same in every process)"""
+    digest = hashlib.blake2b(str(operator_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def _jump_hash(key, buckets):
+    """Jump consistent hash (Lamping & Veach): a bucket in [0, buckets)"""
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+def shard_for(operator_id, shards):
+    """Index of the shard (out of `shards`) that holds an operator"""
+    return _jump_hash(_operator_hash(operator_id), shards)
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def _shard_file(index):
+    return f"shard-{index:03d}.db"
+
+def _read_manifest(directory):
+    path = Path(directory) / MANIFEST_NAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+def _write_manifest(directory, manifest):
+    """Replace the manifest atomically (readers see the old or the new one)"""
+    path = Path(directory) / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _require_manifest(directory):
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No shards in {directory}, create them with ShardedTracker() first")
+    return manifest
+
+def _new_manifest(shards):
+    return {
+        "shards": shards,
+        "files": [_shard_file(i) for i in range(shards)],
+        "placement": PLACEMENT,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+def _init_shard(path):
+    """Create a shard's tables (quietly; init_database() prints per call)"""
+    with tracker.TrackerSession(str(path)) as session:
+        con = session.cursor()
+        tracker._create_metrics_table(con, tracker.TABLE_NAME)
+        session._ensure_schema(con)
+
+def create_shards(directory=DEFAULT_SHARD_DIR, shards=DEFAULT_SHARDS):
+    """Create an empty shard directory; returns its manifest"""
+    if shards < 1:
+        raise ValueError("Need at least one shard")
+    if _read_manifest(directory) is not None:
+        raise FileExistsError(f"{directory} already holds shards")
+
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    manifest = _new_manifest(shards)
+    for name in manifest["files"]:
+        _init_shard(Path(directory) / name)
+    _write_manifest(directory, manifest)
+    print(f"✅ Created {shards} shard(s) in {directory}/")
+    return manifest
+
+# ============================================================================
+# SHARD READS
+# ============================================================================
+
+def _on_shard(session, function, args):
+    """Thread pool task: run function(*args) with the module-level API on one shard's session"""
+    with tracker.use_session(session):
+        return function(*args)
+
+def _shard_cutpoints(week_number):
+    """(week_number, metric, operators, cutpoints) rows of one week, or of every week"""
+    session = tracker.get_session()
+    session.update_cohort_stats()
+    week_filter = f"WHERE week_number = {int(week_number)}" if week_number is not None else ""
+    return session.cursor().execute(f"""
+        SELECT week_number, metric, operators, cutpoints
+        FROM {tracker.COHORT_STATS_TABLE}
+        {week_filter}
+    """).fetchall()
+
+# ============================================================================
+# MERGING
+# ============================================================================
+
+def _group_cutpoints(rows):
+    """{(week_number, metric): [(operators, cutpoints), ...]} from every shard's rows"""
+    grouped = {}
+    for shard_rows in rows:
+        for week_number, metric, operators, cutpoints in shard_rows:
+            grouped.setdefault((week_number, metric), []).append((operators, cutpoints))
+    return grouped
+
+def _merged_rank(parts, value):
+    """Percentile rank (0-100) of `value` over shards, each weighted by its operators"""
+    if value is None or not parts:
+        return None
+    total = sum(operators for operators, _ in parts)
+    return sum(
+        operators * tracker._percentile_rank(cutpoints, value) for operators, cutpoints in parts
+    ) / total
+
+def _merged_quantiles(parts, quantiles):
+    """
+    Quantiles of the shards' combined distribution
+
+    Each shard's cut points give its cumulative distribution (linear
+    between cut points); the mix weighted by operator count is inverted at
+    `quantiles`. With one shard this is exactly quantile_cont().
+    """
+    np = tracker.np
+    total = sum(operators for operators, _ in parts)
+    grid = np.unique(np.concatenate([np.asarray(cutpoints, dtype=np.float64) for _, cutpoints in parts]))
+    cdf = sum(
+        operators * np.interp(grid, cutpoints, np.linspace(0.0, 1.0, len(cutpoints)))
+        for operators, cutpoints in parts
+    ) / total
+    return [float(v) for v in np.interp(quantiles, cdf, grid)]
+
+# ============================================================================
+# SHARDED TRACKER
+# ============================================================================
+
+class ShardedTracker:
+    """
+    The tracker API over a shard directory
+
+    Writes and single-operator reads go to the operator's shard through a
+    read-write session opened on first use. Cohort-wide reads run in a
+    thread pool, one task per shard, on those same sessions (each thread
+    reads through its own cursor), so they never close a session another
+    thread is writing through. Everything else is available per operator
+    through session_for().
+
+    Placement assumes this tracker is the only writer of the directory.
+    """
+
+    def __init__(self, directory=DEFAULT_SHARD_DIR, shards=None, workers=None, **session_options):
+        manifest = _read_manifest(directory)
+        if manifest is None:
+            manifest = create_shards(directory, shards or DEFAULT_SHARDS)
+        elif shards is not None and shards != manifest["shards"]:
+            raise ValueError(
+                f"{directory} has {manifest['shards']} shard(s); change the count with rebalance_shards()"
+            )
+        if manifest.get("placement", PLACEMENT) != PLACEMENT:
+            raise ValueError(f"Unknown shard placement in {directory}: {manifest['placement']}")
+
+        self.directory = str(directory)
+        self.shards = manifest["shards"]
+        self.paths = [str(Path(directory) / name) for name in manifest["files"]]
+        self.workers = max(1, min(workers or os.cpu_count() or 1, self.shards))
+        self.session_options = session_options
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        # Merged cut points per week, until the next write through this tracker
+        self._cutpoints = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"ShardedTracker({self.directory!r}, shards={self.shards}, workers={self.workers})"
+
+    def close(self):
+        """Stop the read threads and close every shard session"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    # ------------------------------------------------------------------------
+    # Shards
+    # ------------------------------------------------------------------------
+
+    def shard_for(self, operator_id):
+        """Index of the shard holding an operator"""
+        return shard_for(operator_id, self.shards)
+
+    def session(self, index):
+        """The read-write TrackerSession of one shard (opened on first use)"""
+        with self._lock:
+            session = self._sessions.get(index)
+            if session is None or session.closed:
+                session = tracker.TrackerSession(self.paths[index], **self.session_options)
+                self._sessions[index] = session
+        return session
+
+    def session_for(self, operator_id):
+        """The read-write TrackerSession of an operator's shard"""
+        return self.session(self.shard_for(operator_id))
+
+    def _fan_out(self, function, args_per_shard):
+        """Run function(*args) on the shards in `args_per_shard` ({index: args}) in parallel"""
+        if not args_per_shard:
+            return {}
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="billion-shard")
+        with tracker._span("shards.fan_out"):
+            futures = {
+                index: self._pool.submit(_on_shard, self.session(index), function, args)
+                for index, args in args_per_shard.items()
+            }
+            return {index: future.result() for index, future in futures.items()}
+
+    def _everywhere(self, function, *args):
+        return list(self._fan_out(function, {index: args for index in range(self.shards)}).values())
+
+    def _by_shard(self, operator_ids):
+        """{shard index: [operator_id, ...]}"""
+        groups = {}
+        for operator_id in operator_ids:
+            groups.setdefault(self.shard_for(operator_id), []).append(operator_id)
+        return groups
+
+    # ------------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------------
+
+    def init_database(self):
+        """Create missing tables in every shard"""
+        for path in self.paths:
+            _init_shard(path)
+
+    def submit_weekly_metrics(self, *args, operator_id=tracker.DEFAULT_OPERATOR_ID, **kwargs):
+        """Submit one week to the operator's shard (same arguments as submit_weekly_metrics)"""
+        self._cutpoints.clear()
+        return self.session_for(operator_id).submit_weekly_metrics(*args, operator_id=operator_id, **kwargs)
+
+    def submit_weekly_metrics_batch(self, submissions, operator_id=tracker.DEFAULT_OPERATOR_ID):
+        """
+        Submit many weeks, split by shard
+
+        Each shard's part is one transaction, written concurrently with the
+        others (DuckDB releases the GIL). Returns the rows written.
+        """
+        frame = submissions if isinstance(submissions, pl.DataFrame) else pl.from_arrow(submissions)
+        if frame.height == 0:
+            return 0
+        if "operator_id" not in frame.columns:
+            frame = frame.with_columns(pl.lit(operator_id).alias("operator_id"))
+
+        with tracker._span("shards.split_batch"):
+            placement = {o: self.shard_for(o) for o in frame["operator_id"].unique().to_list()}
+            parts = frame.with_columns(
+                pl.col("operator_id").replace_strict(placement, return_dtype=pl.Int32).alias("_shard")
+            ).partition_by("_shard", as_dict=True, include_key=False)
+
+        self._cutpoints.clear()
+        sessions = {key[0]: self.session(key[0]) for key in parts}
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            written = pool.map(
+                lambda item: sessions[item[0][0]].submit_weekly_metrics_batch(item[1]),
+                parts.items(),
+            )
+            return sum(written)
+
+    def recompute_derived_metrics(self, operator_ids=None):
+        """Recompute stale baseline-relative metrics on every shard (or the operators' shards)"""
+        self._cutpoints.clear()
+        if operator_ids is None:
+            groups = dict.fromkeys(range(self.shards))
+        else:
+            groups = self._by_shard([operator_ids] if isinstance(operator_ids, str) else operator_ids)
+        return sum(self.session(index).recompute_derived_metrics(ids) for index, ids in groups.items())
+
+    # ------------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------------
+
+    def get_metrics_df(self, operator_id=tracker.DEFAULT_OPERATOR_ID):
+        """Load one operator's metrics from its shard"""
+        return self.session_for(operator_id).get_metrics_df(operator_id)
+
+    def get_operator_ids(self):
+        """Every operator with at least one stored week"""
+        return sorted(o for ids in self._everywhere(tracker.get_operator_ids) for o in ids)
+
+    @tracker._instrumented
+    def get_cohort_metrics_df(self):
+        """Every operator's metrics, read from all shards in parallel"""
+        frames = [df for df in self._everywhere(tracker.get_cohort_metrics_df) if df.height]
+        if not frames:
+            return self.session(0).get_cohort_metrics_df()
+        return pl.concat(frames).sort("operator_id", "week_number")
+
+    @tracker._instrumented
+    def scan_graduation_readiness(self, thresholds=None, cohorts=None, operator_cohorts=None):
+        """scan_graduation_readiness() over all shards (one row per operator)"""
+        frames = self._everywhere(tracker.scan_graduation_readiness, thresholds, cohorts, operator_cohorts)
+        return pl.concat(frames, how="vertical_relaxed").sort("operator_id")
+
+    @tracker._instrumented
+    def build_transformation_reports(self, operator_ids=None, thresholds=None):
+        """{operator_id: TransformationReport}, built on the shards that hold the operators"""
+        if operator_ids is None:
+            args = {index: (None, thresholds) for index in range(self.shards)}
+        else:
+            args = {index: (ids, thresholds) for index, ids in self._by_shard(operator_ids).items()}
+        reports = {}
+        for shard_reports in self._fan_out(tracker.build_transformation_reports, args).values():
+            reports.update(shard_reports)
+        return dict(sorted(reports.items()))
+
+    def build_transformation_report(self, operator_id=tracker.DEFAULT_OPERATOR_ID, thresholds=None):
+        """One operator's TransformationReport (None if no weeks submitted)"""
+        return self.build_transformation_reports([operator_id], thresholds).get(operator_id)
+
+    @tracker._instrumented
+    def get_cohort_distribution(self, week_number=None):
+        """
+        p25/p50/p75/p90 of each COHORT_PERCENTILE_METRICS per week, over all shards
+
+        Merged from the shards' stored cut points, interpolating each
+        shard's distribution between them, so quartiles are close to (not
+        exactly) the quantiles over the whole cohort.
+        """
+        grouped = _group_cutpoints(self._everywhere(_shard_cutpoints, week_number))
+        rows = []
+        for (week, metric), parts in sorted(grouped.items()):
+            p25, p50, p75, p90 = _merged_quantiles(parts, [0.25, 0.5, 0.75, 0.9])
+            rows.append({
+                "week_number": week,
+                "metric": metric,
+                "operators": sum(operators for operators, _ in parts),
+                "p25": p25, "p50": p50, "p75": p75, "p90": p90,
+            })
+        return pl.DataFrame(rows, schema={
+            "week_number": pl.Int32,
+            "metric": pl.Utf8,
+            "operators": pl.Int32,
+            "p25": pl.Float64,
+            "p50": pl.Float64,
+            "p75": pl.Float64,
+            "p90": pl.Float64,
+        })
+
+    @tracker._instrumented
+    def get_percentile_ranks(self, operator_id=tracker.DEFAULT_OPERATOR_ID, week_number=None):
+        """
+        An operator's percentile rank (0-100) within the whole cohort, per metric
+
+        The operator's row comes from its shard; the week's cut points from
+        every shard, kept until the next write through this tracker.
+        Defaults to the operator's latest week; {} if there is no such week.
+        """
+        df = self.get_metrics_df(operator_id)
+        if week_number is not None:
+            df = df.filter(pl.col("week_number") == week_number)
+        if df.height == 0:
+            return {}
+        row = df.row(-1, named=True)
+
+        week = row["week_number"]
+        parts = self._cutpoints.get(week)
+        if parts is None:
+            grouped = _group_cutpoints(self._everywhere(_shard_cutpoints, week))
+            parts = {metric: grouped.get((week, metric), []) for metric in tracker.COHORT_PERCENTILE_METRICS}
+            self._cutpoints[week] = parts
+
+        return {
+            metric: _merged_rank(parts[metric], row[metric])
+            for metric in tracker.COHORT_PERCENTILE_METRICS
+        }
+
+# ============================================================================
+# RESHARDING
+# ============================================================================
+
+def _copy_operators(source, target, operator_ids):
+    """
+    Copy operators' weeks and history from one session into another
+
+    Replaces whatever the target held for them and refreshes its derived
+    tables, in one transaction. Returns the number of weeks copied.
+    """
+    ids = ", ".join(tracker._sql_literal(o) for o in operator_ids)
+    src = source.cursor()
+    metrics = src.execute(f"SELECT * FROM {tracker.TABLE_NAME} WHERE operator_id IN ({ids})").pl()
+    history = src.execute(f"SELECT * FROM {tracker.HISTORY_TABLE} WHERE operator_id IN ({ids})").pl()
+
+    con = target.cursor()
+    target._ensure_schema(con)
+    con.register("_moved_metrics", metrics)
+    con.register("_moved_history", history)
+    with target._write_lock:
+        try:
+            con.begin()
+            con.execute(f"DELETE FROM {tracker.TABLE_NAME} WHERE operator_id IN ({ids})")
+            stored = ", ".join(tracker.STORED_COLUMNS)
+            con.execute(f"INSERT INTO {tracker.TABLE_NAME} ({stored}) SELECT {stored} FROM _moved_metrics")
+            con.execute(f"DELETE FROM {tracker.HISTORY_TABLE} WHERE operator_id IN ({ids})")
+            con.execute(f"INSERT INTO {tracker.HISTORY_TABLE} SELECT * FROM _moved_history")
+            # Later versions of the moved weeks must number above theirs
+            con.execute(f"""
+                UPDATE {tracker.STATE_TABLE}
+                SET value = greatest(value, (SELECT COALESCE(MAX(version), 0) FROM _moved_history))
+                WHERE key = 'write_generation'
+            """)
+            tracker._refresh_cohort_stats(con, operator_ids=operator_ids)
+            # Weeks the target held but the source doesn't must leave the index
+            tracker._unindex_search_documents(con, f"operator_id IN ({ids})")
+            tracker._queue_search_index(
+                con, f"SELECT operator_id, week_number FROM {tracker.TABLE_NAME} WHERE operator_id IN ({ids})"
+            )
+            tracker._bump_write_generation(con)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        finally:
+            con.unregister("_moved_metrics")
+            con.unregister("_moved_history")
+    tracker._clear_cutpoint_cache(target.db_path)
+    return metrics.height
+
+def _remove_operators(session, operator_ids):
+    """Delete operators' weeks, history and index entries, refreshing the cohort statistics"""
+    ids = ", ".join(tracker._sql_literal(o) for o in operator_ids)
+    con = session.cursor()
+    with session._write_lock:
+        try:
+            con.begin()
+            weeks = [row[0] for row in con.execute(f"""
+                SELECT DISTINCT week_number FROM {tracker.TABLE_NAME} WHERE operator_id IN ({ids})
+            """).fetchall()]
+            tracker._unindex_search_documents(con, f"operator_id IN ({ids})")
+            con.execute(f"DELETE FROM {tracker.SEARCH_PENDING_TABLE} WHERE operator_id IN ({ids})")
+            con.execute(f"DELETE FROM {tracker.TABLE_NAME} WHERE operator_id IN ({ids})")
+            con.execute(f"DELETE FROM {tracker.HISTORY_TABLE} WHERE operator_id IN ({ids})")
+            tracker._refresh_cohort_stats(con, weeks=weeks)
+            tracker._bump_write_generation(con)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+    tracker._clear_cutpoint_cache(session.db_path)
+
+@tracker._instrumented
+def shard_database(source_path=tracker.DB_PATH, directory=DEFAULT_SHARD_DIR, shards=DEFAULT_SHARDS):
+    """
+    Split an existing tracker database into a new shard directory
+
+    The source is only read. Returns ReshardStats.
+    """
+    start = time.perf_counter()
+    manifest = create_shards(directory, shards)
+    paths = [Path(directory) / name for name in manifest["files"]]
+
+    moved = rows = 0
+    with tracker.TrackerSession(str(source_path), read_only=True) as source:
+        groups = {}
+        for operator_id in source.get_operator_ids():
+            groups.setdefault(shard_for(operator_id, shards), []).append(operator_id)
+        for index, operator_ids in sorted(groups.items()):
+            with tracker.TrackerSession(str(paths[index])) as target:
+                rows += _copy_operators(source, target, operator_ids)
+            moved += len(operator_ids)
+
+    stats = ReshardStats(1, shards, moved, rows, time.perf_counter() - start)
+    print(f"🧩 Sharded {source_path} into {shards} shard(s): {stats.operators_moved} operator(s), "
+          f"{stats.rows_moved:,} week(s) ({stats.seconds:.2f}s)")
+    return stats
+
+@tracker._instrumented
+def rebalance_shards(directory=DEFAULT_SHARD_DIR, shards=DEFAULT_SHARDS):
+    """
+    Change the number of shards, moving only the operators whose shard changes
+
+    Run it with the writers stopped. Operators are copied to their new
+    shard before they are removed from the old one, and the manifest
+    switches last, so an interrupted rebalance can simply be run again.
+    Returns ReshardStats.
+    """
+    if shards < 1:
+        raise ValueError("Need at least one shard")
+
+    start = time.perf_counter()
+    manifest = _require_manifest(directory)
+    before = manifest["shards"]
+    target_files = [_shard_file(i) for i in range(shards)]
+    # Leftover files of an interrupted rebalance are drained as well
+    files = sorted(set(manifest["files"]) | set(target_files))
+
+    for name in target_files:
+        if not (Path(directory) / name).exists():
+            _init_shard(Path(directory) / name)
+
+    sessions = {name: tracker.TrackerSession(str(Path(directory) / name)) for name in files}
+    moved = rows = 0
+    try:
+        moves = {}
+        for name, session in sessions.items():
+            for operator_id in session.get_operator_ids():
+                target = target_files[shard_for(operator_id, shards)]
+                if target != name:
+                    moves.setdefault((name, target), []).append(operator_id)
+
+        for (source, target), operator_ids in sorted(moves.items()):
+            rows += _copy_operators(sessions[source], sessions[target], operator_ids)
+            _remove_operators(sessions[source], operator_ids)
+            moved += len(operator_ids)
+    finally:
+        for session in sessions.values():
+            session.close()
+
+    _write_manifest(directory, _new_manifest(shards))
+    for name in files:
+        if name not in target_files:
+            for path in (Path(directory) / name, Path(directory) / f"{name}.wal"):
+                if path.exists():
+                    path.unlink()
+
+    stats = ReshardStats(before, shards, moved, rows, time.perf_counter() - start)
+    print(f"🧩 Rebalanced {directory}/ from {before} to {shards} shard(s): "
+          f"{stats.operators_moved} operator(s), {stats.rows_moved:,} week(s) moved ({stats.seconds:.2f}s)")
+    return stats
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create, fill or resize a tracker shard directory")
+    parser.add_argument("--dir", default=DEFAULT_SHARD_DIR, help="shard directory")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS,
+                        help="shard count for a new directory")
+    parser.add_argument("--from", dest="source", default=None,
+                        help="shard this existing tracker database into a new directory")
+    parser.add_argument("--rebalance", type=int, default=None, metavar="N",
+                        help="move the directory's operators onto N shards")
+    args = parser.parse_args()
+
+    if args.source:
+        shard_database(args.source, args.dir, args.shards)
+    elif args.rebalance:
+        rebalance_shards(args.dir, args.rebalance)
+    elif _read_manifest(args.dir) is None:
+        create_shards(args.dir, args.shards)
+
+    manifest = _require_manifest(args.dir)
+    for name in manifest["files"]:
+        size = os.path.getsize(Path(args.dir) / name) / 1e6
+        print(f"   {name}: {size:.1f} MB")
@@ -0,0 +1,337 @@
+"""
+Billion Transformation Tracker - Metrics Snapshots
+Serve read-heavy dashboards from files instead of the live database
+
+refresh_snapshot() exports transformation_metrics to a snapshot directory,
+one partition per week, as Parquet (compact, for analysis tools) and as
+uncompressed Arrow IPC (memory-mapped by readers, so every process shares
+one copy of the data through the OS page cache). Readers never open DuckDB
+and never compete with writers.
+
+Refreshes are incremental: only weeks whose rows changed since the last
+snapshot are rewritten. A manifest lists the files of the current version
+and is swapped atomically, so readers always see one consistent version.
+
+    snapshot/
+        manifest.json
+        parquet/week_number=3/part-000007.parquet
+        arrow/week_number=3/part-000007.arrow
+
+Usage:
+    from billion_snapshot import refresh_snapshot, get_snapshot_metrics_df
+    refresh_snapshot("snapshot")                    # writer side, e.g. after submissions
+    df = get_snapshot_metrics_df("alice", "snapshot")   # any number of reader processes
+
+    python billion_snapshot.py --dir snapshot --every 60   # keep refreshing
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import polars as pl
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_SNAPSHOT_DIR = "snapshot"
+MANIFEST_NAME = "manifest.json"
+
+# Compression of the Parquet copy (the Arrow copy stays uncompressed so it
+# can be memory-mapped)
+PARQUET_COMPRESSION = "zstd"
+
+class SnapshotStats(NamedTuple):
+    """Outcome of a snapshot refresh"""
+    version: int
+    weeks_written: int
+    weeks_unchanged: int
+    weeks_removed: int
+    rows: int
+    seconds: float
+
+class SnapshotInfo(NamedTuple):
+    """What the current snapshot holds"""
+    version: int
+    created_at: datetime
+    rows: int
+    weeks: int
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def _read_manifest(snapshot_dir):
+    path = Path(snapshot_dir) / MANIFEST_NAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+def _write_manifest(snapshot_dir, manifest):
+    """Replace the manifest atomically (readers see the old or the new one)"""
+    path = Path(snapshot_dir) / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _manifest_files(manifest):
+    if manifest is None:
+        return set()
+    return {
+        path
+        for partition in manifest["partitions"].values()
+        for path in (partition["parquet"], partition["arrow"])
+    }
+
+def snapshot_info(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Version, creation time, rows and weeks of the current snapshot (None if there is none)"""
+    manifest = _read_manifest(snapshot_dir)
+    if manifest is None:
+        return None
+    return SnapshotInfo(
+        version=manifest["version"],
+        created_at=datetime.fromisoformat(manifest["created_at"]),
+        rows=manifest["rows"],
+        weeks=len(manifest["partitions"]),
+    )
+
+# ============================================================================
+# WRITING (REFRESH)
+# ============================================================================
+
+def _week_fingerprints(con):
+    """Row count and an order-independent hash of every row, per week"""
+    columns = ", ".join(tracker.METRIC_COLUMNS)
+    return {
+        str(week): {"rows": rows, "fingerprint": str(fingerprint)}
+        for week, rows, fingerprint in con.execute(f"""
+            SELECT week_number, COUNT(*), bit_xor(hash({columns}))
+            FROM {tracker.TABLE_NAME}
+            GROUP BY week_number
+        """).fetchall()
+    }
+
+def _write_week(con, snapshot_dir, week, version):
+    """Write one week's partition in both formats; returns the relative paths"""
+    parquet_path = f"parquet/week_number={week}/part-{version:06d}.parquet"
+    arrow_path = f"arrow/week_number={week}/part-{version:06d}.arrow"
+    for path in (parquet_path, arrow_path):
+        (Path(snapshot_dir) / path).parent.mkdir(parents=True, exist_ok=True)
+
+    query = f"""
+        SELECT * FROM {tracker.TABLE_NAME}
+        WHERE week_number = {int(week)}
+        ORDER BY operator_id
+    """
+    quoted = str(Path(snapshot_dir) / parquet_path).replace("'", "''")
+    con.execute(f"COPY ({query}) TO '{quoted}' (FORMAT PARQUET, COMPRESSION {PARQUET_COMPRESSION})")
+
+    # Streamed into the IPC file a batch at a time (same Arrow types as
+    # DataFrame.write_ipc, so partitions of earlier versions still concatenate)
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    writer = None
+    try:
+        for batch in tracker._iter_polars(con, query, operation="refresh_snapshot"):
+            table = batch.to_arrow(compat_level=pl.CompatLevel.newest())
+            if writer is None:
+                writer = pa.ipc.new_file(str(Path(snapshot_dir) / arrow_path), table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return parquet_path, arrow_path
+
+def _remove_unreferenced(snapshot_dir, keep):
+    """Delete partition files no kept manifest points to, and empty week folders"""
+    root = Path(snapshot_dir)
+    for layout in ("parquet", "arrow"):
+        for path in (root / layout).glob("week_number=*/part-*"):
+            if path.relative_to(root).as_posix() not in keep:
+                path.unlink()
+        for folder in (root / layout).glob("week_number=*"):
+            if not any(folder.iterdir()):
+                folder.rmdir()
+
+@tracker._instrumented
+def refresh_snapshot(snapshot_dir=DEFAULT_SNAPSHOT_DIR, session=None, full=False):
+    """
+    Export transformation_metrics to the snapshot directory
+
+    Only weeks whose rows changed since the last refresh are rewritten
+    (pass full=True to rewrite everything). The new version becomes
+    visible to readers in one atomic manifest swap. Files of the version
+    before are kept one more refresh so readers that just opened it can
+    finish. Returns SnapshotStats.
+    """
+    start = time.perf_counter()
+    session = session or tracker.get_session()
+    con = session.cursor()
+    Path(snapshot_dir).mkdir(parents=True, exist_ok=True)
+
+    previous = _read_manifest(snapshot_dir)
+    old_partitions = {} if previous is None or full else previous["partitions"]
+    version = 1 if previous is None else previous["version"] + 1
+
+    # One transaction: fingerprints and partitions come from the same state
+    con.begin()
+    try:
+        with tracker._span("refresh_snapshot.fingerprint"):
+            current = _week_fingerprints(con)
+
+        partitions = {}
+        written = rows_written = 0
+        with tracker._span("refresh_snapshot.write"):
+            for week, state in sorted(current.items(), key=lambda item: int(item[0])):
+                old = old_partitions.get(week)
+                if old is not None and old["fingerprint"] == state["fingerprint"] and old["rows"] == state["rows"]:
+                    partitions[week] = old
+                    continue
+                parquet_path, arrow_path = _write_week(con, snapshot_dir, week, version)
+                partitions[week] = {**state, "parquet": parquet_path, "arrow": arrow_path}
+                written += 1
+                rows_written += state["rows"]
+    finally:
+        con.rollback()
+
+    removed = len(set(old_partitions) - set(current))
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "rows": sum(state["rows"] for state in current.values()),
+        "columns": tracker.METRIC_COLUMNS,
+        "partitions": partitions,
+    }
+    if written or removed or previous is None or full:
+        _write_manifest(snapshot_dir, manifest)
+        _remove_unreferenced(snapshot_dir, _manifest_files(manifest) | _manifest_files(previous))
+    else:
+        # Nothing changed: keep the published version
+        manifest = previous
+        version = previous["version"]
+
+    tracker._count("rows_written", "refresh_snapshot", rows_written)
+
+    stats = SnapshotStats(
+        version=version,
+        weeks_written=written,
+        weeks_unchanged=len(current) - written,
+        weeks_removed=removed,
+        rows=manifest["rows"],
+        seconds=time.perf_counter() - start,
+    )
+    print(f"📸 Snapshot v{stats.version}: {stats.weeks_written} week(s) written, "
+          f"{stats.weeks_unchanged} unchanged, {stats.rows:,} rows ({stats.seconds:.2f}s)")
+    return stats
+
+# ============================================================================
+# READING
+# ============================================================================
+
+# Memory-mapped frame of the snapshot version last loaded, per directory
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+def _empty_frame(manifest):
+    return pl.DataFrame(schema=dict.fromkeys(manifest["columns"], pl.Null))
+
+def _require_manifest(snapshot_dir):
+    manifest = _read_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot in {snapshot_dir}, run refresh_snapshot() first")
+    return manifest
+
+def load_snapshot(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """
+    The whole snapshot as a DataFrame backed by the memory-mapped Arrow files
+
+    Nothing is copied into the process: pages are read from the OS page
+    cache on use and shared with every other reader. The frame is reused
+    until a newer snapshot version is published.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    manifest = _require_manifest(snapshot_dir)
+    key = str(Path(snapshot_dir).resolve())
+
+    with _loaded_lock:
+        cached = _loaded.get(key)
+        if cached is not None and cached[0] == manifest["version"]:
+            return cached[1]
+
+    if not manifest["partitions"]:
+        df = _empty_frame(manifest)
+    else:
+        tables = [
+            pa.ipc.open_file(pa.memory_map(str(Path(snapshot_dir) / partition["arrow"]))).read_all()
+            for _, partition in sorted(manifest["partitions"].items(), key=lambda item: int(item[0]))
+        ]
+        df = pl.from_arrow(pa.concat_tables(tables), rechunk=False)
+
+    with _loaded_lock:
+        _loaded[key] = (manifest["version"], df)
+    return df
+
+def scan_snapshot(snapshot_dir=DEFAULT_SNAPSHOT_DIR, format="parquet"):
+    """
+    Lazily scan the current snapshot as a Polars LazyFrame
+
+    format="parquet" reads the compressed copy (filters and column
+    selection are pushed into the scan); format="arrow" the IPC files.
+    """
+    if format not in ("parquet", "arrow"):
+        raise ValueError(f"Unknown snapshot format: {format}")
+
+    manifest = _require_manifest(snapshot_dir)
+    files = [
+        str(Path(snapshot_dir) / partition[format])
+        for _, partition in sorted(manifest["partitions"].items(), key=lambda item: int(item[0]))
+    ]
+    if not files:
+        return _empty_frame(manifest).lazy()
+    if format == "parquet":
+        return pl.scan_parquet(files, hive_partitioning=False)
+    return pl.scan_ipc(files, hive_partitioning=False)
+
+def get_snapshot_metrics_df(operator_id=tracker.DEFAULT_OPERATOR_ID, snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """One operator's metrics from the snapshot (same frame as get_metrics_df)"""
+    return load_snapshot(snapshot_dir).filter(pl.col("operator_id") == operator_id).sort("week_number")
+
+def get_snapshot_cohort_metrics_df(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """Every operator's metrics from the snapshot (same frame as get_cohort_metrics_df)"""
+    return load_snapshot(snapshot_dir).sort("operator_id", "week_number")
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export transformation_metrics to a snapshot directory")
+    parser.add_argument("--dir", default=DEFAULT_SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--db", default=tracker.DB_PATH, help="tracker database")
+    parser.add_argument("--full", action="store_true", help="rewrite every week")
+    parser.add_argument("--every", type=float, default=None,
+                        help="keep refreshing every N seconds")
+    args = parser.parse_args()
+
+    tracker.DB_PATH = args.db
+    refresh_snapshot(args.dir, full=args.full)
+    while args.every:
+        time.sleep(args.every)
+        refresh_snapshot(args.dir)
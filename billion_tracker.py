@@ -12,183 +12,3243 @@ Weekly scorecard for AI Agency Operators
 # Install required packages (run once)
 # !pip install polars duckdb plotly kaleido
 
-import polars as pl
-import duckdb
-from datetime import datetime, timedelta
+import atexit
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import decimal
+import functools
+import html
+import importlib
+import json
+import math
+import numbers
+import os
+import sys
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from datetime import date, datetime, timedelta
 from pathlib import Path
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
 
-# ============================================================================
-# CONFIGURATION
-# ============================================================================
+class _LazyModule:
+    """
+    Stand-in for a heavy dependency, imported on first attribute access
+
+    Submitting a week only needs duckdb; plotting and Polars are loaded by
+    the functions that use them. On first use the real module replaces the
+    stand-in in this module's namespace.
+    """
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+np = _LazyModule("numpy", "np")
+pl = _LazyModule("polars", "pl")
+duckdb = _LazyModule("duckdb", "duckdb")
+go = _LazyModule("plotly.graph_objects", "go")
+pio = _LazyModule("plotly.io", "pio")
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DB_PATH = "billion_tracker.db"
+
+# Open the default session read-only (e.g. reporting processes reading a
+# replica published by billion_replica while another process writes)
+READ_ONLY = False
+TABLE_NAME = "transformation_metrics"
+
+# Per-week cohort distribution. Batches refresh it as they write; single
+# submissions only queue their week, refreshed before the next read.
+COHORT_STATS_TABLE = "cohort_week_stats"
+COHORT_STATS_PENDING_TABLE = "cohort_stats_pending"
+
+# Tracker bookkeeping (e.g. the write generation), one value per key
+STATE_TABLE = "tracker_state"
+
+# Every version of every stored week, append-only
+HISTORY_TABLE = "metrics_history"
+
+# Inverted index over the free-text columns. Writes only queue the
+# submissions they touched; the queue is indexed before the next search.
+SEARCH_POSTINGS_TABLE = "search_postings"
+SEARCH_DOCUMENTS_TABLE = "search_documents"
+SEARCH_OPERATORS_TABLE = "search_operators"
+SEARCH_TERMS_TABLE = "search_terms"
+SEARCH_PENDING_TABLE = "search_pending"
+
+# Operator used when no operator_id is given (single-operator databases)
+DEFAULT_OPERATOR_ID = "default"
+
+# Column order used by every write path (matches the table schema)
+METRIC_COLUMNS = [
+    "operator_id",
+    "week_number",
+    "submission_date",
+    "total_hours",
+    "automated_hours",
+    "manual_hours",
+    "active_clients",
+    "revenue_ratio",
+    "recurring_revenue_pct",
+    "automated_this_week",
+    "biggest_bottleneck",
+    "automation_index",
+    "time_saved_vs_baseline",
+    "revenue_efficiency_multiple",
+    "client_capacity_score",
+]
+
+# Columns computed from the others on every read (VIRTUAL generated columns,
+# so they take no space). The arithmetic is in DOUBLE, like the Python
+# floats submissions compute them from, with one cast to the column type.
+DERIVED_COLUMNS = {
+    "manual_hours": "CAST(CAST(total_hours AS DOUBLE) - CAST(automated_hours AS DOUBLE) AS FLOAT)",
+    "automation_index": """CAST(CASE WHEN total_hours > 0
+        THEN CAST(automated_hours AS DOUBLE) / CAST(total_hours AS DOUBLE) * 100
+        ELSE 0 END AS FLOAT)""",
+}
+
+# Columns the write paths insert (METRIC_COLUMNS without DERIVED_COLUMNS)
+STORED_COLUMNS = [c for c in METRIC_COLUMNS if c not in DERIVED_COLUMNS]
+
+# Rows per DataFrame yielded by the streaming reads (iter_metrics() and the
+# reporting and export paths built on it)
+ITER_BATCH_ROWS = 100_000
+
+# Input columns accepted by submit_weekly_metrics_batch()
+# (same names as the submit_weekly_metrics() arguments)
+SUBMISSION_COLUMNS = [
+    "week_number",
+    "total_hours_worked",
+    "automated_hours",
+    "active_clients",
+    "revenue_ratio_to_baseline",
+    "recurring_revenue_percentage",
+    "what_i_automated_this_week",
+    "biggest_bottleneck_now",
+]
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+# Off unless enabled here, with enable_instrumentation() or through the
+# BILLION_TRACKER_INSTRUMENTATION=1 environment variable
+_instrumentation_enabled = os.environ.get("BILLION_TRACKER_INSTRUMENTATION", "").lower() in ("1", "true", "yes")
+
+# Upper bounds (seconds) of the Prometheus histogram buckets for spans
+SPAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class TrackerStats:
+    """
+    In-process registry of timing spans and counters
+
+    Spans are named after the public function ("submit_weekly_metrics")
+    or one of its phases ("submit_weekly_metrics.upsert"). Counters are
+    keyed by metric and operation, e.g. ("rows_fetched", "get_metrics_df").
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+
+    def record_span(self, name, seconds):
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "min_seconds": seconds,
+                    "max_seconds": seconds,
+                    "buckets": [0] * len(SPAN_BUCKETS),
+                }
+            span["count"] += 1
+            span["total_seconds"] += seconds
+            span["min_seconds"] = min(span["min_seconds"], seconds)
+            span["max_seconds"] = max(span["max_seconds"], seconds)
+            for i, bound in enumerate(SPAN_BUCKETS):
+                if seconds <= bound:
+                    span["buckets"][i] += 1
+                    break
+
+    def increment(self, metric, operation, value=1):
+        key = (metric, operation)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self):
+        """Spans and counters as plain dicts (safe to keep or serialize)"""
+        with self._lock:
+            spans = {
+                name: dict(span, buckets=list(span["buckets"]),
+                           mean_seconds=span["total_seconds"] / span["count"])
+                for name, span in sorted(self._spans.items())
+            }
+            counters = {}
+            for (metric, operation), value in sorted(self._counters.items()):
+                counters.setdefault(metric, {})[operation] = value
+        return {"enabled": _instrumentation_enabled, "spans": spans, "counters": counters}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self):
+        """The registry in the Prometheus text exposition format"""
+        def label(value):
+            return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP billion_tracker_span_seconds Time spent in tracker functions and their phases",
+            "# TYPE billion_tracker_span_seconds histogram",
+        ]
+        for name, span in snapshot["spans"].items():
+            cumulative = 0
+            for bound, count in zip(SPAN_BUCKETS, span["buckets"]):
+                cumulative += count
+                lines.append(f'billion_tracker_span_seconds_bucket{{span="{label(name)}",le="{bound}"}} {cumulative}')
+            lines.append(f'billion_tracker_span_seconds_bucket{{span="{label(name)}",le="+Inf"}} {span["count"]}')
+            lines.append(f'billion_tracker_span_seconds_sum{{span="{label(name)}"}} {span["total_seconds"]!r}')
+            lines.append(f'billion_tracker_span_seconds_count{{span="{label(name)}"}} {span["count"]}')
+
+        for metric, values in snapshot["counters"].items():
+            lines.append(f"# TYPE billion_tracker_{metric}_total counter")
+            for operation, value in values.items():
+                lines.append(f'billion_tracker_{metric}_total{{operation="{label(operation)}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write a Prometheus text file (atomically, for node_exporter's textfile collector)"""
+        self._write(path, self.to_prometheus())
+
+    def write_json(self, path):
+        self._write(path, self.to_json(indent=2) + "\n")
+
+    @staticmethod
+    def _write(path, text):
+        tmp_path = f"{path}.tmp"
+        Path(tmp_path).write_text(text)
+        os.replace(tmp_path, path)
+
+_stats = TrackerStats()
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _stats.record_span(self.name, time.perf_counter() - self.start)
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+def _span(name):
+    """Time a phase: `with _span("get_metrics_df.query"): ...`"""
+    return _Span(name) if _instrumentation_enabled else _NO_SPAN
+
+def _count(metric, operation, value=1):
+    if _instrumentation_enabled:
+        _stats.increment(metric, operation, value)
+
+def _instrumented(fn):
+    """Record calls, errors and total time of a public function when enabled"""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _instrumentation_enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            _stats.increment("errors", name)
+            raise
+        finally:
+            _stats.record_span(name, time.perf_counter() - start)
+
+    return wrapper
+
+def _fetch_polars(cursor, query, params=None, operation="query"):
+    """Run a query and return a Polars DataFrame, recording query/conversion time"""
+    if not _instrumentation_enabled:
+        return cursor.execute(query, params).pl()
+    with _span(f"{operation}.query"):
+        result = cursor.execute(query, params)
+    with _span(f"{operation}.to_polars"):
+        df = result.pl()
+    _stats.increment("rows_fetched", operation, df.height)
+    _stats.increment("bytes_fetched", operation, df.estimated_size())
+    return df
+
+def _iter_polars(cursor, query, params=None, batch_size=ITER_BATCH_ROWS, operation="query"):
+    """
+    Run a query and yield its result as Polars DataFrames of at most
+    `batch_size` rows, streamed from DuckDB's Arrow record-batch reader
+
+    Only the current batch is held in memory. Nothing else may run on
+    `cursor` until the iteration ends.
+    """
+    with _span(f"{operation}.query"):
+        result = cursor.execute(query, params)
+    # to_arrow_reader() replaces fetch_record_batch() from DuckDB 1.4
+    if hasattr(result, "to_arrow_reader"):
+        reader = result.to_arrow_reader(batch_size)
+    else:
+        reader = result.fetch_record_batch(batch_size)
+    for batch in reader:
+        df = pl.from_arrow(batch)
+        if _instrumentation_enabled:
+            _stats.increment("rows_fetched", operation, df.height)
+            _stats.increment("bytes_fetched", operation, df.estimated_size())
+        yield df
+
+def enable_instrumentation(enabled=True):
+    """Turn timing spans and counters on (or off with enabled=False)"""
+    global _instrumentation_enabled
+    _instrumentation_enabled = bool(enabled)
+
+def disable_instrumentation():
+    enable_instrumentation(False)
+
+def get_stats():
+    """
+    The instrumentation registry
+
+        enable_instrumentation()
+        submit_weekly_metrics(...)
+        get_stats().snapshot()                      # plain dicts
+        get_stats().write_prometheus("tracker.prom")
+        get_stats().write_json("tracker_stats.json")
+    """
+    return _stats
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+def _sql_literal(value):
+    """
+    Render a Python value as a DuckDB SQL literal
+
+    Binding Python parameters makes the duckdb package import numpy and
+    pandas (when installed) to check their types, which is most of the
+    start-up time of a one-row submit. The submit path inlines its values.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, numbers.Real):
+        return f"CAST('{float(value)!r}' AS DOUBLE)"
+    if isinstance(value, decimal.Decimal):
+        # Not a numbers.Real, but bound parameters accepted it; the metric
+        # columns are floating point either way
+        return f"CAST('{float(value)!r}' AS DOUBLE)"
+    if isinstance(value, datetime):
+        # Naive datetimes are in the database's TimeZone (local time by default)
+        kind = "TIMESTAMP" if value.tzinfo is None else "TIMESTAMPTZ"
+        return f"{kind} '{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    raise TypeError(f"Cannot use {type(value).__name__} as a SQL literal")
+
+def _create_metrics_table(con, table_name):
+    """Create the metrics table, keyed by (operator_id, week_number)"""
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            operator_id VARCHAR NOT NULL,
+            week_number INTEGER NOT NULL,
+            submission_date DATE,
+
+            -- Time tracking (hours)
+            total_hours FLOAT,
+            automated_hours FLOAT,
+            manual_hours FLOAT GENERATED ALWAYS AS ({DERIVED_COLUMNS["manual_hours"]}) VIRTUAL,
+
+            -- Client metrics
+            active_clients INTEGER,
+
+            -- Revenue (stored as ratio to baseline for privacy)
+            revenue_ratio FLOAT,
+
+            -- Subscription transition
+            recurring_revenue_pct FLOAT,
+
+            -- Qualitative tracking
+            automated_this_week TEXT,
+            biggest_bottleneck TEXT,
+
+            -- Calculated fields (the baseline-relative ones stored for
+            -- historical accuracy)
+            automation_index FLOAT GENERATED ALWAYS AS ({DERIVED_COLUMNS["automation_index"]}) VIRTUAL,
+            time_saved_vs_baseline FLOAT,
+            revenue_efficiency_multiple FLOAT,
+            client_capacity_score FLOAT,
+
+            PRIMARY KEY (operator_id, week_number)
+        )
+    """)
+
+def _table_exists(con, table_name):
+    return con.execute(f"""
+        SELECT COUNT(*) FROM duckdb_tables()
+        WHERE database_name = current_database() AND schema_name = 'main'
+          AND table_name = {_sql_literal(table_name)}
+    """).fetchone()[0] > 0
+
+def _create_state_table(con):
+    """
+    Create the bookkeeping table if missing
+
+    Starts at write generation 0, with a random database_id so results
+    cached on disk are never mistaken for another file's.
+    """
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            key VARCHAR PRIMARY KEY,
+            value BIGINT NOT NULL
+        )
+    """)
+    con.execute(f"""
+        INSERT OR IGNORE INTO {STATE_TABLE} VALUES
+            ('write_generation', 0),
+            ('database_id', CAST(floor(random() * 4e18) AS BIGINT))
+    """)
+
+def _bump_write_generation(con):
+    """Count a change to the metrics table (call inside the writing transaction)"""
+    con.execute(f"UPDATE {STATE_TABLE} SET value = value + 1 WHERE key = 'write_generation'")
+
+# ============================================================================
+# SCHEMA MIGRATIONS
+# ============================================================================
+
+def _migrate_computed_columns(con):
+    """Rewrite the metrics table with manual_hours and automation_index as generated columns"""
+    compact_table = f"{TABLE_NAME}_compact"
+    _create_metrics_table(con, compact_table)
+    con.execute(f"""
+        INSERT INTO {compact_table} ({", ".join(STORED_COLUMNS)})
+        SELECT {", ".join(STORED_COLUMNS)} FROM {TABLE_NAME}
+        ORDER BY operator_id, week_number
+    """)
+    con.execute(f"DROP TABLE {TABLE_NAME}")
+    con.execute(f"ALTER TABLE {compact_table} RENAME TO {TABLE_NAME}")
+    con.execute(f"UPDATE {STATE_TABLE} SET value = 0 WHERE key = 'history_uncompacted'")
+    # Computed automation indexes can differ from the stored ones in the last bit
+    _refresh_cohort_stats(con)
+
+# (version, change, function(con)) in order. Each runs in its own
+# transaction, which records the new version; version 1 is the layout from
+# before versions were recorded.
+MIGRATIONS = [
+    (2, "manual_hours and automation_index computed on read instead of stored", _migrate_computed_columns),
+]
+
+# Layout new databases are created with
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def _schema_version(con):
+    """Layout version of the database"""
+    row = con.execute(f"""
+        SELECT value FROM {STATE_TABLE} WHERE key = 'schema_version'
+    """).fetchone() if _table_exists(con, STATE_TABLE) else None
+    if row is not None:
+        return row[0]
+    # Not recorded yet: the table predates versions (every column stored)
+    # or was just created with the latest layout
+    generated = con.execute(f"""
+        SELECT COUNT(*) FROM duckdb_columns()
+        WHERE database_name = current_database() AND schema_name = 'main'
+          AND table_name = {_sql_literal(TABLE_NAME)} AND column_default IS NOT NULL
+    """).fetchone()[0]
+    return SCHEMA_VERSION if generated else 1
+
+def _migrate_schema(con):
+    """Apply the MIGRATIONS newer than the database; returns the (version, change) pairs applied"""
+    current = _schema_version(con)
+    con.execute(f"INSERT OR IGNORE INTO {STATE_TABLE} VALUES ('schema_version', {int(current)})")
+
+    applied = []
+    for version, change, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            con.begin()
+            with _span(f"migrate_schema.v{version}"):
+                migrate(con)
+            con.execute(f"UPDATE {STATE_TABLE} SET value = {int(version)} WHERE key = 'schema_version'")
+            _bump_write_generation(con)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        print(f"🔧 Migrated database to schema version {version}: {change}")
+        applied.append((version, change))
+    return applied
+
+# ============================================================================
+# VERSION HISTORY
+# ============================================================================
+
+# compact_metrics() re-clusters the metrics table once more versions than
+# this fraction of its rows were written since the last compaction
+HISTORY_COMPACT_FRACTION = 0.1
+
+# Seconds between compaction checks of a MetricsCompactor
+COMPACTION_INTERVAL = 60.0
+
+# A MetricsCompactor checkpoints the WAL into the database file every
+# CHECKPOINT_INTERVAL seconds once it holds CHECKPOINT_WAL_BYTES. That is
+# below DuckDB's automatic checkpoint (16 MB), so writers rarely pay for one
+# inside a commit.
+CHECKPOINT_INTERVAL = 5.0
+CHECKPOINT_WAL_BYTES = 4 * 1024 * 1024
+
+def _create_history_table(con):
+    """
+    Create the version history if missing, seeded with the stored weeks
+
+    Weeks stored before the history existed become version 0, recorded at
+    their submission date. Returns True if the table was created.
+    """
+    if _table_exists(con, HISTORY_TABLE):
+        return False
+
+    con.execute(f"""
+        CREATE TABLE {HISTORY_TABLE} AS
+        SELECT *, CAST(0 AS BIGINT) AS version, now() AS recorded_at
+        FROM {TABLE_NAME}
+        LIMIT 0
+    """)
+    con.execute(f"""
+        INSERT INTO {HISTORY_TABLE}
+        SELECT *, 0, COALESCE(CAST(submission_date AS TIMESTAMPTZ), to_timestamp(0)) AS recorded_at
+        FROM {TABLE_NAME}
+        ORDER BY recorded_at, operator_id, week_number
+    """)
+    con.execute(f"INSERT OR IGNORE INTO {STATE_TABLE} VALUES ('history_uncompacted', 0)")
+    return True
+
+def _append_history(con, written, params=None):
+    """
+    Record the written rows as new versions (call before _bump_write_generation)
+
+    `written` is a query returning the METRIC_COLUMNS of the rows as they
+    are now stored (derived columns are recomputed here exactly as the
+    table computes them). Every row gets the generation the transaction
+    commits as and its start time; a row written twice in one transaction
+    keeps only its last version. Returns the number of versions recorded.
+    """
+    version = f"(SELECT value + 1 FROM {STATE_TABLE} WHERE key = 'write_generation')"
+    # Versions are appended in order, so this only reads the last row group
+    con.execute(f"""
+        DELETE FROM {HISTORY_TABLE}
+        WHERE version = {version}
+          AND (operator_id, week_number) IN (SELECT operator_id, week_number FROM ({written}))
+    """, params)
+    appended = con.execute(f"""
+        INSERT INTO {HISTORY_TABLE}
+        SELECT {", ".join(f"{DERIVED_COLUMNS[c]} AS {c}" if c in DERIVED_COLUMNS else c for c in METRIC_COLUMNS)},
+            {version}, now()
+        FROM ({written})
+    """, params).fetchone()[0]
+    con.execute(f"UPDATE {STATE_TABLE} SET value = value + {int(appended)} WHERE key = 'history_uncompacted'")
+    return appended
+
+def _cluster_metrics_table(con):
+    """Rewrite the metrics table sorted by (operator_id, week_number) (inside the caller's transaction)"""
+    sorted_table = f"{TABLE_NAME}_sorted"
+    _create_metrics_table(con, sorted_table)
+    con.execute(f"""
+        INSERT INTO {sorted_table} ({", ".join(STORED_COLUMNS)})
+        SELECT {", ".join(STORED_COLUMNS)} FROM {TABLE_NAME}
+        ORDER BY operator_id, week_number
+    """)
+    con.execute(f"DROP TABLE {TABLE_NAME}")
+    con.execute(f"ALTER TABLE {sorted_table} RENAME TO {TABLE_NAME}")
+
+# ============================================================================
+# DERIVED METRICS RECOMPUTATION
+# ============================================================================
+
+# Stored metrics are FLOAT; recomputing from the stored (rounded) inputs can
+# differ from the submitted values in the last bits, so only differences
+# larger than this (relative) tolerance count as stale.
+RECOMPUTE_TOLERANCE = 1e-4
+
+_BASELINE_METRICS = [
+    "time_saved_vs_baseline",
+    "revenue_efficiency_multiple",
+    "client_capacity_score",
+]
+
+def _recompute_derived_metrics(con, operator_ids=None):
+    """
+    Recompute baseline-relative metrics with one set-based UPDATE
+
+    Uses the same formulas as submit_weekly_metrics(). Only rows whose
+    stored values are stale are rewritten, each as a new version; returns
+    how many changed. Runs inside the caller's transaction.
+    """
+    operator_filter = ""
+    if operator_ids is not None:
+        if not operator_ids:
+            return 0
+        operator_filter = f"AND m.operator_id IN ({', '.join(_sql_literal(o) for o in operator_ids)})"
+
+    stale = " OR ".join(
+        f"""(
+            (stored.{col} IS NULL) <> (fresh.{col} IS NULL)
+            OR abs(stored.{col} - fresh.{col})
+               > {RECOMPUTE_TOLERANCE} * greatest(1.0, abs(fresh.{col}))
+        )"""
+        for col in _BASELINE_METRICS
+    )
+
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _recomputed AS
+        SELECT fresh.*
+        FROM (
+            SELECT
+                m.operator_id,
+                m.week_number,
+                CASE WHEN b.baseline_hours IS NOT NULL AND m.week_number > 1
+                     THEN b.baseline_hours - m.total_hours
+                     ELSE 0 END AS time_saved_vs_baseline,
+                CASE WHEN b.baseline_hours IS NOT NULL AND m.week_number > 1
+                     THEN (m.revenue_ratio / m.total_hours) / (b.baseline_revenue / b.baseline_hours)
+                     ELSE 1.0 END AS revenue_efficiency_multiple,
+                CASE WHEN b.baseline_hours IS NOT NULL AND m.week_number > 1
+                     THEN (m.active_clients / m.total_hours) / (b.baseline_clients / b.baseline_hours)
+                     ELSE 1.0 END AS client_capacity_score
+            FROM (
+                SELECT
+                    operator_id,
+                    week_number,
+                    CAST(total_hours AS DOUBLE) AS total_hours,
+                    CAST(active_clients AS DOUBLE) AS active_clients,
+                    CAST(revenue_ratio AS DOUBLE) AS revenue_ratio
+                FROM {TABLE_NAME}
+            ) m
+            LEFT JOIN (
+                SELECT
+                    operator_id,
+                    CAST(total_hours AS DOUBLE) AS baseline_hours,
+                    CAST(active_clients AS DOUBLE) AS baseline_clients,
+                    CAST(revenue_ratio AS DOUBLE) AS baseline_revenue
+                FROM {TABLE_NAME}
+                WHERE week_number = 1
+            ) b ON b.operator_id = m.operator_id
+            WHERE TRUE {operator_filter}
+        ) fresh
+        JOIN {TABLE_NAME} stored
+          ON stored.operator_id = fresh.operator_id AND stored.week_number = fresh.week_number
+        WHERE {stale}
+    """)
+
+    changed = con.execute(f"""
+        UPDATE {TABLE_NAME}
+        SET
+            time_saved_vs_baseline = fresh.time_saved_vs_baseline,
+            revenue_efficiency_multiple = fresh.revenue_efficiency_multiple,
+            client_capacity_score = fresh.client_capacity_score
+        FROM _recomputed fresh
+        WHERE {TABLE_NAME}.operator_id = fresh.operator_id
+          AND {TABLE_NAME}.week_number = fresh.week_number
+    """).fetchone()[0]
+    if changed:
+        _append_history(con, f"""
+            SELECT * FROM {TABLE_NAME}
+            WHERE (operator_id, week_number) IN (SELECT operator_id, week_number FROM _recomputed)
+        """)
+    con.execute("DROP TABLE _recomputed")
+    return changed
+
+# ============================================================================
+# COHORT STATISTICS
+# ============================================================================
+
+# Metrics ranked against the rest of the cohort (higher is better)
+COHORT_PERCENTILE_METRICS = [
+    "automation_index",
+    "time_saved_vs_baseline",
+    "revenue_efficiency_multiple",
+    "recurring_revenue_pct",
+]
+
+# Quantile cut points stored per week and metric; percentile ranks are
+# exact to 100 / COHORT_RANK_RESOLUTION percentage points
+COHORT_RANK_RESOLUTION = 1000
+
+def _create_cohort_stats_table(con):
+    """Create the cohort statistics table; returns True if it didn't exist"""
+    if _table_exists(con, COHORT_STATS_TABLE):
+        return False
+
+    con.execute(f"""
+        CREATE TABLE {COHORT_STATS_TABLE} (
+            week_number INTEGER NOT NULL,
+            metric VARCHAR NOT NULL,
+            operators INTEGER,
+            p25 DOUBLE,
+            p50 DOUBLE,
+            p75 DOUBLE,
+            p90 DOUBLE,
+
+            -- Value at each 1/COHORT_RANK_RESOLUTION quantile, for percentile ranks
+            cutpoints DOUBLE[],
+
+            PRIMARY KEY (week_number, metric)
+        )
+    """)
+    return True
+
+def _create_cohort_stats_pending_table(con):
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {COHORT_STATS_PENDING_TABLE} (
+            week_number INTEGER NOT NULL
+        )
+    """)
+
+def _cohort_week_filter(weeks, operator_ids):
+    """
+    SQL condition on week_number selecting `weeks` plus every week
+    `operator_ids` have stored; None if there are none
+    """
+    conditions = []
+    if weeks:
+        conditions.append(f"week_number IN ({', '.join(str(int(w)) for w in weeks)})")
+    if operator_ids:
+        conditions.append(f"""week_number IN (
+            SELECT week_number FROM {TABLE_NAME}
+            WHERE operator_id IN ({', '.join(_sql_literal(o) for o in operator_ids)})
+        )""")
+    return " OR ".join(conditions) or None
+
+def _queue_cohort_stats(con, weeks=None, operator_ids=None):
+    """
+    Queue the affected weeks (as for _refresh_cohort_stats) for
+    _refresh_queued_cohort_stats(), inside the caller's transaction
+
+    Like the search queue it has no key, so a week can be queued twice.
+    """
+    week_filter = _cohort_week_filter(weeks, operator_ids)
+    if week_filter is not None:
+        con.execute(f"""
+            INSERT INTO {COHORT_STATS_PENDING_TABLE}
+            SELECT DISTINCT week_number FROM {TABLE_NAME} WHERE {week_filter}
+        """)
+
+def _refresh_queued_cohort_stats(con):
+    """Refresh every queued week in one pass; returns how many weeks were queued"""
+    weeks = [week for week, in con.execute(f"""
+        SELECT DISTINCT week_number FROM {COHORT_STATS_PENDING_TABLE}
+    """).fetchall()]
+    if weeks:
+        _refresh_cohort_stats(con, weeks)
+        con.execute(f"DELETE FROM {COHORT_STATS_PENDING_TABLE}")
+    return len(weeks)
+
+def _refresh_cohort_stats(con, weeks=None, operator_ids=None):
+    """
+    Recompute the cohort distribution of the affected weeks
+
+    Affected are `weeks` plus every week `operator_ids` have stored (their
+    baseline-relative metrics may have changed); both None means all
+    weeks (and empties the queue). Runs inside the caller's transaction.
+    """
+    if weeks is None and operator_ids is None:
+        week_filter = "TRUE"
+        con.execute(f"DELETE FROM {COHORT_STATS_PENDING_TABLE}")
+    else:
+        week_filter = _cohort_week_filter(weeks, operator_ids)
+        if week_filter is None:
+            return
+
+    # Cut point i interpolates the sorted values at quantile i / resolution,
+    # as quantile_cont() does (one sort instead of a quantile per cut point)
+    resolution = COHORT_RANK_RESOLUTION
+    position = f"(i * (operators - 1) / {resolution})"
+    lower = f"floor({position})::BIGINT + 1"
+
+    con.execute(f"DELETE FROM {COHORT_STATS_TABLE} WHERE {week_filter}")
+    con.execute(f"""
+        INSERT INTO {COHORT_STATS_TABLE}
+        SELECT
+            week_number,
+            metric,
+            operators,
+            quartiles[1] AS p25,
+            quartiles[2] AS p50,
+            quartiles[3] AS p75,
+            quartiles[4] AS p90,
+            list_transform(range(0, {resolution} + 1), i ->
+                sorted[{lower}]
+                + ({position} - floor({position})) * (sorted[least({lower} + 1, operators)] - sorted[{lower}])
+            ) AS cutpoints
+        FROM (
+            SELECT
+                week_number,
+                metric,
+                COUNT(*) AS operators,
+                quantile_cont(value, [0.25, 0.5, 0.75, 0.9]) AS quartiles,
+                list_sort(list(value)) AS sorted
+            FROM (
+                UNPIVOT (
+                    SELECT
+                        week_number,
+                        {", ".join(f"CAST({m} AS DOUBLE) AS {m}" for m in COHORT_PERCENTILE_METRICS)}
+                    FROM {TABLE_NAME}
+                    WHERE {week_filter}
+                )
+                ON {", ".join(COHORT_PERCENTILE_METRICS)}
+                INTO NAME metric VALUE value
+            )
+            GROUP BY week_number, metric
+        )
+    """)
+
+def _percentile_rank(cutpoints, value):
+    """Share of the cohort (0-100) scoring below `value`, like SQL percent_rank()"""
+    if value is None or not cutpoints:
+        return None
+    return bisect.bisect_left(cutpoints, value) / (len(cutpoints) - 1) * 100
+
+# Cut points of the weeks ranked so far, per database path:
+# db_path -> (generation, {(file, week_number): {metric: cutpoints}}), where
+# `file` is the session's _file_version() from when it opened the path. A
+# session on a replaced file (a newly published replica) therefore never
+# reads the old file's cut points, and every write through this process
+# bumps the generation, so a read that raced a write is never cached.
+_cutpoint_cache = {}
+_cutpoint_cache_lock = threading.Lock()
+
+def _clear_cutpoint_cache(db_path):
+    with _cutpoint_cache_lock:
+        generation, _ = _cutpoint_cache.get(db_path, (0, None))
+        _cutpoint_cache[db_path] = (generation + 1, {})
+
+# ============================================================================
+# TEXT SEARCH INDEX
+# ============================================================================
+
+# Free-text columns that are indexed (each one is a separately ranked field)
+SEARCH_FIELDS = ["automated_this_week", "biggest_bottleneck"]
+
+# Words too common to help ranking
+SEARCH_STOPWORDS = [
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i", "in",
+    "is", "it", "its", "my", "of", "on", "or", "so", "that", "the", "this",
+    "to", "was", "we", "with",
+]
+
+# BM25 term-frequency saturation and document-length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Postings are kept sorted by term so a search only reads the row groups of
+# its terms; rows appended since the last sort are scanned in full. Batch
+# writes re-sort once this share of the postings is unsorted.
+SEARCH_COMPACT_FRACTION = 0.1
+
+def _search_tokens(text):
+    """
+    SQL turning a text expression into its list of search terms
+
+    Lowercased letter/digit runs without stopwords, with a light suffix
+    stemmer so "onboarding", "onboarded" and "onboard" match, as do
+    "invoices" and "invoice". Queries go through the same expression.
+    """
+    stopwords = "[" + ", ".join(_sql_literal(word) for word in SEARCH_STOPWORDS) + "]"
+    stem = "regexp_replace(t, '^(.{3,})(ing|ed)$', '\\1')"
+    stem = f"regexp_replace({stem}, '^(.{{2,}}[^s])s$', '\\1')"
+    stem = f"regexp_replace({stem}, '^(.{{3,}})e$', '\\1')"
+    return f"""list_transform(
+        list_filter(
+            string_split_regex(lower({text}), '[^\\p{{L}}\\p{{N}}]+'),
+            t -> length(t) > 1 AND NOT list_contains({stopwords}, t)
+        ),
+        t -> {stem}
+    )"""
+
+def _create_postings_table(con, table_name):
+    # No primary key: an ART index on the postings would outweigh the
+    # table. Submissions are identified by small integers that compress
+    # well and make the scans of deletes and lookups cheap.
+    con.execute(f"""
+        CREATE TABLE {table_name} (
+            term VARCHAR NOT NULL,
+            field VARCHAR NOT NULL,
+            operator_key INTEGER NOT NULL,
+            week_number INTEGER NOT NULL,
+            tf INTEGER NOT NULL,           -- Occurrences of the term in the field
+            doc_length INTEGER NOT NULL    -- Terms in the field
+        )
+    """)
+
+def _create_documents_table(con, table_name):
+    # The indexed text is kept with the index so results don't need
+    # lookups in the metrics table
+    con.execute(f"""
+        CREATE TABLE {table_name} (
+            operator_key INTEGER NOT NULL,
+            operator_id VARCHAR NOT NULL,
+            week_number INTEGER NOT NULL,
+            {", ".join(f"{field} VARCHAR" for field in SEARCH_FIELDS)}
+        )
+    """)
+
+def _create_search_tables(con):
+    """Create the search index tables; returns True if they didn't exist"""
+    if _table_exists(con, SEARCH_POSTINGS_TABLE):
+        return False
+
+    con.execute(f"""
+        CREATE TABLE {SEARCH_OPERATORS_TABLE} (
+            operator_key INTEGER NOT NULL,
+            operator_id VARCHAR NOT NULL
+        )
+    """)
+    _create_documents_table(con, SEARCH_DOCUMENTS_TABLE)
+    _create_postings_table(con, SEARCH_POSTINGS_TABLE)
+    # Number of submissions containing each term, per field
+    con.execute(f"""
+        CREATE TABLE {SEARCH_TERMS_TABLE} (
+            term VARCHAR NOT NULL,
+            field VARCHAR NOT NULL,
+            documents INTEGER NOT NULL,
+
+            PRIMARY KEY (term, field)
+        )
+    """)
+    # Per field: submissions with text and their total terms; and postings
+    # appended since the last sort
+    con.execute(f"""
+        INSERT OR IGNORE INTO {STATE_TABLE} VALUES
+        {", ".join(f"('search_documents.{field}', 0), ('search_terms.{field}', 0)" for field in SEARCH_FIELDS)},
+        ('search_unsorted_postings', 0)
+    """)
+    return True
+
+def _create_search_pending_table(con):
+    con.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SEARCH_PENDING_TABLE} (
+            operator_id VARCHAR NOT NULL,
+            week_number INTEGER NOT NULL
+        )
+    """)
+
+def _queue_search_index(con, written, params=None):
+    """
+    Queue written submissions for indexing
+
+    `written` is a query returning (at least) operator_id and week_number
+    of the written rows. Runs inside the caller's transaction, so the
+    queue commits with the rows; tokenizing waits for _index_queued_search().
+    The queue has no key (an index makes emptying it slow), so a week
+    written twice is queued twice.
+    """
+    con.execute(f"""
+        INSERT INTO {SEARCH_PENDING_TABLE}
+        SELECT DISTINCT operator_id, week_number FROM ({written})
+    """, params)
+
+def _index_queued_search(con):
+    """
+    Index every queued submission in one pass (inside the caller's
+    transaction)
+
+    Queued weeks that are no longer stored are dropped from the queue.
+    A queue covering most of the table (a bulk load) re-indexes it whole,
+    which is cheaper than replacing entries. Returns how many weeks were
+    queued.
+    """
+    queued, stored = con.execute(f"""
+        SELECT
+            (SELECT COUNT(*) FROM (SELECT DISTINCT operator_id, week_number FROM {SEARCH_PENDING_TABLE})),
+            (SELECT COUNT(*) FROM {TABLE_NAME})
+    """).fetchone()
+    if not queued:
+        return 0
+    if queued * 2 >= stored:
+        _refresh_search_index(con)
+        return queued
+    _refresh_search_index(con, f"""
+        SELECT m.operator_id, m.week_number, {", ".join(f"m.{field}" for field in SEARCH_FIELDS)}
+        FROM {TABLE_NAME} m
+        JOIN (SELECT DISTINCT operator_id, week_number FROM {SEARCH_PENDING_TABLE}) p
+          ON p.operator_id = m.operator_id AND p.week_number = m.week_number
+    """)
+    con.execute(f"DELETE FROM {SEARCH_PENDING_TABLE}")
+    _compact_search_index(con)
+    return queued
+
+def _add_search_stats(con, tokens_table, sign):
+    """Add (sign=1) or remove (sign=-1) the corpus statistics of tokenized submissions"""
+    totals = con.execute(f"""
+        SELECT {", ".join(
+            f"COUNT(*) FILTER (WHERE len({field}_tokens) > 0), COALESCE(SUM(len({field}_tokens)), 0)"
+            for field in SEARCH_FIELDS
+        )}
+        FROM {tokens_table}
+    """).fetchone()
+    for i, field in enumerate(SEARCH_FIELDS):
+        for key, value in ((f"search_documents.{field}", totals[2 * i]), (f"search_terms.{field}", totals[2 * i + 1])):
+            if value:
+                con.execute(f"UPDATE {STATE_TABLE} SET value = value + {sign * int(value)} WHERE key = '{key}'")
+
+    con.execute(f"""
+        INSERT INTO {SEARCH_TERMS_TABLE}
+        SELECT term, field, {int(sign)} * COUNT(*)
+        FROM (
+            SELECT field, unnest(list_distinct(tokens)) AS term
+            FROM (SELECT {", ".join(f"{field}_tokens AS {field}" for field in SEARCH_FIELDS)} FROM {tokens_table})
+            UNPIVOT (tokens FOR field IN ({", ".join(SEARCH_FIELDS)}))
+        )
+        GROUP BY term, field
+        ON CONFLICT DO UPDATE SET documents = documents + excluded.documents
+    """)
+    if sign < 0:
+        con.execute(f"DELETE FROM {SEARCH_TERMS_TABLE} WHERE documents <= 0")
+
+def _refresh_search_index(con, written=None, params=None):
+    """
+    Re-index the submissions whose text may have changed
+
+    `written` is a query returning operator_id, week_number and the
+    SEARCH_FIELDS of the written rows; None re-indexes the whole table
+    (and empties the queue). Runs inside the caller's transaction.
+    """
+    if written is None:
+        for table in (SEARCH_POSTINGS_TABLE, SEARCH_DOCUMENTS_TABLE, SEARCH_TERMS_TABLE, SEARCH_PENDING_TABLE):
+            con.execute(f"DELETE FROM {table}")
+        con.execute(f"""
+            UPDATE {STATE_TABLE} SET value = 0
+            WHERE key LIKE 'search_documents.%' OR key LIKE 'search_terms.%'
+        """)
+        changed = TABLE_NAME
+    else:
+        con.execute(f"CREATE OR REPLACE TEMP TABLE _search_changed AS {written}", params)
+        changed = "_search_changed"
+
+    # Operators seen for the first time get the next keys
+    con.execute(f"""
+        INSERT INTO {SEARCH_OPERATORS_TABLE}
+        SELECT
+            (SELECT COALESCE(MAX(operator_key), 0) FROM {SEARCH_OPERATORS_TABLE})
+                + ROW_NUMBER() OVER (ORDER BY operator_id),
+            operator_id
+        FROM (SELECT DISTINCT operator_id FROM {changed}) c
+        WHERE NOT EXISTS (SELECT 1 FROM {SEARCH_OPERATORS_TABLE} o WHERE o.operator_id = c.operator_id)
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _search_tokens AS
+        SELECT
+            o.operator_key,
+            c.operator_id,
+            c.week_number,
+            {", ".join(f"c.{field}, {_search_tokens(f'c.{field}')} AS {field}_tokens" for field in SEARCH_FIELDS)}
+        FROM {changed} c
+        JOIN {SEARCH_OPERATORS_TABLE} o ON o.operator_id = c.operator_id
+    """)
+
+    # Resubmitted weeks replace their old entries; new weeks (the usual
+    # case) have nothing to delete
+    if written is not None:
+        _unindex_search_documents(
+            con, "(operator_key, week_number) IN (SELECT operator_key, week_number FROM _search_tokens)"
+        )
+
+    con.execute(f"""
+        INSERT INTO {SEARCH_DOCUMENTS_TABLE}
+        SELECT operator_key, operator_id, week_number, {", ".join(SEARCH_FIELDS)}
+        FROM _search_tokens
+    """)
+    _add_search_stats(con, "_search_tokens", 1)
+    inserted = con.execute(f"""
+        INSERT INTO {SEARCH_POSTINGS_TABLE}
+        SELECT term, field, operator_key, week_number, COUNT(*) AS tf, ANY_VALUE(len(tokens)) AS doc_length
+        FROM (
+            SELECT field, operator_key, week_number, tokens, unnest(tokens) AS term
+            FROM (
+                SELECT operator_key, week_number, {", ".join(f"{field}_tokens AS {field}" for field in SEARCH_FIELDS)}
+                FROM _search_tokens
+            )
+            UNPIVOT (tokens FOR field IN ({", ".join(SEARCH_FIELDS)}))
+        )
+        GROUP BY term, field, operator_key, week_number
+        ORDER BY term
+    """).fetchone()[0]
+
+    # A full rebuild is written in term order
+    unsorted = f"value + {int(inserted)}" if written is not None else "0"
+    con.execute(f"UPDATE {STATE_TABLE} SET value = {unsorted} WHERE key = 'search_unsorted_postings'")
+    con.execute("DROP TABLE _search_tokens")
+    con.execute("DROP TABLE IF EXISTS _search_changed")
+
+def _unindex_search_documents(con, condition):
+    """
+    Remove the indexed submissions matching `condition` (on the documents
+    table) and their share of the corpus statistics
+
+    Runs inside the caller's transaction; returns how many were removed.
+    """
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _search_replaced AS
+        SELECT
+            operator_key,
+            week_number,
+            {", ".join(f"{_search_tokens(field)} AS {field}_tokens" for field in SEARCH_FIELDS)}
+        FROM {SEARCH_DOCUMENTS_TABLE}
+        WHERE {condition}
+    """)
+    old_terms = [row[0] for row in con.execute(f"""
+        SELECT DISTINCT unnest({" || ".join(f"COALESCE({field}_tokens, [])" for field in SEARCH_FIELDS)})
+        FROM _search_replaced
+    """).fetchall()]
+    removed = con.execute("SELECT COUNT(*) FROM _search_replaced").fetchone()[0]
+    if removed:
+        _add_search_stats(con, "_search_replaced", -1)
+        con.execute(f"""
+            DELETE FROM {SEARCH_DOCUMENTS_TABLE}
+            WHERE (operator_key, week_number) IN (SELECT operator_key, week_number FROM _search_replaced)
+        """)
+    if old_terms:
+        # Naming the old terms lets the scan skip every other term's row
+        # groups (worth it for a few submissions, not for a big batch)
+        term_filter = f"term IN ({', '.join(_sql_literal(t) for t in old_terms)}) AND" if len(old_terms) <= 1000 else ""
+        con.execute(f"""
+            DELETE FROM {SEARCH_POSTINGS_TABLE}
+            WHERE {term_filter} (operator_key, week_number) IN (SELECT operator_key, week_number FROM _search_replaced)
+        """)
+    con.execute("DROP TABLE _search_replaced")
+    return removed
+
+def _compact_search_index(con, force=False):
+    """
+    Rewrite the postings in term order and the documents in key order
+    (inside the caller's transaction)
+
+    Skipped unless forced or more than SEARCH_COMPACT_FRACTION of the
+    postings were appended since the last sort. Returns True if rewritten.
+    """
+    unsorted = con.execute(f"""
+        SELECT value FROM {STATE_TABLE} WHERE key = 'search_unsorted_postings'
+    """).fetchone()[0]
+    total = con.execute(f"SELECT COUNT(*) FROM {SEARCH_POSTINGS_TABLE}").fetchone()[0]
+    if not force and unsorted <= SEARCH_COMPACT_FRACTION * total:
+        return False
+
+    for table, create, order in (
+        (SEARCH_POSTINGS_TABLE, _create_postings_table, "term"),
+        (SEARCH_DOCUMENTS_TABLE, _create_documents_table, "operator_key, week_number"),
+    ):
+        sorted_table = f"{table}_sorted"
+        create(con, sorted_table)
+        con.execute(f"INSERT INTO {sorted_table} SELECT * FROM {table} ORDER BY {order}")
+        con.execute(f"DROP TABLE {table}")
+        con.execute(f"ALTER TABLE {sorted_table} RENAME TO {table}")
+    con.execute(f"UPDATE {STATE_TABLE} SET value = 0 WHERE key = 'search_unsorted_postings'")
+    return True
+
+# ============================================================================
+# TRACKER SESSION (CONNECTION MANAGEMENT)
+# ============================================================================
+
+class TrackerSession:
+    """
+    A long-lived connection to the tracker database
+
+    Opening the DuckDB file (and replaying its WAL) on every call is the
+    dominant cost for dashboards that poll, so a session opens it once and
+    keeps it open until close(). Each thread gets its own cursor on the
+    shared database, so a session can be used from worker threads.
+
+        with TrackerSession("cohort.db", threads=4, memory_limit="2GB") as session:
+            session.submit_weekly_metrics(...)
+            df = session.get_metrics_df()
+
+    The module-level functions (init_database, submit_weekly_metrics, ...)
+    use a default session on DB_PATH, see get_session().
+    """
+
+    def __init__(self, db_path=None, read_only=False, threads=None, memory_limit=None, config=None):
+        self.db_path = db_path or DB_PATH
+        self.read_only = read_only
+
+        # Extra DuckDB settings, e.g. {"preserve_insertion_order": False}
+        settings = dict(config or {})
+        if threads is not None:
+            settings["threads"] = threads
+        if memory_limit is not None:
+            settings["memory_limit"] = memory_limit
+        self.settings = settings
+
+        with _span("session.connect"):
+            self._file = _file_identity(self.db_path)
+            self._con = duckdb.connect(self.db_path, read_only=read_only, config=settings)
+            # Which file this session's cached cut points belong to
+            self._cutpoint_file = _file_version(self.db_path)
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()
+        self._cursors = []
+        self._cursors_lock = threading.Lock()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+        # Writes and compaction take turns (compaction replaces the tables)
+        self._write_lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        mode = "read-only" if self.read_only else "read-write"
+        state = "closed" if self.closed else "open"
+        return f"TrackerSession({self.db_path!r}, {mode}, {state})"
+
+    @property
+    def closed(self):
+        return self._con is None
+
+    @property
+    def replaced(self):
+        """True if the database file was swapped for a new one since the session opened it"""
+        current = _file_identity(self.db_path)
+        return self._file is not None and current is not None and current != self._file
+
+    def cursor(self):
+        """Return this thread's connection to the session database"""
+        if self._con is None:
+            raise RuntimeError("TrackerSession is closed")
+
+        if threading.get_ident() == self._owner_thread:
+            return self._con
+
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            cur = self._con.cursor()
+            self._local.cursor = cur
+            with self._cursors_lock:
+                self._cursors.append(cur)
+        return cur
+
+    def _stream_cursor(self):
+        """
+        A new cursor for one streamed result (the caller closes it)
+
+        Streams don't share the thread's cursor, so the caller can keep
+        querying while it iterates.
+        """
+        if self._con is None:
+            raise RuntimeError("TrackerSession is closed")
+        return self._con.cursor()
+
+    def close(self):
+        """
+        Close every cursor and the underlying connection
+
+        Queued cohort statistics and search indexing are done first, so
+        read-only sessions opened on the file afterwards see every
+        submission.
+        """
+        if self._con is None:
+            return
+        try:
+            if self._schema_ready:
+                self.update_cohort_stats()
+                self.update_search_index()
+        finally:
+            self._close_connection()
+
+    def _close_connection(self):
+        with self._cursors_lock:
+            for cur in self._cursors:
+                cur.close()
+            self._cursors.clear()
+        self._con.close()
+        self._con = None
+
+    # ------------------------------------------------------------------------
+    # Database initialization
+    # ------------------------------------------------------------------------
+
+    def init_database(self):
+        """Initialize DuckDB database with schema"""
+        con = self.cursor()
+
+        if self._is_single_operator_layout():
+            self.migrate_to_multi_operator()
+        else:
+            _create_metrics_table(con, TABLE_NAME)
+        self._ensure_schema(con)
+
+        print("✅ Database initialized successfully")
+
+    def _ensure_schema(self, con):
+        """
+        Create the state, history, cohort statistics and search tables
+        (filled from stored weeks) if missing, and apply pending schema
+        migrations
+
+        Returns the migrations applied.
+        """
+        with self._schema_lock:
+            if self._schema_ready or self.read_only or not _table_exists(con, TABLE_NAME):
+                return []
+            _create_state_table(con)
+            _create_history_table(con)
+            _create_cohort_stats_pending_table(con)
+            if _create_cohort_stats_table(con):
+                _refresh_cohort_stats(con)
+                _clear_cutpoint_cache(self.db_path)
+            _create_search_pending_table(con)
+            if _create_search_tables(con):
+                _refresh_search_index(con)
+            applied = _migrate_schema(con)
+            if applied:
+                _clear_cutpoint_cache(self.db_path)
+            self._schema_ready = True
+            return applied
+
+    def get_schema_version(self):
+        """Layout version of the database (see MIGRATIONS; SCHEMA_VERSION is the latest)"""
+        return _schema_version(self.cursor())
+
+    def migrate_schema(self):
+        """
+        Apply pending schema migrations now
+
+        Any read-write session does this before its first read or write;
+        call it to migrate at a time of your choosing. Waits for in-flight
+        writes. Returns the (version, change) pairs applied.
+        """
+        if self.read_only:
+            raise ValueError("Migrating needs a read-write session")
+        with self._write_lock:
+            return self._ensure_schema(self.cursor())
+
+    def _is_single_operator_layout(self, catalog=None):
+        """True if the metrics table exists without an operator_id column"""
+        columns = [row[0] for row in self.cursor().execute(f"""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_catalog = COALESCE({_sql_literal(catalog)}, current_database())
+              AND table_schema = 'main'
+              AND table_name = {_sql_literal(TABLE_NAME)}
+        """).fetchall()]
+        return bool(columns) and "operator_id" not in columns
+
+    def migrate_to_multi_operator(self, operator_id=DEFAULT_OPERATOR_ID):
+        """
+        One-shot migration of a single-operator database
+
+        Rebuilds the week-keyed table with the (operator_id, week_number)
+        key, assigning every existing week to `operator_id`. Returns the
+        number of rows migrated (0 if the table is already multi-operator).
+        """
+        if not self._is_single_operator_layout():
+            return 0
+
+        con = self.cursor()
+        legacy_table = f"{TABLE_NAME}_single_operator"
+        columns = ", ".join(STORED_COLUMNS[1:])
+
+        try:
+            con.begin()
+            con.execute(f"ALTER TABLE {TABLE_NAME} RENAME TO {legacy_table}")
+            _create_metrics_table(con, TABLE_NAME)
+            con.execute(f"""
+                INSERT INTO {TABLE_NAME} ({", ".join(STORED_COLUMNS)})
+                SELECT ?, {columns} FROM {legacy_table}
+                ORDER BY week_number
+            """, [operator_id])
+            migrated = con.execute(f"SELECT COUNT(*) FROM {legacy_table}").fetchone()[0]
+            con.execute(f"DROP TABLE {legacy_table}")
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+        print(f"✅ Migrated {migrated} week(s) to operator '{operator_id}'")
+        return migrated
+
+    def import_operator_database(self, source_path, operator_id=None):
+        """
+        Copy another tracker database file into this one
+
+        Single-operator files need the `operator_id` their weeks belong to;
+        multi-operator files are copied as they are. Existing rows with the
+        same (operator_id, week_number) are replaced, and the imported
+        operators' baseline-relative metrics are recomputed against the
+        Week 1 they end up with. Returns rows copied.
+        """
+        con = self.cursor()
+        quoted_path = str(source_path).replace("'", "''")
+        con.execute(f"ATTACH '{quoted_path}' AS _import_source (READ_ONLY)")
+
+        try:
+            if self._is_single_operator_layout("_import_source"):
+                if operator_id is None:
+                    raise ValueError(f"{source_path} is a single-operator database, pass operator_id")
+                source = f"SELECT ? AS operator_id, {', '.join(STORED_COLUMNS[1:])} FROM _import_source.main.{TABLE_NAME}"
+                params = [operator_id]
+            else:
+                source = f"SELECT {', '.join(STORED_COLUMNS)} FROM _import_source.main.{TABLE_NAME}"
+                params = []
+
+            self._ensure_schema(con)
+            written = f"""
+                SELECT * FROM {TABLE_NAME}
+                WHERE (operator_id, week_number) IN (SELECT operator_id, week_number FROM ({source}))
+            """
+            with self._write_lock:
+                try:
+                    con.begin()
+                    copied = con.execute(f"""
+                        INSERT OR REPLACE INTO {TABLE_NAME} ({", ".join(STORED_COLUMNS)})
+                        SELECT * FROM ({source})
+                        ORDER BY operator_id, week_number
+                    """, params).fetchone()[0]
+                    _append_history(con, written, params)
+                    # An imported Week 1 changes the baseline of stored later
+                    # weeks, and imported later weeks may have been computed
+                    # against another file's Week 1
+                    operator_ids = [row[0] for row in con.execute(f"""
+                        SELECT DISTINCT operator_id FROM ({source})
+                    """, params).fetchall()]
+                    recomputed = _recompute_derived_metrics(con, operator_ids)
+                    weeks = [row[0] for row in con.execute(f"""
+                        SELECT DISTINCT week_number FROM _import_source.main.{TABLE_NAME}
+                    """).fetchall()]
+                    _refresh_cohort_stats(con, weeks, operator_ids if recomputed else None)
+                    _queue_search_index(con, written, params)
+                    _bump_write_generation(con)
+                    con.commit()
+                except Exception:
+                    con.rollback()
+                    raise
+            _clear_cutpoint_cache(self.db_path)
+        finally:
+            con.execute("DETACH _import_source")
+
+        _count("rows_recomputed", "import_operator_database", recomputed)
+        if recomputed:
+            print(f"🔁 Baseline changed: updated {recomputed} stored week(s)")
+        return copied
+
+    def cluster_by_operator(self):
+        """
+        Rewrite the metrics table sorted by (operator_id, week_number)
+
+        DuckDB skips row groups using per-column min/max statistics, so a
+        table stored in operator order keeps single-operator reads fast even
+        with many thousands of operators. Run this after large imports.
+        """
+        con = self.cursor()
+
+        with self._write_lock:
+            try:
+                con.begin()
+                _cluster_metrics_table(con)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+        con.execute("CHECKPOINT")
+
+    # ------------------------------------------------------------------------
+    # Weekly data entry
+    # ------------------------------------------------------------------------
+
+    def submit_weekly_metrics(
+        self,
+        week_number,
+        total_hours_worked,
+        automated_hours,
+        active_clients,
+        revenue_ratio_to_baseline,
+        recurring_revenue_percentage,
+        what_i_automated_this_week,
+        biggest_bottleneck_now,
+        operator_id=DEFAULT_OPERATOR_ID
+    ):
+        """Submit one week of metrics (see the module-level submit_weekly_metrics)"""
+        con = self.cursor()
+
+        # Stored as INTEGER: work with the value that will be stored
+        week_number = _whole_number(week_number)
+        active_clients = _whole_number(active_clients)
+        # Every ratio divides by the week's hours (and later weeks by Week 1's)
+        if not total_hours_worked > 0:
+            raise ValueError(f"total_hours_worked must be greater than 0, got {total_hours_worked!r}")
+
+        # Calculate derived metrics
+        manual_hours = total_hours_worked - automated_hours
+        automation_index = (automated_hours / total_hours_worked * 100) if total_hours_worked > 0 else 0
+
+        # Get this operator's baseline metrics from Week 1
+        with _span("submit_weekly_metrics.baseline_lookup"):
+            baseline = con.execute(f"""
+                SELECT
+                    total_hours,
+                    active_clients,
+                    revenue_ratio
+                FROM {TABLE_NAME}
+                WHERE operator_id = {_sql_literal(operator_id)} AND week_number = 1
+            """).fetchone()
+
+        if baseline and week_number > 1:
+            baseline_hours, baseline_clients, baseline_revenue = baseline
+            time_saved = baseline_hours - total_hours_worked
+            revenue_efficiency_multiple = (revenue_ratio_to_baseline / total_hours_worked) / (baseline_revenue / baseline_hours)
+            client_capacity_score = (active_clients / total_hours_worked) / (baseline_clients / baseline_hours)
+        else:
+            # Week 1 is the baseline
+            time_saved = 0
+            revenue_efficiency_multiple = 1.0
+            client_capacity_score = 1.0
+
+        # Insert or update (a new Week 1 also refreshes the operator's later weeks)
+        values = [
+            operator_id,
+            week_number,
+            datetime.now().date(),
+            total_hours_worked,
+            automated_hours,
+            manual_hours,
+            active_clients,
+            revenue_ratio_to_baseline,
+            recurring_revenue_percentage,
+            what_i_automated_this_week,
+            biggest_bottleneck_now,
+            automation_index,
+            time_saved,
+            revenue_efficiency_multiple,
+            client_capacity_score
+        ]
+        # The stored row as a query, for the history and search index
+        written = "SELECT " + ", ".join(
+            f"CAST({_sql_literal(value)} AS VARCHAR) AS {column}" if column in SEARCH_FIELDS
+            else f"{_sql_literal(value)} AS {column}"
+            for column, value in zip(METRIC_COLUMNS, values)
+        )
+        self._ensure_schema(con)
+        with self._write_lock:
+            try:
+                con.begin()
+                with _span("submit_weekly_metrics.upsert"):
+                    con.execute(f"""
+                        INSERT OR REPLACE INTO {TABLE_NAME} ({", ".join(STORED_COLUMNS)}) VALUES (
+                            {", ".join(_sql_literal(value) for column, value in zip(METRIC_COLUMNS, values)
+                                       if column not in DERIVED_COLUMNS)}
+                        )
+                    """)
+                with _span("submit_weekly_metrics.history"):
+                    _append_history(con, written)
+                recomputed = 0
+                if week_number == 1:
+                    with _span("submit_weekly_metrics.recompute"):
+                        recomputed = _recompute_derived_metrics(con, [operator_id])
+                with _span("submit_weekly_metrics.cohort_stats"):
+                    _queue_cohort_stats(con, [week_number], [operator_id] if recomputed else None)
+                with _span("submit_weekly_metrics.search_queue"):
+                    _queue_search_index(con, written)
+                _bump_write_generation(con)
+                with _span("submit_weekly_metrics.commit"):
+                    con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        _clear_cutpoint_cache(self.db_path)
+
+        _count("rows_written", "submit_weekly_metrics")
+        _count("rows_recomputed", "submit_weekly_metrics", recomputed)
+
+        print(f"✅ Week {week_number} metrics submitted successfully!")
+        print(f"📊 Automation Index: {automation_index:.1f}%")
+        print(f"⏰ Time Saved vs Baseline: {time_saved:.1f} hours/week")
+        print(f"📈 Revenue Efficiency Multiple: {revenue_efficiency_multiple:.2f}x")
+        if recomputed:
+            print(f"🔁 Baseline changed: updated {recomputed} later week(s)")
+
+    def submit_weekly_metrics_batch(self, submissions, operator_id=DEFAULT_OPERATOR_ID):
+        """Submit many weeks in one transaction (see the module-level submit_weekly_metrics_batch)"""
+        with _span("submit_weekly_metrics_batch.prepare"):
+            frame = submissions if isinstance(submissions, pl.DataFrame) else pl.from_arrow(submissions)
+
+            missing = [c for c in SUBMISSION_COLUMNS if c not in frame.columns]
+            if missing:
+                raise ValueError(f"Batch is missing required columns: {', '.join(missing)}")
+
+            if frame.height == 0:
+                return 0
+
+            if "operator_id" not in frame.columns:
+                frame = frame.with_columns(pl.lit(operator_id).alias("operator_id"))
+
+            # Rejected up front like submit_weekly_metrics() does, instead of
+            # storing ratios divided by zero
+            no_hours = frame.filter(
+                ~(pl.col("total_hours_worked").cast(pl.Float64, strict=False) > 0).fill_null(False)
+            )
+            if no_hours.height:
+                weeks = ", ".join(
+                    f"{operator} week {week}"
+                    for operator, week in no_hours.select("operator_id", "week_number").head(5).iter_rows()
+                )
+                raise ValueError(f"total_hours_worked must be greater than 0 ({no_hours.height} row(s): {weeks})")
+
+            frame = frame.select(["operator_id"] + SUBMISSION_COLUMNS).with_row_index("_row")
+
+        con = self.cursor()
+        self._ensure_schema(con)
+        con.register("_incoming_batch", frame)
+
+        with self._write_lock:
+            try:
+                con.begin()
+                with _span("submit_weekly_metrics_batch.upsert"):
+                    con.execute(f"""
+                        CREATE OR REPLACE TEMP TABLE _batch_rows AS
+                        WITH incoming AS (
+                            -- Last submission wins when a week is repeated in the batch
+                            SELECT * REPLACE (CAST(operator_id AS VARCHAR) AS operator_id)
+                            FROM _incoming_batch
+                            QUALIFY ROW_NUMBER() OVER (
+                                PARTITION BY operator_id, week_number ORDER BY _row DESC
+                            ) = 1
+                        ),
+                        baseline AS (
+                            -- Each operator's Week 1 from the batch takes precedence over the
+                            -- stored one. Values are read back as FLOAT, exactly as the
+                            -- per-row path sees them.
+                            SELECT
+                                operator_id,
+                                CAST(baseline_hours AS DOUBLE) AS baseline_hours,
+                                CAST(baseline_clients AS DOUBLE) AS baseline_clients,
+                                CAST(baseline_revenue AS DOUBLE) AS baseline_revenue
+                            FROM (
+                                SELECT
+                                    operator_id,
+                                    CAST(total_hours_worked AS FLOAT) AS baseline_hours,
+                                    CAST(active_clients AS INTEGER) AS baseline_clients,
+                                    CAST(revenue_ratio_to_baseline AS FLOAT) AS baseline_revenue,
+                                    0 AS source
+                                FROM incoming
+                                WHERE week_number = 1
+                                UNION ALL
+                                SELECT operator_id, total_hours, active_clients, revenue_ratio, 1 AS source
+                                FROM {TABLE_NAME}
+                                WHERE week_number = 1
+                                  AND operator_id IN (SELECT operator_id FROM incoming)
+                            )
+                            QUALIFY ROW_NUMBER() OVER (PARTITION BY operator_id ORDER BY source) = 1
+                        ),
+                        typed AS (
+                            SELECT
+                                operator_id,
+                                CAST(week_number AS INTEGER) AS week_number,
+                                CAST(total_hours_worked AS DOUBLE) AS total_hours,
+                                CAST(automated_hours AS DOUBLE) AS automated_hours,
+                                CAST(active_clients AS INTEGER) AS active_clients,
+                                CAST(revenue_ratio_to_baseline AS DOUBLE) AS revenue_ratio,
+                                CAST(recurring_revenue_percentage AS DOUBLE) AS recurring_revenue_pct,
+                                CAST(what_i_automated_this_week AS VARCHAR) AS automated_this_week,
+                                CAST(biggest_bottleneck_now AS VARCHAR) AS biggest_bottleneck
+                            FROM incoming
+                        )
+                        SELECT
+                            t.operator_id,
+                            t.week_number,
+                            ? AS submission_date,
+                            t.total_hours,
+                            t.automated_hours,
+                            t.total_hours - t.automated_hours AS manual_hours,
+                            t.active_clients,
+                            t.revenue_ratio,
+                            t.recurring_revenue_pct,
+                            t.automated_this_week,
+                            t.biggest_bottleneck,
+                            CASE WHEN t.total_hours > 0
+                                 THEN t.automated_hours / t.total_hours * 100
+                                 ELSE 0 END AS automation_index,
+                            CASE WHEN b.baseline_hours IS NOT NULL AND t.week_number > 1
+                                 THEN b.baseline_hours - t.total_hours
+                                 ELSE 0 END AS time_saved_vs_baseline,
+                            CASE WHEN b.baseline_hours IS NOT NULL AND t.week_number > 1
+                                 THEN (t.revenue_ratio / t.total_hours) / (b.baseline_revenue / b.baseline_hours)
+                                 ELSE 1.0 END AS revenue_efficiency_multiple,
+                            CASE WHEN b.baseline_hours IS NOT NULL AND t.week_number > 1
+                                 THEN (t.active_clients / t.total_hours) / (b.baseline_clients / b.baseline_hours)
+                                 ELSE 1.0 END AS client_capacity_score
+                        FROM typed t
+                        LEFT JOIN baseline b ON b.operator_id = t.operator_id
+                        -- Keep the table clustered by operator for fast per-operator reads
+                        ORDER BY t.operator_id, t.week_number
+                    """, [datetime.now().date()])
+                    written = con.execute(f"""
+                        INSERT OR REPLACE INTO {TABLE_NAME} ({", ".join(STORED_COLUMNS)})
+                        SELECT {", ".join(STORED_COLUMNS)} FROM _batch_rows
+                    """).fetchone()[0]
+
+                with _span("submit_weekly_metrics_batch.history"):
+                    _append_history(con, "SELECT * FROM _batch_rows")
+
+                # Stored weeks outside the batch still point at the old baseline
+                with _span("submit_weekly_metrics_batch.recompute"):
+                    new_baselines = [row[0] for row in con.execute("""
+                        SELECT DISTINCT CAST(operator_id AS VARCHAR) FROM _incoming_batch WHERE week_number = 1
+                    """).fetchall()]
+                    recomputed = _recompute_derived_metrics(con, new_baselines) if new_baselines else 0
+                with _span("submit_weekly_metrics_batch.cohort_stats"):
+                    weeks = [row[0] for row in con.execute("""
+                        SELECT DISTINCT week_number FROM _incoming_batch
+                    """).fetchall()]
+                    _refresh_cohort_stats(con, weeks, new_baselines if recomputed else None)
+                with _span("submit_weekly_metrics_batch.search_queue"):
+                    _queue_search_index(con, "SELECT * FROM _batch_rows")
+                _bump_write_generation(con)
+                con.execute("DROP TABLE _batch_rows")
+                with _span("submit_weekly_metrics_batch.commit"):
+                    con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            finally:
+                con.unregister("_incoming_batch")
+        _clear_cutpoint_cache(self.db_path)
+
+        _count("rows_written", "submit_weekly_metrics_batch", written)
+        _count("rows_recomputed", "submit_weekly_metrics_batch", recomputed)
+
+        print(f"✅ {written} weekly submission(s) saved in one batch!")
+        if recomputed:
+            print(f"🔁 Baseline changed: updated {recomputed} stored week(s)")
+        return written
+
+    def recompute_derived_metrics(self, operator_ids=None):
+        """
+        Bring stored baseline-relative metrics in line with current Week 1 rows
+
+        Runs as one UPDATE over the whole table (or only `operator_ids`)
+        and rewrites just the rows whose stored values are stale. Returns
+        the number of rows changed.
+        """
+        con = self.cursor()
+        if isinstance(operator_ids, str):
+            operator_ids = [operator_ids]
+
+        self._ensure_schema(con)
+        with self._write_lock:
+            try:
+                con.begin()
+                with _span("recompute_derived_metrics.update"):
+                    changed = _recompute_derived_metrics(con, operator_ids)
+                if changed:
+                    with _span("recompute_derived_metrics.cohort_stats"):
+                        _refresh_cohort_stats(con, operator_ids=operator_ids)
+                    _bump_write_generation(con)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        _clear_cutpoint_cache(self.db_path)
+
+        _count("rows_recomputed", "recompute_derived_metrics", changed)
+        return changed
+
+    # ------------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------------
+
+    def get_metrics_df(self, operator_id=DEFAULT_OPERATOR_ID):
+        """Load one operator's metrics as Polars DataFrame"""
+        return _fetch_polars(self.cursor(), f"""
+            SELECT * FROM {TABLE_NAME}
+            WHERE operator_id = ?
+            ORDER BY week_number
+        """, [operator_id], operation="get_metrics_df")
+
+    def scan_metrics(
+        self,
+        operator_id=DEFAULT_OPERATOR_ID,
+        columns=None,
+        week_from=None,
+        week_to=None,
+        head=None,
+        tail=None
+    ):
+        """
+        Lazily scan one operator's metrics as a Polars LazyFrame
+
+        Nothing is read until the frame is collected. Column selection,
+        the week range and head/tail limits become part of the DuckDB query,
+        as do any columns Polars prunes and any .head(n) applied to the
+        LazyFrame, so only the rows and columns used are transferred.
+        Rows are ordered by week_number.
+        """
+        if head is not None and tail is not None:
+            raise ValueError("Pass either head or tail, not both")
+
+        schema = self.cursor().execute(f"SELECT * FROM {TABLE_NAME} LIMIT 0").pl().schema
+        if columns is not None:
+            unknown = [c for c in columns if c not in schema]
+            if unknown:
+                raise ValueError(f"Unknown metric columns: {', '.join(unknown)}")
+            schema = {c: schema[c] for c in columns}
+
+        def source(with_columns, predicate, n_rows, batch_size):
+            wanted = list(with_columns) if with_columns is not None else list(schema)
+            # The predicate may need columns the projection dropped
+            fetched = list(wanted)
+            if predicate is not None:
+                fetched += [c for c in predicate.meta.root_names() if c not in fetched]
+            if not fetched:
+                fetched = ["week_number"]
+
+            where = ["operator_id = ?"]
+            params = [operator_id]
+            if week_from is not None:
+                where.append("week_number >= ?")
+                params.append(week_from)
+            if week_to is not None:
+                where.append("week_number <= ?")
+                params.append(week_to)
+
+            # A row limit can only be pushed down when no filter follows it
+            limit = head
+            if n_rows is not None and predicate is None and tail is None:
+                limit = n_rows if limit is None else min(limit, n_rows)
+
+            order = "DESC" if tail is not None else "ASC"
+            if tail is not None:
+                limit = tail
+
+            query = f"""
+                SELECT {", ".join(fetched)} FROM {TABLE_NAME}
+                WHERE {" AND ".join(where)}
+                ORDER BY week_number {order}
+            """
+            if limit is not None:
+                query += f" LIMIT {int(limit)}"
+
+            df = _fetch_polars(self.cursor(), query, params, operation="scan_metrics")
+            if tail is not None:
+                df = df.reverse()
+            if predicate is not None:
+                df = df.filter(predicate)
+            if n_rows is not None:
+                df = df.head(n_rows)
+            yield df.select(wanted)
+
+        from polars.io.plugins import register_io_source
+
+        return register_io_source(source, schema=schema)
+
+    def iter_metrics(
+        self,
+        columns=None,
+        operator_ids=None,
+        week_from=None,
+        week_to=None,
+        predicate=None,
+        batch_size=ITER_BATCH_ROWS,
+        ordered=False,
+        whole_operators=False
+    ):
+        """
+        Stream stored metrics as Polars DataFrames of at most `batch_size` rows
+
+        Reads `columns` (all by default) of the weeks in week_from..week_to
+        of `operator_ids` (everyone by default); `predicate`, a Polars
+        expression, filters each batch. Only one batch is in memory at a
+        time. Rows come in storage order (grouped by operator after
+        compact_metrics()), or by operator and week with ordered=True; that
+        sort runs in DuckDB, which spills it to disk past the session's
+        memory_limit. whole_operators=True implies ordered and never splits
+        an operator's weeks across batches (a batch may then run over by
+        one operator's weeks).
+        """
+        if columns is not None:
+            unknown = [c for c in columns if c not in METRIC_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown metric columns: {', '.join(unknown)}")
+        wanted = list(columns) if columns is not None else list(METRIC_COLUMNS)
+
+        # The predicate and the operator split may need columns the caller didn't ask for
+        fetched = list(wanted)
+        if predicate is not None:
+            fetched += [c for c in predicate.meta.root_names() if c not in fetched]
+        if whole_operators and "operator_id" not in fetched:
+            fetched.append("operator_id")
+
+        where, params = [], []
+        if operator_ids is not None:
+            operator_ids = [operator_ids] if isinstance(operator_ids, str) else list(operator_ids)
+            if not operator_ids:
+                return
+            where.append(f"operator_id IN ({', '.join('?' for _ in operator_ids)})")
+            params += operator_ids
+        if week_from is not None:
+            where.append("week_number >= ?")
+            params.append(week_from)
+        if week_to is not None:
+            where.append("week_number <= ?")
+            params.append(week_to)
+
+        query = f"""
+            SELECT {", ".join(fetched)} FROM {TABLE_NAME}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            {"ORDER BY operator_id, week_number" if ordered or whole_operators else ""}
+        """
+
+        cur = self._stream_cursor()
+        try:
+            pending = None
+            for df in _iter_polars(cur, query, params, batch_size, operation="iter_metrics"):
+                if predicate is not None:
+                    df = df.filter(predicate)
+                if pending is not None:
+                    df = pl.concat([pending, df])
+                    pending = None
+                if df.height == 0:
+                    continue
+                if whole_operators:
+                    # Hold back the last operator; its weeks may continue in the next batch
+                    last = df["operator_id"].eq(df["operator_id"][-1]).arg_true()[0]
+                    pending = df.slice(last)
+                    df = df.slice(0, last)
+                    if df.height == 0:
+                        continue
+                yield df.select(wanted)
+            if pending is not None:
+                yield pending.select(wanted)
+        finally:
+            cur.close()
+
+    def get_cohort_metrics_df(self):
+        """Load every operator's metrics as one Polars DataFrame"""
+        return _fetch_polars(self.cursor(), f"""
+            SELECT * FROM {TABLE_NAME}
+            ORDER BY operator_id, week_number
+        """, operation="get_cohort_metrics_df")
+
+    def get_operator_ids(self):
+        """List the operators that have submitted at least one week"""
+        return [row[0] for row in self.cursor().execute(f"""
+            SELECT DISTINCT operator_id FROM {TABLE_NAME} ORDER BY operator_id
+        """).fetchall()]
+
+    def get_write_generation(self):
+        """
+        Number of writes to the metrics table so far
+
+        Every submission, batch, recompute and import that changes stored
+        metrics increments it in the same transaction, so derived results
+        can be cached and reused while it is unchanged.
+        """
+        con = self.cursor()
+        self._ensure_schema(con)
+        row = con.execute(f"""
+            SELECT value FROM {STATE_TABLE} WHERE key = 'write_generation'
+        """).fetchone() if _table_exists(con, STATE_TABLE) else None
+        # Read-only session on a database no writer has upgraded yet
+        return row[0] if row else 0
+
+    def get_cache_version(self):
+        """
+        (database id, write generation) for keying cached results
+
+        None when the database has no bookkeeping yet (results are then
+        not cached).
+        """
+        con = self.cursor()
+        self._ensure_schema(con)
+        if not _table_exists(con, STATE_TABLE):
+            return None
+        state = dict(con.execute(f"""
+            SELECT key, value FROM {STATE_TABLE} WHERE key IN ('database_id', 'write_generation')
+        """).fetchall())
+        return state.get("database_id"), state.get("write_generation", 0)
+
+    # ------------------------------------------------------------------------
+    # Cohort statistics
+    # ------------------------------------------------------------------------
+
+    def get_cohort_distribution(self, week_number=None):
+        """Stored p25/p50/p75/p90 of each COHORT_PERCENTILE_METRICS per week (or one week)"""
+        self.update_cohort_stats()
+        week_filter = f"WHERE week_number = {int(week_number)}" if week_number is not None else ""
+        return _fetch_polars(self.cursor(), f"""
+            SELECT week_number, metric, operators, p25, p50, p75, p90
+            FROM {COHORT_STATS_TABLE}
+            {week_filter}
+            ORDER BY week_number, metric
+        """, operation="get_cohort_distribution")
+
+    def get_percentile_ranks(self, operator_id=DEFAULT_OPERATOR_ID, week_number=None):
+        """
+        An operator's percentile rank (0-100) within the cohort, per metric
+
+        Only the operator's row is read; the week's cut points are read
+        once and then kept in memory until the next write, so ranking never
+        touches the rest of the cohort. Defaults to the operator's latest
+        week; returns {} if there is no such week.
+        """
+        con = self.cursor()
+        operator = _sql_literal(operator_id)
+        if week_number is None:
+            week_filter = f"week_number = (SELECT MAX(week_number) FROM {TABLE_NAME} WHERE operator_id = {operator})"
+        else:
+            week_filter = f"week_number = {int(week_number)}"
+
+        row = con.execute(f"""
+            SELECT week_number, {", ".join(COHORT_PERCENTILE_METRICS)}
+            FROM {TABLE_NAME}
+            WHERE operator_id = {operator} AND {week_filter}
+        """).fetchone()
+        if row is None:
+            return {}
+
+        cutpoints = self._week_cutpoints(row[0])
+        return {
+            metric: _percentile_rank(cutpoints.get(metric), value)
+            for metric, value in zip(COHORT_PERCENTILE_METRICS, row[1:])
+        }
+
+    def _week_cutpoints(self, week_number):
+        """
+        A week's stored cut points per metric (cached for the file this
+        session opened, until the next write)
+        """
+        key = (self._cutpoint_file, week_number)
+        with _cutpoint_cache_lock:
+            generation, weeks = _cutpoint_cache.setdefault(self.db_path, (0, {}))
+            cutpoints = weeks.get(key)
+        if cutpoints is not None:
+            return cutpoints
+
+        # Only read-write sessions queue weeks, and their writes clear the
+        # cache in this process, so only a miss can find queued weeks.
+        # Read-only sessions never refresh; publish_replica() and close()
+        # refresh before readers see the file.
+        if self.update_cohort_stats():
+            with _cutpoint_cache_lock:
+                generation, weeks = _cutpoint_cache.setdefault(self.db_path, (0, {}))
+        cutpoints = dict(self.cursor().execute(f"""
+            SELECT metric, cutpoints FROM {COHORT_STATS_TABLE} WHERE week_number = {int(week_number)}
+        """).fetchall())
+        with _cutpoint_cache_lock:
+            if _cutpoint_cache[self.db_path][0] == generation:
+                weeks[key] = cutpoints
+        return cutpoints
+
+    def update_cohort_stats(self):
+        """
+        Refresh the cohort statistics of the weeks single submissions
+        queued
+
+        Reads of the statistics, MetricsCompactor and closing the session
+        call this. Read-only sessions read what the writer refreshed.
+        Returns how many weeks were refreshed.
+        """
+        if self.read_only:
+            return 0
+        con = self.cursor()
+        self._ensure_schema(con)
+        if not con.execute(f"SELECT EXISTS (SELECT 1 FROM {COHORT_STATS_PENDING_TABLE})").fetchone()[0]:
+            return 0
+        with self._write_lock:
+            try:
+                con.begin()
+                with _span("update_cohort_stats.refresh"):
+                    refreshed = _refresh_queued_cohort_stats(con)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        _clear_cutpoint_cache(self.db_path)
+        return refreshed
+
+    def rebuild_cohort_stats(self):
+        """Recompute the cohort statistics of every week; returns the number of weeks"""
+        con = self.cursor()
+        self._ensure_schema(con)
+        with self._write_lock:
+            try:
+                con.begin()
+                _refresh_cohort_stats(con)
+                _bump_write_generation(con)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        _clear_cutpoint_cache(self.db_path)
+        return con.execute(f"SELECT COUNT(DISTINCT week_number) FROM {COHORT_STATS_TABLE}").fetchone()[0]
+
+    # ------------------------------------------------------------------------
+    # Text search
+    # ------------------------------------------------------------------------
+
+    def search_submissions(self, query, fields=None, operator_id=None, week_number=None, limit=20):
+        """
+        Submissions whose free text best matches `query`, ranked by BM25
+
+        Searches SEARCH_FIELDS (or `fields`), each ranked against its own
+        corpus statistics, summing the scores of a submission's fields.
+        Optionally restricted to one operator and/or week. Returns the
+        top `limit` as a DataFrame: operator_id, week_number, score and
+        both text columns.
+        """
+        if fields is None:
+            fields = SEARCH_FIELDS
+        elif isinstance(fields, str):
+            fields = [fields]
+        unknown = [f for f in fields if f not in SEARCH_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown search fields: {', '.join(unknown)} (use {', '.join(SEARCH_FIELDS)})")
+
+        con = self.cursor()
+        self._ensure_schema(con)
+        self.update_search_index()
+        with _span("search_submissions.tokenize"):
+            # NULL matches no term, so a query of only stopwords finds nothing
+            terms = con.execute(f"SELECT list_distinct({_search_tokens(_sql_literal(query))})").fetchone()[0] or [None]
+
+        with _span("search_submissions.corpus_stats"):
+            stats = dict(con.execute(f"""
+                SELECT key, value FROM {STATE_TABLE}
+                WHERE key LIKE 'search_documents.%' OR key LIKE 'search_terms.%'
+            """).fetchall())
+            frequencies = con.execute(f"""
+                SELECT term, field, documents FROM {SEARCH_TERMS_TABLE}
+                WHERE term IN ({", ".join(_sql_literal(t) for t in terms)})
+                  AND field IN ({", ".join(_sql_literal(f) for f in fields)})
+            """).fetchall()
+        if not frequencies:
+            frequencies = [(None, None, 0)]
+
+        # BM25 term weights and average field lengths, inlined as constants
+        idf = " ".join(
+            f"WHEN h.term = {_sql_literal(term)} AND h.field = {_sql_literal(field)} "
+            f"THEN CAST({math.log(1 + (stats[f'search_documents.{field}'] - df + 0.5) / (df + 0.5))!r} AS DOUBLE)"
+            for term, field, df in frequencies if term is not None
+        ) or "WHEN FALSE THEN 0.0"
+        avg_length = " ".join(
+            f"WHEN {_sql_literal(field)} THEN "
+            f"CAST({stats[f'search_terms.{field}'] / max(stats[f'search_documents.{field}'], 1)!r} AS DOUBLE)"
+            for field in fields
+        )
+
+        filters = [
+            f"h.term IN ({', '.join(_sql_literal(term) for term, _, _ in frequencies)})",
+            f"h.field IN ({', '.join(_sql_literal(f) for f in fields)})",
+        ]
+        if operator_id is not None:
+            filters.append(f"""h.operator_key = (
+                SELECT operator_key FROM {SEARCH_OPERATORS_TABLE} WHERE operator_id = {_sql_literal(operator_id)}
+            )""")
+        if week_number is not None:
+            filters.append(f"h.week_number = {int(week_number)}")
+
+        return _fetch_polars(con, f"""
+            WITH scores AS (
+                -- Postings are sorted by term, so only the terms' row groups are read
+                SELECT
+                    h.operator_key,
+                    h.week_number,
+                    SUM(
+                        (CASE {idf} END) * h.tf * ({BM25_K1} + 1)
+                        / (h.tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * h.doc_length / (CASE h.field {avg_length} END)))
+                    ) AS score
+                FROM {SEARCH_POSTINGS_TABLE} h
+                WHERE {" AND ".join(filters)}
+                GROUP BY h.operator_key, h.week_number
+                ORDER BY score DESC, h.operator_key, h.week_number
+                LIMIT {int(limit)}
+            )
+            SELECT d.operator_id, d.week_number, s.score, {", ".join(f"d.{field}" for field in SEARCH_FIELDS)}
+            FROM scores s
+            JOIN {SEARCH_DOCUMENTS_TABLE} d ON d.operator_key = s.operator_key AND d.week_number = s.week_number
+            ORDER BY s.score DESC, d.operator_id, d.week_number
+        """, operation="search_submissions")
+
+    def update_search_index(self):
+        """
+        Index the submissions written since the index was last updated
+
+        Writes only queue what they touched, so a submit doesn't pay for
+        tokenizing; searches, MetricsCompactor and closing the session
+        call this. Read-only sessions search what the writer indexed.
+        Returns how many submissions were indexed.
+        """
+        if self.read_only:
+            return 0
+        con = self.cursor()
+        self._ensure_schema(con)
+        if not con.execute(f"SELECT EXISTS (SELECT 1 FROM {SEARCH_PENDING_TABLE})").fetchone()[0]:
+            return 0
+        with self._write_lock:
+            try:
+                con.begin()
+                with _span("update_search_index.index"):
+                    indexed = _index_queued_search(con)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        _count("rows_indexed", "update_search_index", indexed)
+        return indexed
+
+    def rebuild_search_index(self):
+        """Re-index the free text of every stored week; returns the number of postings"""
+        con = self.cursor()
+        self._ensure_schema(con)
+        with self._write_lock:
+            try:
+                con.begin()
+                _refresh_search_index(con)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        return con.execute(f"SELECT COUNT(*) FROM {SEARCH_POSTINGS_TABLE}").fetchone()[0]
+
+    def compact_search_index(self, force=True):
+        """
+        Re-sort the search postings by term
+
+        Indexing appends postings unsorted; searches stay fast while that
+        tail is small, and indexing re-sorts on its own past
+        SEARCH_COMPACT_FRACTION. Returns True if rewritten.
+        """
+        con = self.cursor()
+        self._ensure_schema(con)
+        with self._write_lock:
+            try:
+                con.begin()
+                compacted = _compact_search_index(con, force)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        if compacted:
+            con.execute("CHECKPOINT")
+        return compacted
+
+    # ------------------------------------------------------------------------
+    # Version history
+    # ------------------------------------------------------------------------
+
+    def get_metrics_history(self, operator_id=DEFAULT_OPERATOR_ID, week_number=None):
+        """Every stored version of an operator's weeks (oldest first), with version and recorded_at"""
+        con = self.cursor()
+        self._ensure_schema(con)
+        week_filter = f"AND week_number = {int(week_number)}" if week_number is not None else ""
+        return _fetch_polars(con, f"""
+            SELECT * FROM {HISTORY_TABLE}
+            WHERE operator_id = {_sql_literal(operator_id)} {week_filter}
+            ORDER BY week_number, version
+        """, operation="get_metrics_history")
+
+    def as_of(self, timestamp, operator_id=None):
+        """
+        The metrics table as it was at `timestamp`
+
+        Same columns as get_cohort_metrics_df() (or get_metrics_df() when
+        `operator_id` is given). Weeks unchanged since `timestamp` come
+        straight from the metrics table; only the weeks written after it
+        are looked up in the history, so recent points in time are cheap.
+        A datetime without tzinfo, or a date (midnight), is local time.
+        """
+        con = self.cursor()
+        self._ensure_schema(con)
+        at = f"CAST({_sql_literal(timestamp)} AS TIMESTAMPTZ)"
+        operator_filter = f"AND operator_id = {_sql_literal(operator_id)}" if operator_id is not None else ""
+        columns = ", ".join(METRIC_COLUMNS)
+
+        return _fetch_polars(con, f"""
+            WITH later AS (
+                SELECT DISTINCT operator_id, week_number
+                FROM {HISTORY_TABLE}
+                WHERE recorded_at > {at} {operator_filter}
+            )
+            SELECT {columns}
+            FROM {TABLE_NAME}
+            WHERE (operator_id, week_number) NOT IN (SELECT operator_id, week_number FROM later)
+              {operator_filter}
+            UNION ALL
+            SELECT {columns}
+            FROM {HISTORY_TABLE}
+            WHERE recorded_at <= {at}
+              AND (operator_id, week_number) IN (SELECT operator_id, week_number FROM later)
+              {operator_filter}
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY operator_id, week_number ORDER BY version DESC) = 1
+            ORDER BY operator_id, week_number
+        """, operation="as_of")
+
+    def compact_metrics(self, force=False):
+        """
+        Re-cluster the metrics table and re-sort the search postings
+
+        Replacing a week deletes its old row and appends the new one at the
+        end of the table, out of operator order. Once more versions than
+        HISTORY_COMPACT_FRACTION of the rows were written since the last
+        compaction (or when forced) the table is rewritten in (operator_id,
+        week_number) order, so current-state reads stay single sorted
+        scans. Waits for in-flight writes. Returns True if it compacted.
+        """
+        con = self.cursor()
+        self._ensure_schema(con)
+        with self._write_lock:
+            try:
+                con.begin()
+                with _span("compact_metrics.check"):
+                    uncompacted = con.execute(f"""
+                        SELECT value FROM {STATE_TABLE} WHERE key = 'history_uncompacted'
+                    """).fetchone()[0]
+                    rows = con.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()[0]
+                compacted = force or uncompacted > HISTORY_COMPACT_FRACTION * rows
+                if compacted:
+                    with _span("compact_metrics.rewrite"):
+                        _cluster_metrics_table(con)
+                        _compact_search_index(con)
+                        con.execute(f"UPDATE {STATE_TABLE} SET value = 0 WHERE key = 'history_uncompacted'")
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+            if compacted:
+                with _span("compact_metrics.checkpoint"):
+                    con.execute("CHECKPOINT")
+        return compacted
+
+    def checkpoint(self, min_wal_bytes=0):
+        """
+        Write the WAL into the database file
+
+        Skipped while the WAL holds less than `min_wal_bytes` (or nothing).
+        Waits for in-flight writes. Returns True if it checkpointed.
+        """
+        if self.read_only:
+            return False
+        try:
+            wal_bytes = os.path.getsize(f"{self.db_path}.wal")
+        except OSError:
+            return False
+        if wal_bytes == 0 or wal_bytes < min_wal_bytes:
+            return False
+        with self._write_lock:
+            with _span("checkpoint"):
+                self.cursor().execute("CHECKPOINT")
+        _count("bytes_checkpointed", "checkpoint", wal_bytes)
+        return True
+
+
+def _file_identity(path):
+    """Device and inode of a database file (None if there is no file)"""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return stat.st_dev, stat.st_ino
+
+def _file_version(path):
+    """Device, inode and modification time of a database file (None if there is no file)"""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+# Session set by use_session(), per thread
+_thread_session = threading.local()
+
+def get_session():
+    """
+    Return the default session used by the module-level functions
+
+    It is opened lazily on DB_PATH (read-only if READ_ONLY is set) and
+    reopened if either changes. A read-only session is also reopened when
+    the file is replaced, so readers of a replica follow each publish.
+    Inside use_session() the thread gets that session instead.
+    """
+    global _default_session
+
+    session = getattr(_thread_session, "session", None)
+    if session is not None:
+        return session
+    with _default_session_lock:
+        session = _default_session
+        if (session is None or session.closed or session.db_path != DB_PATH
+                or session.read_only != READ_ONLY or (READ_ONLY and session.replaced)):
+            if session is not None:
+                session.close()
+            session = TrackerSession(DB_PATH, read_only=READ_ONLY)
+            _default_session = session
+    return session
+
+def close_session():
+    """Close the default session (releases the database file)"""
+    global _default_session
+
+    with _default_session_lock:
+        if _default_session is not None:
+            _default_session.close()
+            _default_session = None
+
+atexit.register(close_session)
+
+@contextlib.contextmanager
+def use_session(session):
+    """
+    Run the module-level functions on `session` in this thread, e.g. to
+    build reports from a session that is already open:
+
+        with use_session(session):
+            reports = build_transformation_reports()
+    """
+    previous = getattr(_thread_session, "session", None)
+    _thread_session.session = session
+    try:
+        yield session
+    finally:
+        _thread_session.session = previous
+
+# ============================================================================
+# DATABASE INITIALIZATION
+# ============================================================================
+
+@_instrumented
+def init_database():
+    """Initialize DuckDB database with schema"""
+    get_session().init_database()
+
+@_instrumented
+def migrate_to_multi_operator(operator_id=DEFAULT_OPERATOR_ID):
+    """Move a single-operator database to the multi-operator schema"""
+    return get_session().migrate_to_multi_operator(operator_id)
+
+@_instrumented
+def import_operator_database(source_path, operator_id=None):
+    """Copy another tracker database file (e.g. one per operator) into DB_PATH"""
+    return get_session().import_operator_database(source_path, operator_id)
+
+@_instrumented
+def cluster_by_operator():
+    """Re-sort stored metrics by operator to keep per-operator reads fast"""
+    get_session().cluster_by_operator()
+
+# ============================================================================
+# WEEKLY DATA ENTRY
+# ============================================================================
+
+@_instrumented
+def submit_weekly_metrics(
+    week_number: int,
+    
+    # Time tracking
+    total_hours_worked: float,
+    automated_hours: float,
+    
+    # Client metrics  
+    active_clients: int,
+    
+    # Revenue (enter as ratio to your Week 1 baseline, e.g., 1.0, 1.2, 1.5)
+    revenue_ratio_to_baseline: float,
+    
+    # Subscription transition (percentage, 0-100)
+    recurring_revenue_percentage: float,
+    
+    # Qualitative
+    what_i_automated_this_week: str,
+    biggest_bottleneck_now: str,
+    
+    # Whose metrics these are (leave as is for a personal tracker)
+    operator_id: str = DEFAULT_OPERATOR_ID
+):
+    """
+    Submit your weekly metrics
+    
+    Privacy Note: Revenue is stored as a ratio to YOUR baseline,
+    never as absolute numbers. Only you know what the baseline represents.
+    """
+    get_session().submit_weekly_metrics(
+        week_number,
+        total_hours_worked,
+        automated_hours,
+        active_clients,
+        revenue_ratio_to_baseline,
+        recurring_revenue_percentage,
+        what_i_automated_this_week,
+        biggest_bottleneck_now,
+        operator_id
+    )
+
+# ============================================================================
+# BULK DATA ENTRY
+# ============================================================================
+
+@_instrumented
+def submit_weekly_metrics_batch(submissions, operator_id=DEFAULT_OPERATOR_ID):
+    """
+    Submit many weeks of metrics in one transaction
+
+    `submissions` is a Polars DataFrame or Arrow table with one row per week,
+    using the same column names as the submit_weekly_metrics() arguments
+    (see SUBMISSION_COLUMNS). An optional `operator_id` column lets one batch
+    cover a whole cohort; without it every row belongs to `operator_id`.
+    Derived metrics are computed in DuckDB against each operator's Week 1
+    baseline and give the same values as submitting each row with
+    submit_weekly_metrics().
+
+    A Week 1 row inside the batch becomes the baseline for that operator's
+    other rows in the batch. If a week appears more than once, the last row
+    wins. Like submit_weekly_metrics(), rows without total_hours_worked
+    above 0 are rejected (a ValueError, nothing is written).
+
+    Returns the number of weeks written.
+    """
+    return get_session().submit_weekly_metrics_batch(submissions, operator_id)
+
+# ============================================================================
+# GROUP COMMIT (WRITE BUFFER)
+# ============================================================================
+
+# Flush triggers of a WriteBuffer
+WRITE_BUFFER_MAX_ROWS = 500
+WRITE_BUFFER_MAX_DELAY = 0.05  # seconds the oldest buffered submission may wait
+
+_GROUP_SCHEMA = {
+    "operator_id": "String",
+    "week_number": "Int64",
+    "total_hours_worked": "Float64",
+    "automated_hours": "Float64",
+    "active_clients": "Int64",
+    "revenue_ratio_to_baseline": "Float64",
+    "recurring_revenue_percentage": "Float64",
+    "what_i_automated_this_week": "String",
+    "biggest_bottleneck_now": "String",
+}
+
+def _whole_number(value):
+    """
+    An INTEGER column's value as DuckDB stores it from a literal: floats
+    (a JSON front end sends 3.0) are rounded half away from zero
+    """
+    if isinstance(value, bool) or not isinstance(value, (numbers.Real, decimal.Decimal)):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    return int(decimal.Decimal(value).to_integral_value(rounding=decimal.ROUND_HALF_UP))
+
+def _coerce_submission(submission):
+    """
+    A submission dict with its numbers converted to the _GROUP_SCHEMA
+    types, so the grouped path takes what submit_weekly_metrics() takes
+    (e.g. week_number=2.0 or active_clients=3.0 from a JSON front end)
+    """
+    coerced = dict(submission)
+    for column, dtype in _GROUP_SCHEMA.items():
+        value = coerced[column]
+        if dtype == "Int64":
+            coerced[column] = _whole_number(value)
+        elif dtype == "Float64" and isinstance(value, (numbers.Real, decimal.Decimal)) and not isinstance(value, bool):
+            coerced[column] = float(value)
+    return coerced
+
+def _write_submission_group(session, submissions):
+    """
+    Write submission dicts (operator_id + SUBMISSION_COLUMNS) as one upsert
+
+    Returns one entry per submission: None if it was committed, otherwise
+    the exception. If the combined write fails, the submissions are
+    retried one by one in order so a bad row only fails itself.
+    """
+    if not submissions:
+        return []
+
+    with _span("write_buffer.flush"):
+        try:
+            rows = [_coerce_submission(s) for s in submissions]
+            frame = pl.DataFrame(
+                {column: [row[column] for row in rows] for column in _GROUP_SCHEMA},
+                schema={column: getattr(pl, dtype) for column, dtype in _GROUP_SCHEMA.items()},
+            )
+            session.submit_weekly_metrics_batch(frame)
+            _count("group_commits", "write_buffer")
+            return [None] * len(submissions)
+        except Exception:
+            if len(submissions) == 1:
+                raise
+
+    results = []
+    for submission in submissions:
+        try:
+            results.extend(_write_submission_group(session, [submission]))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+class WriteBuffer:
+    """
+    Collect submissions in memory and commit them as one multi-row upsert
+
+    At peak, committing every week on its own makes durability the
+    dominant cost. A WriteBuffer flushes once `max_rows` submissions are
+    waiting or the oldest has waited `max_delay` seconds, whichever comes
+    first, using submit_weekly_metrics_batch() (so a Week 1 and later weeks
+    in the same flush still get correct baseline metrics).
+
+        with WriteBuffer() as buffer:
+            ack = buffer.submit(week_number=3, ..., operator_id="alice")
+            ack.result()          # returns once the flush has committed
+
+    submit() returns a concurrent.futures.Future per submission; it raises
+    the error if that submission could not be written. close() (also run
+    at exit) flushes whatever is still buffered.
+    """
+
+    def __init__(self, session=None, max_rows=WRITE_BUFFER_MAX_ROWS, max_delay=WRITE_BUFFER_MAX_DELAY):
+        self.session = session or get_session()
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+
+        self._pending = []
+        self._oldest = None
+        self._flush_requested = False
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="billion-write-buffer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"WriteBuffer(max_rows={self.max_rows}, max_delay={self.max_delay}, pending={len(self._pending)})"
+
+    def submit(
+        self,
+        week_number,
+        total_hours_worked,
+        automated_hours,
+        active_clients,
+        revenue_ratio_to_baseline,
+        recurring_revenue_percentage,
+        what_i_automated_this_week,
+        biggest_bottleneck_now,
+        operator_id=DEFAULT_OPERATOR_ID
+    ):
+        """Buffer one week of metrics; returns a Future resolved after commit"""
+        submission = {
+            "operator_id": operator_id,
+            "week_number": week_number,
+            "total_hours_worked": total_hours_worked,
+            "automated_hours": automated_hours,
+            "active_clients": active_clients,
+            "revenue_ratio_to_baseline": revenue_ratio_to_baseline,
+            "recurring_revenue_percentage": recurring_revenue_percentage,
+            "what_i_automated_this_week": what_i_automated_this_week,
+            "biggest_bottleneck_now": biggest_bottleneck_now,
+        }
+        future = concurrent.futures.Future()
+
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("WriteBuffer is closed")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((submission, future))
+            # Wake the flush thread to start the max_delay timer or to flush
+            if len(self._pending) == 1 or len(self._pending) >= self.max_rows:
+                self._cond.notify()
+
+        return future
+
+    def flush(self):
+        """Commit everything buffered so far; returns how many submissions that was"""
+        with self._cond:
+            futures = [future for _, future in self._pending]
+            self._flush_requested = True
+            self._cond.notify()
+
+        concurrent.futures.wait(futures)
+        return len(futures)
+
+    def close(self):
+        """Flush the remaining submissions and stop the flush thread"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._closing or self._flush_requested or len(self._pending) >= self.max_rows):
+                    if self._pending:
+                        remaining = self.max_delay - (time.monotonic() - self._oldest)
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+
+                # Submissions cancelled before the flush are dropped
+                batch = [(s, f) for s, f in self._pending if f.set_running_or_notify_cancel()]
+                self._pending = []
+                self._flush_requested = False
+                done = self._closing and not batch
+
+            if done:
+                return
+
+            try:
+                results = _write_submission_group(self.session, [submission for submission, _ in batch])
+            except Exception as exc:
+                results = [exc] * len(batch)
+
+            for (_, future), error in zip(batch, results):
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+# ============================================================================
+# RECOMPUTING STORED METRICS
+# ============================================================================
+
+@_instrumented
+def recompute_derived_metrics(operator_id=DEFAULT_OPERATOR_ID):
+    """Refresh one operator's stored metrics against their current Week 1"""
+    changed = get_session().recompute_derived_metrics([operator_id])
+    print(f"🔁 Recomputed metrics: {changed} week(s) updated")
+    return changed
+
+@_instrumented
+def recompute_all():
+    """Refresh every operator's stored metrics in a single SQL statement"""
+    changed = get_session().recompute_derived_metrics()
+    print(f"🔁 Recomputed metrics: {changed} week(s) updated")
+    return changed
+
+# ============================================================================
+# COHORT PERCENTILES
+# ============================================================================
+
+@_instrumented
+def get_cohort_distribution(week_number=None):
+    """Per-week cohort quartiles (and p90) of the leaderboard metrics"""
+    return get_session().get_cohort_distribution(week_number)
+
+@_instrumented
+def get_percentile_ranks(operator_id=DEFAULT_OPERATOR_ID, week_number=None):
+    """
+    Where an operator stands in the cohort, e.g.
+    {"automation_index": 72.4, "time_saved_vs_baseline": 55.0, ...}
+    (share of operators that week scoring lower, latest week by default)
+    """
+    return get_session().get_percentile_ranks(operator_id, week_number)
+
+@_instrumented
+def update_cohort_stats():
+    """Refresh the cohort statistics queued by single submissions (reads do this on their own)"""
+    return get_session().update_cohort_stats()
+
+@_instrumented
+def rebuild_cohort_stats():
+    """Recompute the stored cohort statistics from scratch"""
+    weeks = get_session().rebuild_cohort_stats()
+    print(f"✅ Cohort statistics rebuilt for {weeks} week(s)")
+    return weeks
+
+# ============================================================================
+# SUBMISSION SEARCH
+# ============================================================================
+
+@_instrumented
+def search_submissions(query, fields=None, operator_id=None, week_number=None, limit=20):
+    """
+    Ranked full-text search over what operators automated and where they
+    are blocked, e.g. search_submissions("client onboarding",
+    fields="biggest_bottleneck") for who is blocked on onboarding
+    """
+    return get_session().search_submissions(query, fields, operator_id, week_number, limit)
+
+@_instrumented
+def update_search_index():
+    """Index the submissions queued since the last search (searches do this on their own)"""
+    return get_session().update_search_index()
+
+@_instrumented
+def rebuild_search_index():
+    """Re-index every stored submission's free text from scratch"""
+    postings = get_session().rebuild_search_index()
+    print(f"✅ Search index rebuilt ({postings:,} postings)")
+    return postings
+
+@_instrumented
+def compact_search_index():
+    """Re-sort the search index after many single submissions"""
+    return get_session().compact_search_index()
+
+# ============================================================================
+# VERSION HISTORY
+# ============================================================================
+
+@_instrumented
+def as_of(timestamp, operator_id=None):
+    """
+    Stored metrics as they were at a point in time, e.g. what the
+    dashboard showed last Friday: as_of(datetime(2025, 3, 14, 17, 0), "alice")
+    """
+    return get_session().as_of(timestamp, operator_id)
+
+@_instrumented
+def get_metrics_history(operator_id=DEFAULT_OPERATOR_ID, week_number=None):
+    """Every version of an operator's submitted weeks, including replaced ones"""
+    return get_session().get_metrics_history(operator_id, week_number)
+
+@_instrumented
+def compact_metrics(force=False):
+    """Re-cluster the metrics table once enough weeks were rewritten"""
+    compacted = get_session().compact_metrics(force)
+    if compacted:
+        print("✅ Metrics table compacted")
+    return compacted
+
+@_instrumented
+def checkpoint(min_wal_bytes=0):
+    """Write the WAL into the database file (see TrackerSession.checkpoint)"""
+    return get_session().checkpoint(min_wal_bytes)
+
+@_instrumented
+def migrate_schema():
+    """Apply pending schema migrations to the default session's database"""
+    return get_session().migrate_schema()
+
+def get_schema_version():
+    """Layout version of the default session's database"""
+    return get_session().get_schema_version()
+
+class MetricsCompactor:
+    """
+    Run compact_metrics(), queued refreshes and checkpoints in a background thread
+
+    Every `interval` seconds the compactor checks how much was written
+    since the last compaction and re-clusters the metrics table when
+    needed, so long-running apps keep current-state reads fast without
+    scheduling maintenance. In between, every `checkpoint_interval`
+    seconds, it refreshes the cohort statistics and search index entries
+    single submissions queued, and checkpoints the WAL once it holds
+    `checkpoint_bytes`:
+
+        with MetricsCompactor(interval=60):
+            serve_dashboards()
+
+    A failed compaction or checkpoint is counted (compaction_errors) and
+    retried at the next interval.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        interval=COMPACTION_INTERVAL,
+        checkpoint_interval=CHECKPOINT_INTERVAL,
+        checkpoint_bytes=CHECKPOINT_WAL_BYTES
+    ):
+        self.session = session or get_session()
+        self.interval = interval
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_bytes = checkpoint_bytes
+        self.compactions = 0
+        self.checkpoints = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="billion-compactor", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return (f"MetricsCompactor(interval={self.interval}, compactions={self.compactions}, "
+                f"checkpoints={self.checkpoints})")
+
+    def close(self):
+        """Stop the compaction thread (waits for a running compaction)"""
+        self._stop.set()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        next_compaction = time.monotonic() + self.interval
+        while not self._stop.wait(min(self.interval, self.checkpoint_interval)):
+            try:
+                if time.monotonic() >= next_compaction:
+                    next_compaction = time.monotonic() + self.interval
+                    if self.session.compact_metrics():
+                        # Compaction ends with a checkpoint
+                        self.compactions += 1
+                        continue
+                self.session.update_cohort_stats()
+                self.session.update_search_index()
+                if self.session.checkpoint(self.checkpoint_bytes):
+                    self.checkpoints += 1
+            except Exception:
+                _count("compaction_errors", "metrics_compactor")
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+# Memory budget of the result cache (approximate bytes)
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# On-disk tier: off unless a directory is set here, with
+# configure_result_cache() or through the BILLION_TRACKER_CACHE_DIR
+# environment variable
+RESULT_CACHE_DIR = os.environ.get("BILLION_TRACKER_CACHE_DIR") or None
+RESULT_CACHE_DISK_MAX_BYTES = 512 * 1024 * 1024
+
+_MISSING = object()
+
+def _result_size(value):
+    """Approximate memory held by a cached value"""
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_result_size(item) for item in value)
+    if hasattr(value, "estimated_size"):
+        return value.estimated_size()
+    return sys.getsizeof(value)
+
+class ResultCache:
+    """
+    Computed frames, reports and figure JSON, reused until the data changes
+
+    Entries are keyed by database, kind, operator and arguments and keep
+    the cache version (database id, write generation) they were computed
+    at; a lookup only hits while the version is unchanged, so every
+    submission, batch, recompute or import invalidates them. The memory
+    tier is an LRU bounded by the approximate size of its values. With a
+    `disk_dir`, entries are also pickled there (least recently used
+    removed past `disk_max_bytes`) so hits survive restarts. Only point
+    it at a directory you trust.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES, disk_dir=None, disk_max_bytes=RESULT_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+
+        # key -> (version, value, size), least recently used first
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"ResultCache({len(self._entries)} entries, {self._bytes:,} of {self.max_bytes:,} bytes, "
+                f"disk_dir={str(self.disk_dir) if self.disk_dir else None!r})")
+
+    @property
+    def bytes(self):
+        """Approximate size of the values held in memory"""
+        return self._bytes
+
+    def get(self, key, version):
+        """The value cached for `key` at `version`, else _MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        if self.disk_dir is None:
+            return _MISSING
+        value = self._read_disk(key, version)
+        if value is not _MISSING:
+            self._remember(key, version, value)
+        return value
+
+    def put(self, key, version, value):
+        """Cache `value` for `key` at `version`, replacing older versions"""
+        self._remember(key, version, value)
+        if self.disk_dir is not None:
+            self._write_disk(key, version, value)
+
+    def clear(self, kind=None):
+        """Drop every entry, or only those of one kind, from memory and disk"""
+        with self._lock:
+            for key in [key for key in self._entries if kind is None or key[1] == kind]:
+                self._bytes -= self._entries.pop(key)[2]
+        if self.disk_dir is not None and self.disk_dir.is_dir():
+            for path in self.disk_dir.glob(f"{kind or '*'}-*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key, version, value):
+        size = _result_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                _count("cache_evictions", "result_cache")
+
+    def _disk_path(self, key):
+        import hashlib
+
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+        return self.disk_dir / f"{key[1]}-{digest}.pkl"
+
+    def _read_disk(self, key, version):
+        import pickle
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, stored_version, value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception:
+            # Truncated or written by an incompatible version
+            path.unlink(missing_ok=True)
+            return _MISSING
+        if stored_key != key or stored_version != version:
+            return _MISSING
+
+        os.utime(path)  # recently used, for disk eviction
+        _count("disk_hits", "result_cache")
+        return value
+
+    def _write_disk(self, key, version, value):
+        import pickle
+
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((key, version, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            # Unpicklable values stay memory-only
+            tmp.unlink(missing_ok=True)
+            return
+
+        files = []
+        for cached in self.disk_dir.glob("*.pkl"):
+            try:
+                stat = cached.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, cached))
+        total = sum(size for _, size, _ in files)
+        for _, size, cached in sorted(files, key=lambda f: f[0]):
+            if total <= self.disk_max_bytes:
+                break
+            cached.unlink(missing_ok=True)
+            total -= size
+
+_result_cache = ResultCache(disk_dir=RESULT_CACHE_DIR)
+
+def get_result_cache():
+    """The ResultCache behind the reports, tables and figures"""
+    return _result_cache
+
+def configure_result_cache(max_bytes=RESULT_CACHE_MAX_BYTES, disk_dir=None, disk_max_bytes=RESULT_CACHE_DISK_MAX_BYTES):
+    """
+    Replace the result cache, e.g. to add an on-disk tier:
+    configure_result_cache(disk_dir=".billion_cache")
+    """
+    global _result_cache
+    _result_cache = ResultCache(max_bytes, disk_dir, disk_max_bytes)
+    return _result_cache
+
+def clear_result_cache(kind=None):
+    """Drop cached results (all, or one kind such as "report")"""
+    _result_cache.clear(kind)
 
-DB_PATH = "billion_tracker.db"
-TABLE_NAME = "transformation_metrics"
+def _cached_result(kind, operator_id, args, compute, session=None):
+    """compute()'s result, reused while the session's database is unchanged"""
+    session = session or get_session()
+    version = session.get_cache_version()
+    if version is None:
+        return compute()
 
-# ============================================================================
-# DATABASE INITIALIZATION
-# ============================================================================
+    key = (str(Path(session.db_path).resolve()), kind, operator_id, args)
+    value = _result_cache.get(key, version)
+    if value is not _MISSING:
+        _count("cache_hits", kind)
+        return value
 
-def init_database():
-    """Initialize DuckDB database with schema"""
-    con = duckdb.connect(DB_PATH)
-    
-    con.execute(f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-            week_number INTEGER PRIMARY KEY,
-            submission_date DATE,
-            
-            -- Time tracking (hours)
-            total_hours FLOAT,
-            automated_hours FLOAT,
-            manual_hours FLOAT,
-            
-            -- Client metrics
-            active_clients INTEGER,
-            
-            -- Revenue (stored as ratio to baseline for privacy)
-            revenue_ratio FLOAT,
-            
-            -- Subscription transition
-            recurring_revenue_pct FLOAT,
-            
-            -- Qualitative tracking
-            automated_this_week TEXT,
-            biggest_bottleneck TEXT,
-            
-            -- Calculated fields (stored for historical accuracy)
-            automation_index FLOAT,
-            time_saved_vs_baseline FLOAT,
-            revenue_efficiency_multiple FLOAT,
-            client_capacity_score FLOAT
-        )
-    """)
-    
-    con.close()
-    print("✅ Database initialized successfully")
+    _count("cache_misses", kind)
+    value = compute()
+    _result_cache.put(key, version, value)
+    return value
 
 # ============================================================================
-# WEEKLY DATA ENTRY
+# VISUALIZATION & REPORTING
 # ============================================================================
 
-def submit_weekly_metrics(
-    week_number: int,
-    
-    # Time tracking
-    total_hours_worked: float,
-    automated_hours: float,
-    
-    # Client metrics  
-    active_clients: int,
-    
-    # Revenue (enter as ratio to your Week 1 baseline, e.g., 1.0, 1.2, 1.5)
-    revenue_ratio_to_baseline: float,
-    
-    # Subscription transition (percentage, 0-100)
-    recurring_revenue_percentage: float,
-    
-    # Qualitative
-    what_i_automated_this_week: str,
-    biggest_bottleneck_now: str
+@_instrumented
+def get_metrics_df(operator_id=DEFAULT_OPERATOR_ID):
+    """Load all metrics as Polars DataFrame"""
+    return get_session().get_metrics_df(operator_id)
+
+@_instrumented
+def scan_metrics(
+    operator_id=DEFAULT_OPERATOR_ID,
+    columns=None,
+    week_from=None,
+    week_to=None,
+    head=None,
+    tail=None
 ):
     """
-    Submit your weekly metrics
-    
-    Privacy Note: Revenue is stored as a ratio to YOUR baseline,
-    never as absolute numbers. Only you know what the baseline represents.
+    Lazy version of get_metrics_df() returning a Polars LazyFrame
+
+    Only the requested columns, weeks and head/tail rows are read, e.g.
+    scan_metrics(columns=["week_number", "automation_index"], tail=4).collect()
     """
-    
-    con = duckdb.connect(DB_PATH)
-    
-    # Calculate derived metrics
-    manual_hours = total_hours_worked - automated_hours
-    automation_index = (automated_hours / total_hours_worked * 100) if total_hours_worked > 0 else 0
-    
-    # Get baseline metrics from Week 1
-    baseline = con.execute(f"""
-        SELECT 
-            total_hours,
-            active_clients,
-            revenue_ratio
-        FROM {TABLE_NAME}
-        WHERE week_number = 1
-    """).fetchone()
-    
-    if baseline and week_number > 1:
-        baseline_hours, baseline_clients, baseline_revenue = baseline
-        time_saved = baseline_hours - total_hours_worked
-        revenue_efficiency_multiple = (revenue_ratio_to_baseline / total_hours_worked) / (baseline_revenue / baseline_hours)
-        client_capacity_score = (active_clients / total_hours_worked) / (baseline_clients / baseline_hours)
-    else:
-        # Week 1 is the baseline
-        time_saved = 0
-        revenue_efficiency_multiple = 1.0
-        client_capacity_score = 1.0
-    
-    # Insert or update
-    con.execute(f"""
-        INSERT OR REPLACE INTO {TABLE_NAME} VALUES (
-            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-        )
-    """, [
-        week_number,
-        datetime.now().date(),
-        total_hours_worked,
-        automated_hours,
-        manual_hours,
-        active_clients,
-        revenue_ratio_to_baseline,
-        recurring_revenue_percentage,
-        what_i_automated_this_week,
-        biggest_bottleneck_now,
-        automation_index,
-        time_saved,
-        revenue_efficiency_multiple,
-        client_capacity_score
-    ])
-    
-    con.close()
-    
-    print(f"✅ Week {week_number} metrics submitted successfully!")
-    print(f"📊 Automation Index: {automation_index:.1f}%")
-    print(f"⏰ Time Saved vs Baseline: {time_saved:.1f} hours/week")
-    print(f"📈 Revenue Efficiency Multiple: {revenue_efficiency_multiple:.2f}x")
+    return get_session().scan_metrics(operator_id, columns, week_from, week_to, head, tail)
 
-# ============================================================================
-# VISUALIZATION & REPORTING
-# ============================================================================
+@_instrumented
+def iter_metrics(
+    columns=None,
+    operator_ids=None,
+    week_from=None,
+    week_to=None,
+    predicate=None,
+    batch_size=ITER_BATCH_ROWS,
+    ordered=False,
+    whole_operators=False
+):
+    """
+    Stream stored metrics as Polars DataFrames of at most `batch_size` rows
 
-def get_metrics_df():
-    """Load all metrics as Polars DataFrame"""
-    con = duckdb.connect(DB_PATH)
-    
-    df = con.execute(f"""
-        SELECT * FROM {TABLE_NAME}
-        ORDER BY week_number
-    """).pl()
-    
-    con.close()
-    return df
+    For cohort-wide exports and analyses that shouldn't load the whole
+    table: only one batch is in memory at a time. See
+    TrackerSession.iter_metrics for the projection, filters and order.
+    """
+    return get_session().iter_metrics(
+        columns, operator_ids, week_from, week_to, predicate, batch_size, ordered, whole_operators
+    )
 
-def print_progress_table():
-    """Display formatted progress table"""
-    df = get_metrics_df()
-    
-    if df.height == 0:
-        print("❌ No data yet. Submit your first week's metrics!")
-        return
-    
-    # Select and rename columns for display
-    display_df = df.select([
+def get_cohort_metrics_df():
+    """Load every operator's metrics as one Polars DataFrame"""
+    return get_session().get_cohort_metrics_df()
+
+@_instrumented
+def get_operator_ids():
+    """List the operators that have submitted at least one week"""
+    return get_session().get_operator_ids()
+
+@_instrumented
+def get_write_generation():
+    """Counter that changes whenever stored metrics change (for caching)"""
+    return get_session().get_write_generation()
+
+def _progress_table_frames(operator_id):
+    """The progress table and latest-week summary frames (summary None without data)"""
+    # Only the displayed columns are read (the free-text columns stay in DuckDB)
+    display_df = scan_metrics(operator_id).select([
         pl.col("week_number").alias("Week"),
         pl.col("automation_index").round(1).alias("Automation %"),
         pl.col("time_saved_vs_baseline").round(1).alias("Hours Saved"),
         pl.col("revenue_efficiency_multiple").round(2).alias("Rev Efficiency"),
         pl.col("client_capacity_score").round(2).alias("Client Capacity"),
         pl.col("recurring_revenue_pct").round(1).alias("Recurring %")
-    ])
+    ]).collect()
+    if display_df.height == 0:
+        return display_df, None
+
+    latest = scan_metrics(
+        operator_id,
+        columns=["week_number", "automated_this_week", "biggest_bottleneck"],
+        tail=1
+    ).collect()
+    return display_df, latest
+
+@_instrumented
+def print_progress_table(operator_id=DEFAULT_OPERATOR_ID):
+    """Display formatted progress table (cached until the next write)"""
+    display_df, latest = _cached_result(
+        "progress_table", operator_id, (), lambda: _progress_table_frames(operator_id)
+    )
+    
+    if display_df.height == 0:
+        print("❌ No data yet. Submit your first week's metrics!")
+        return
     
     print("\n" + "="*80)
     print("📊 YOUR TRANSFORMATION PROGRESS")
@@ -197,7 +3257,6 @@ def print_progress_table():
     print("="*80 + "\n")
     
     # Latest week summary
-    latest = df.tail(1)
     week_num = latest["week_number"][0]
     
     print(f"📅 Week {week_num} Summary:")
@@ -205,17 +3264,118 @@ def print_progress_table():
     print(f"   🚧 Biggest bottleneck: {latest['biggest_bottleneck'][0]}")
     print()
 
-def create_visualizations():
-    """Generate comprehensive visualizations"""
-    df = get_metrics_df()
-    
-    if df.height == 0:
-        print("❌ No data yet. Submit your first week's metrics!")
-        return
-    
-    # Convert to pandas for Plotly (Plotly works better with pandas)
-    df_pd = df.to_pandas()
-    
+# Columns plotted by the dashboard (no free text)
+DASHBOARD_COLUMNS = [
+    "week_number",
+    "automated_hours",
+    "manual_hours",
+    "automation_index",
+    "time_saved_vs_baseline",
+    "revenue_efficiency_multiple",
+    "client_capacity_score",
+    "recurring_revenue_pct",
+]
+
+def _lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of one series
+
+    Returns the indices of the `n_out` points that best preserve the visual
+    shape (peaks, dips and trend changes are kept, flat runs are thinned).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    bucket = (n - 2) / (n_out - 2)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+
+        # Average of the next bucket (the last point for the final bucket)
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        # Keep the point forming the largest triangle with the previous pick
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+def _dashboard_trace_data(df, max_points=None):
+    """
+    (x, y) arrays for every dashboard and hours-chart trace, in template order
+
+    Arrays come straight from the frame's NumPy buffers; `max_points`
+    downsamples each series with LTTB.
+    """
+    weeks = df["week_number"].to_numpy()
+    line_ends = np.array([weeks.min(), weeks.max()])
+
+    def series(column):
+        y = df[column].to_numpy()
+        if max_points:
+            keep = _lttb_indices(weeks, y, max_points)
+            return weeks[keep], y[keep]
+        return weeks, y
+
+    # Stacked bars must share x, so both take the points chosen for total hours
+    bar_keep = None
+    if max_points:
+        total_hours = df["automated_hours"].to_numpy() + df["manual_hours"].to_numpy()
+        bar_keep = _lttb_indices(weeks, total_hours, max_points)
+
+    def bars(column):
+        y = df[column].to_numpy()
+        if bar_keep is not None:
+            return weeks[bar_keep], y[bar_keep]
+        return weeks, y
+
+    dashboard = [
+        series("automation_index"),
+        (line_ends, [80, 80]),
+        series("time_saved_vs_baseline"),
+        series("revenue_efficiency_multiple"),
+        series("client_capacity_score"),
+        (line_ends, [1.0, 1.0]),
+        series("recurring_revenue_pct"),
+        (line_ends, [50, 50]),
+    ]
+    hours = [
+        bars("automated_hours"),
+        bars("manual_hours"),
+    ]
+    return dashboard, hours
+
+@functools.lru_cache(maxsize=None)
+def _dashboard_templates(webgl=False):
+    """
+    The styled dashboard and hours charts without data, as plain dicts
+
+    Built once per process (make_subplots and trace validation are the
+    expensive part); figures for an operator only swap in trace data.
+    Trace order must match _dashboard_trace_data().
+    """
+    from plotly.subplots import make_subplots
+
+    Scatter = go.Scattergl if webgl else go.Scatter
+
+    # Traces are created empty; _dashboard_trace_data() fills in each
+    # operator's x and y
+
     # Create subplot figure with 2x2 grid
     fig = make_subplots(
         rows=2, cols=2,
@@ -235,9 +3395,9 @@ def create_visualizations():
     
     # 1. Automation Index
     fig.add_trace(
-        go.Scatter(
-            x=df_pd['week_number'],
-            y=df_pd['automation_index'],
+        Scatter(
+            x=[],
+            y=[],
             mode='lines+markers',
             name='Automation %',
             line=dict(color='#00D9FF', width=3),
@@ -248,7 +3408,7 @@ def create_visualizations():
     # Target line at 80%
     fig.add_trace(
         go.Scatter(
-            x=[df_pd['week_number'].min(), df_pd['week_number'].max()],
+            x=[],
             y=[80, 80],
             mode='lines',
             name='Target (80%)',
@@ -260,9 +3420,9 @@ def create_visualizations():
     
     # 2. Time Liberation Score
     fig.add_trace(
-        go.Scatter(
-            x=df_pd['week_number'],
-            y=df_pd['time_saved_vs_baseline'],
+        Scatter(
+            x=[],
+            y=[],
             mode='lines+markers',
             name='Hours Saved',
             line=dict(color='#FF6B6B', width=3),
@@ -275,9 +3435,9 @@ def create_visualizations():
     
     # 3. Efficiency Multiples
     fig.add_trace(
-        go.Scatter(
-            x=df_pd['week_number'],
-            y=df_pd['revenue_efficiency_multiple'],
+        Scatter(
+            x=[],
+            y=[],
             mode='lines+markers',
             name='Revenue Efficiency',
             line=dict(color='#4ECDC4', width=3),
@@ -286,9 +3446,9 @@ def create_visualizations():
         row=2, col=1
     )
     fig.add_trace(
-        go.Scatter(
-            x=df_pd['week_number'],
-            y=df_pd['client_capacity_score'],
+        Scatter(
+            x=[],
+            y=[],
             mode='lines+markers',
             name='Client Capacity',
             line=dict(color='#95E1D3', width=3),
@@ -299,7 +3459,7 @@ def create_visualizations():
     # Baseline at 1.0x
     fig.add_trace(
         go.Scatter(
-            x=[df_pd['week_number'].min(), df_pd['week_number'].max()],
+            x=[],
             y=[1.0, 1.0],
             mode='lines',
             name='Baseline (1.0x)',
@@ -311,9 +3471,9 @@ def create_visualizations():
     
     # 4. Subscription Transition
     fig.add_trace(
-        go.Scatter(
-            x=df_pd['week_number'],
-            y=df_pd['recurring_revenue_pct'],
+        Scatter(
+            x=[],
+            y=[],
             mode='lines+markers',
             name='Recurring Revenue %',
             line=dict(color='#FFD93D', width=3),
@@ -326,7 +3486,7 @@ def create_visualizations():
     # Target line at 50%
     fig.add_trace(
         go.Scatter(
-            x=[df_pd['week_number'].min(), df_pd['week_number'].max()],
+            x=[],
             y=[50, 50],
             mode='lines',
             name='Target (50%)',
@@ -358,21 +3518,19 @@ def create_visualizations():
         font=dict(size=12)
     )
     
-    fig.show()
-    
     # Create hours breakdown chart
     fig_hours = go.Figure()
     
     fig_hours.add_trace(go.Bar(
-        x=df_pd['week_number'],
-        y=df_pd['automated_hours'],
+        x=[],
+        y=[],
         name='Automated Hours',
         marker_color='#00D9FF'
     ))
     
     fig_hours.add_trace(go.Bar(
-        x=df_pd['week_number'],
-        y=df_pd['manual_hours'],
+        x=[],
+        y=[],
         name='Manual Hours',
         marker_color='#FF6B6B'
     ))
@@ -388,110 +3546,565 @@ def create_visualizations():
         paper_bgcolor='white'
     )
     
-    fig_hours.show()
+    return fig.to_plotly_json(), fig_hours.to_plotly_json()
 
-def generate_transformation_report():
-    """Generate comprehensive transformation report"""
-    df = get_metrics_df()
-    
+@_instrumented
+def dashboard_figure_dicts(df, webgl=False, max_points=None):
+    """
+    The dashboard and hours chart as plain figure dicts
+
+    Cheaper than build_dashboard_figures() when the figures are only
+    serialized (plotly.io.to_json / write_html / write_image with
+    validate=False). The layouts are shared with the cached template and
+    must not be modified.
+    """
+    with _span("dashboard_figure_dicts.template"):
+        dashboard_template, hours_template = _dashboard_templates(bool(webgl))
+    with _span("dashboard_figure_dicts.trace_data"):
+        dashboard_data, hours_data = _dashboard_trace_data(df, max_points)
+
+    def fill(template, trace_data):
+        return {
+            "data": [dict(trace, x=x, y=y) for trace, (x, y) in zip(template["data"], trace_data)],
+            "layout": template["layout"],
+        }
+
+    return fill(dashboard_template, dashboard_data), fill(hours_template, hours_data)
+
+@_instrumented
+def build_dashboard_figures(df, webgl=False, max_points=None):
+    """
+    Build the 2x2 dashboard and the hours breakdown chart from a metrics frame
+
+    Traces are fed straight from the frame's NumPy buffers into a cached
+    figure template. For long histories, `webgl=True` renders lines with
+    Scattergl and `max_points` downsamples each series with LTTB so figure
+    size stays bounded. Returns (dashboard_figure, hours_figure).
+    """
+    dashboard, hours = dashboard_figure_dicts(df, webgl, max_points)
+    with _span("build_dashboard_figures.figure"):
+        return go.Figure(dashboard), go.Figure(hours)
+
+def _dashboard_figure_json(operator_id, webgl, max_points):
+    """An operator's dashboard and hours chart as figure JSON (None without data)"""
+    df = scan_metrics(operator_id, columns=DASHBOARD_COLUMNS).collect()
     if df.height == 0:
+        return None
+    with _span("create_visualizations.serialize"):
+        return tuple(
+            pio.to_json(figure, validate=False)
+            for figure in dashboard_figure_dicts(df, webgl, max_points)
+        )
+
+@_instrumented
+def create_visualizations(operator_id=DEFAULT_OPERATOR_ID, webgl=False, max_points=None):
+    """Generate comprehensive visualizations (figures cached until the next write)"""
+    figures = _cached_result(
+        "figures", operator_id, (bool(webgl), max_points),
+        lambda: _dashboard_figure_json(operator_id, webgl, max_points),
+    )
+    
+    if figures is None:
         print("❌ No data yet. Submit your first week's metrics!")
         return
     
-    latest = df.tail(1)
-    first = df.head(1)
-    
-    week_num = latest["week_number"][0]
-    
-    print("\n" + "="*80)
-    print("🎯 TRANSFORMATION REPORT")
-    print("="*80)
-    print(f"\n📅 Current Week: {week_num}/12")
-    print(f"📆 Journey Started: {first['submission_date'][0]}")
-    print(f"📆 Latest Update: {latest['submission_date'][0]}")
-    
-    print("\n" + "-"*80)
-    print("📊 KEY METRICS")
-    print("-"*80)
-    
-    # Automation Index
-    ai_current = latest["automation_index"][0]
-    ai_start = first["automation_index"][0]
-    ai_change = ai_current - ai_start
-    print(f"\n🤖 Automation Index:")
-    print(f"   Week 1: {ai_start:.1f}%")
-    print(f"   Week {week_num}: {ai_current:.1f}%")
-    print(f"   Change: {ai_change:+.1f}% {'✅' if ai_change > 0 else '⚠️'}")
-    print(f"   Target: 80% {'✅ ACHIEVED!' if ai_current >= 80 else f'({80-ai_current:.1f}% to go)'}")
-    
+    with _span("create_visualizations.show"):
+        for figure in figures:
+            pio.show(json.loads(figure), validate=False)
+
+# ============================================================================
+# GRADUATION RULES
+# ============================================================================
+
+class GraduationThresholds(NamedTuple):
+    """Minimums an operator must reach to graduate (defaults: the course rules)"""
+    min_automation_index: float = 70.0
+    min_time_reduction_pct: float = 50.0
+    min_recurring_revenue_pct: float = 50.0
+    min_weeks: int = 12
+
+DEFAULT_GRADUATION_THRESHOLDS = GraduationThresholds()
+
+# Program goals the report's key metrics (and the dashboard) aim for. They
+# are not the graduation rules: 70% automation graduates, 80% is the goal.
+REPORT_AUTOMATION_TARGET = 80.0
+REPORT_TIME_REDUCTION_TARGET = 50.0
+REPORT_RECURRING_REVENUE_TARGET = 50.0
+
+def _graduation_checks(rules):
+    """
+    SQL applying the graduation rules to `rules`
+
+    `rules` is a relation with each operator's current_week,
+    automation_index, time_reduction_pct and recurring_revenue_pct and
+    the min_* thresholds that apply to it. Adds pass/fail and the gap to
+    each threshold (negative once beaten), requirements_remaining and
+    ready_to_graduate. scan_graduation_readiness() and the transformation
+    reports both use it, so they always agree.
+    """
+    return f"""
+        SELECT
+            *,
+            (NOT meets_automation)::INTEGER + (NOT meets_time_liberation)::INTEGER
+                + (NOT meets_subscription)::INTEGER + (NOT meets_weeks)::INTEGER AS requirements_remaining,
+            meets_automation AND meets_time_liberation
+                AND meets_subscription AND meets_weeks AS ready_to_graduate
+        FROM (
+            SELECT
+                *,
+                COALESCE(automation_index >= min_automation_index, FALSE) AS meets_automation,
+                min_automation_index - automation_index AS automation_gap,
+                COALESCE(time_reduction_pct >= min_time_reduction_pct, FALSE) AS meets_time_liberation,
+                min_time_reduction_pct - time_reduction_pct AS time_liberation_gap,
+                COALESCE(recurring_revenue_pct >= min_recurring_revenue_pct, FALSE) AS meets_subscription,
+                min_recurring_revenue_pct - recurring_revenue_pct AS subscription_gap,
+                COALESCE(current_week >= min_weeks, FALSE) AS meets_weeks,
+                GREATEST(min_weeks - current_week, 0) AS weeks_remaining
+            FROM {rules}
+        )
+    """
+
+@_instrumented
+def scan_graduation_readiness(thresholds=None, cohorts=None, operator_cohorts=None):
+    """
+    Evaluate the graduation rules for every operator in one query
+
+    `thresholds` applies to everyone without a cohort. `cohorts` maps a
+    cohort name to its own GraduationThresholds, and `operator_cohorts`
+    assigns operators to cohorts (a dict, or a frame with operator_id and
+    cohort columns).
+
+    Returns a Polars DataFrame with one row per operator: the latest
+    values, the thresholds applied, pass/fail per requirement, the gap to
+    each target (threshold minus current, negative once beaten) and
+    overall readiness.
+    """
+    thresholds = thresholds or DEFAULT_GRADUATION_THRESHOLDS
+    con = get_session().cursor()
+
+    # Per-cohort thresholds and cohort membership as small joinable tables
+    cohort_rows = [{"cohort": name, **rules._asdict()} for name, rules in (cohorts or {}).items()]
+    cohort_table = pl.DataFrame(cohort_rows, schema={
+        "cohort": pl.Utf8,
+        "min_automation_index": pl.Float64,
+        "min_time_reduction_pct": pl.Float64,
+        "min_recurring_revenue_pct": pl.Float64,
+        "min_weeks": pl.Int64,
+    })
+
+    if operator_cohorts is None:
+        membership = pl.DataFrame(schema={"operator_id": pl.Utf8, "cohort": pl.Utf8})
+    elif isinstance(operator_cohorts, dict):
+        membership = pl.DataFrame(
+            {"operator_id": list(operator_cohorts), "cohort": list(operator_cohorts.values())},
+            schema={"operator_id": pl.Utf8, "cohort": pl.Utf8},
+        )
+    else:
+        membership = operator_cohorts.select(
+            pl.col("operator_id").cast(pl.Utf8), pl.col("cohort").cast(pl.Utf8)
+        )
+
+    con.register("_cohort_thresholds", cohort_table)
+    con.register("_operator_cohorts", membership)
+
+    try:
+        return _fetch_polars(con, f"""
+            WITH latest AS (
+                -- Latest week per operator (first week for the hours baseline)
+                SELECT
+                    operator_id,
+                    MAX(week_number) AS current_week,
+                    CAST(arg_max_null(automation_index, week_number) AS DOUBLE) AS automation_index,
+                    CAST(arg_min_null(total_hours, week_number) AS DOUBLE) AS baseline_hours,
+                    CAST(arg_max_null(time_saved_vs_baseline, week_number) AS DOUBLE) AS hours_saved,
+                    CAST(arg_max_null(recurring_revenue_pct, week_number) AS DOUBLE) AS recurring_revenue_pct
+                FROM {TABLE_NAME}
+                GROUP BY operator_id
+            ),
+            rules AS (
+                SELECT
+                    l.operator_id,
+                    oc.cohort,
+                    l.current_week,
+                    l.automation_index,
+                    CASE WHEN l.baseline_hours > 0
+                         THEN l.hours_saved / l.baseline_hours * 100
+                         ELSE 0 END AS time_reduction_pct,
+                    l.recurring_revenue_pct,
+                    COALESCE(ct.min_automation_index, ?) AS min_automation_index,
+                    COALESCE(ct.min_time_reduction_pct, ?) AS min_time_reduction_pct,
+                    COALESCE(ct.min_recurring_revenue_pct, ?) AS min_recurring_revenue_pct,
+                    COALESCE(ct.min_weeks, ?) AS min_weeks
+                FROM latest l
+                LEFT JOIN _operator_cohorts oc ON oc.operator_id = l.operator_id
+                LEFT JOIN _cohort_thresholds ct ON ct.cohort = oc.cohort
+            ),
+            checks AS ({_graduation_checks("rules")})
+            SELECT * FROM checks
+            ORDER BY operator_id
+        """, [
+            float(thresholds.min_automation_index),
+            float(thresholds.min_time_reduction_pct),
+            float(thresholds.min_recurring_revenue_pct),
+            int(thresholds.min_weeks),
+        ], operation="scan_graduation_readiness")
+    finally:
+        con.unregister("_cohort_thresholds")
+        con.unregister("_operator_cohorts")
+
+# ============================================================================
+# TRANSFORMATION REPORT
+# ============================================================================
+
+class TransformationReport(NamedTuple):
+    """
+    Every KPI, target gap and readiness flag of one operator's report
+
+    Built by build_transformation_report() in a single query; render it with
+    render_text(), to_json() or render_html(). Gaps are "target minus
+    current" against the program goals (REPORT_*_TARGET, negative once
+    beaten); graduation readiness uses the thresholds the report was built
+    with. "start" values come from the operator's first stored week,
+    "current" values from the latest.
+    """
+    operator_id: str
+    current_week: int
+    weeks_submitted: int
+    journey_started: Optional[date]
+    latest_update: Optional[date]
+
+    # Automation Index (%)
+    automation_index_start: float
+    automation_index: float
+    automation_index_change: float
+    automation_target_gap: float
+
     # Time Liberation
-    time_saved = latest["time_saved_vs_baseline"][0]
-    baseline_hours = first["total_hours"][0]
-    time_reduction_pct = (time_saved / baseline_hours * 100) if baseline_hours > 0 else 0
-    print(f"\n⏰ Time Liberation Score:")
-    print(f"   Hours Saved per Week: {time_saved:.1f} hours")
-    print(f"   Time Reduction: {time_reduction_pct:.1f}%")
-    print(f"   Target: 50% reduction {'✅ ACHIEVED!' if time_reduction_pct >= 50 else f'({50-time_reduction_pct:.1f}% to go)'}")
-    
-    # Revenue Efficiency
-    rem = latest["revenue_efficiency_multiple"][0]
-    print(f"\n📈 Revenue Efficiency Multiple:")
-    print(f"   Current: {rem:.2f}x baseline")
-    print(f"   Status: {'✅ Growing!' if rem > 1.0 else '⚠️ Below baseline'}")
-    
-    # Client Capacity
-    ccs = latest["client_capacity_score"][0]
-    print(f"\n👥 Client Capacity Score:")
-    print(f"   Current: {ccs:.2f}x baseline")
-    print(f"   You can now serve {ccs:.1f}x more clients per hour worked")
-    
-    # Subscription Transition
-    sti = latest["recurring_revenue_pct"][0]
-    print(f"\n💰 Subscription Transition Index:")
-    print(f"   Recurring Revenue: {sti:.1f}%")
-    print(f"   Target: 50% {'✅ ACHIEVED!' if sti >= 50 else f'({50-sti:.1f}% to go)'}")
-    
-    # Graduation Readiness
-    print("\n" + "-"*80)
-    print("🎓 GRADUATION READINESS")
-    print("-"*80)
-    
-    requirements = [
-        ("Automation Index ≥ 70%", ai_current >= 70),
-        ("Time Liberation ≥ 50%", time_reduction_pct >= 50),
-        ("Subscription Revenue ≥ 50%", sti >= 50),
-        ("Complete 12 weeks", week_num >= 12)
-    ]
-    
-    for req, met in requirements:
-        status = "✅" if met else "⬜"
-        print(f"{status} {req}")
-    
-    ready_to_graduate = all(met for _, met in requirements)
-    
-    if ready_to_graduate:
-        print("\n🎉 CONGRATULATIONS! You're ready to graduate!")
-        print("📧 Submit your transformation portfolio to receive your certification.")
+    baseline_hours: float
+    hours_saved: float
+    time_reduction_pct: float
+    time_reduction_gap: float
+
+    # Efficiency multiples (x baseline)
+    revenue_efficiency_multiple: float
+    client_capacity_score: float
+
+    # Subscription Transition (%)
+    recurring_revenue_pct: float
+    recurring_revenue_gap: float
+
+    # Graduation readiness (thresholds used, then pass/fail per requirement)
+    min_automation_index: float
+    min_time_reduction_pct: float
+    min_recurring_revenue_pct: float
+    min_weeks: int
+    meets_automation_requirement: bool
+    meets_time_liberation_requirement: bool
+    meets_subscription_requirement: bool
+    meets_weeks_requirement: bool
+    requirements_remaining: int
+    ready_to_graduate: bool
+
+    # Recent progress (latest week and the one before it)
+    latest_automated: Optional[str]
+    latest_bottleneck: Optional[str]
+    previous_automated: Optional[str]
+    previous_bottleneck: Optional[str]
+    has_previous_week: bool
+
+    def requirements(self):
+        """Graduation requirements as (label, met) pairs"""
+        return [
+            (f"Automation Index ≥ {self.min_automation_index:g}%", self.meets_automation_requirement),
+            (f"Time Liberation ≥ {self.min_time_reduction_pct:g}%", self.meets_time_liberation_requirement),
+            (f"Subscription Revenue ≥ {self.min_recurring_revenue_pct:g}%", self.meets_subscription_requirement),
+            (f"Complete {self.min_weeks} weeks", self.meets_weeks_requirement)
+        ]
+
+    def to_dict(self):
+        """Plain dict with JSON-friendly values (dates as ISO strings)"""
+        return {
+            key: value.isoformat() if isinstance(value, date) else value
+            for key, value in self._asdict().items()
+        }
+
+    def to_json(self, **kwargs):
+        """Serialize the report as JSON"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def render_text(self):
+        """The console report printed by generate_transformation_report()"""
+        week_num = self.current_week
+        ai_current = self.automation_index
+        ai_change = self.automation_index_change
+        time_reduction_pct = self.time_reduction_pct
+        sti = self.recurring_revenue_pct
+
+        lines = [
+            "\n" + "="*80,
+            "🎯 TRANSFORMATION REPORT",
+            "="*80,
+            f"\n📅 Current Week: {week_num}/{self.min_weeks}",
+            f"📆 Journey Started: {self.journey_started}",
+            f"📆 Latest Update: {self.latest_update}",
+
+            "\n" + "-"*80,
+            "📊 KEY METRICS",
+            "-"*80,
+
+            f"\n🤖 Automation Index:",
+            f"   Week 1: {self.automation_index_start:.1f}%",
+            f"   Week {week_num}: {ai_current:.1f}%",
+            f"   Change: {ai_change:+.1f}% {'✅' if ai_change > 0 else '⚠️'}",
+            f"   Target: {REPORT_AUTOMATION_TARGET:g}% "
+            f"{'✅ ACHIEVED!' if ai_current >= REPORT_AUTOMATION_TARGET else f'({self.automation_target_gap:.1f}% to go)'}",
+
+            f"\n⏰ Time Liberation Score:",
+            f"   Hours Saved per Week: {self.hours_saved:.1f} hours",
+            f"   Time Reduction: {time_reduction_pct:.1f}%",
+            f"   Target: {REPORT_TIME_REDUCTION_TARGET:g}% reduction "
+            f"{'✅ ACHIEVED!' if time_reduction_pct >= REPORT_TIME_REDUCTION_TARGET else f'({self.time_reduction_gap:.1f}% to go)'}",
+
+            f"\n📈 Revenue Efficiency Multiple:",
+            f"   Current: {self.revenue_efficiency_multiple:.2f}x baseline",
+            f"   Status: {'✅ Growing!' if self.revenue_efficiency_multiple > 1.0 else '⚠️ Below baseline'}",
+
+            f"\n👥 Client Capacity Score:",
+            f"   Current: {self.client_capacity_score:.2f}x baseline",
+            f"   You can now serve {self.client_capacity_score:.1f}x more clients per hour worked",
+
+            f"\n💰 Subscription Transition Index:",
+            f"   Recurring Revenue: {sti:.1f}%",
+            f"   Target: {REPORT_RECURRING_REVENUE_TARGET:g}% "
+            f"{'✅ ACHIEVED!' if sti >= REPORT_RECURRING_REVENUE_TARGET else f'({self.recurring_revenue_gap:.1f}% to go)'}",
+
+            "\n" + "-"*80,
+            "🎓 GRADUATION READINESS",
+            "-"*80,
+        ]
+
+        for req, met in self.requirements():
+            status = "✅" if met else "⬜"
+            lines.append(f"{status} {req}")
+
+        if self.ready_to_graduate:
+            lines.append("\n🎉 CONGRATULATIONS! You're ready to graduate!")
+            lines.append("📧 Submit your transformation portfolio to receive your certification.")
+        else:
+            lines.append(f"\n💪 Keep going! {self.requirements_remaining} requirement(s) remaining.")
+
+        lines += [
+            "\n" + "-"*80,
+            "🏆 RECENT PROGRESS",
+            "-"*80,
+        ]
+
+        if self.has_previous_week:
+            lines.append(f"\n📝 Week {week_num-1}:")
+            lines.append(f"   Automated: {self.previous_automated}")
+            lines.append(f"   Bottleneck: {self.previous_bottleneck}")
+
+        lines.append(f"\n📝 Week {week_num}:")
+        lines.append(f"   Automated: {self.latest_automated}")
+        lines.append(f"   Bottleneck: {self.latest_bottleneck}")
+
+        lines.append("\n" + "="*80 + "\n")
+        return "\n".join(lines)
+
+    def render_html(self):
+        """A self-contained HTML fragment with the same content as the text report"""
+        esc = html.escape
+
+        def row(label, value):
+            return f"<tr><th>{esc(label)}</th><td>{esc(str(value))}</td></tr>"
+
+        metrics = [
+            row("Automation Index", f"{self.automation_index:.1f}% ({self.automation_index_change:+.1f}% since Week 1)"),
+            row("Hours Saved per Week", f"{self.hours_saved:.1f} hours"),
+            row("Time Reduction", f"{self.time_reduction_pct:.1f}%"),
+            row("Revenue Efficiency Multiple", f"{self.revenue_efficiency_multiple:.2f}x baseline"),
+            row("Client Capacity Score", f"{self.client_capacity_score:.2f}x baseline"),
+            row("Recurring Revenue", f"{self.recurring_revenue_pct:.1f}%"),
+        ]
+        requirements = "".join(
+            f"<li>{'✅' if met else '⬜'} {esc(req)}</li>" for req, met in self.requirements()
+        )
+        status = (
+            "🎉 Ready to graduate!" if self.ready_to_graduate
+            else f"💪 {self.requirements_remaining} requirement(s) remaining."
+        )
+
+        return (
+            f'<section class="transformation-report" data-operator="{esc(self.operator_id)}">'
+            f"<h2>🎯 Transformation Report: Week {self.current_week}/{self.min_weeks}</h2>"
+            f"<p>Journey started {esc(str(self.journey_started))}, "
+            f"latest update {esc(str(self.latest_update))}</p>"
+            f"<table>{''.join(metrics)}</table>"
+            f"<h3>🎓 Graduation Readiness</h3><ul>{requirements}</ul>"
+            f"<p>{esc(status)}</p>"
+            f"<h3>🏆 Week {self.current_week}</h3>"
+            f"<p>Automated: {esc(str(self.latest_automated))}<br>"
+            f"Bottleneck: {esc(str(self.latest_bottleneck))}</p>"
+            f"</section>"
+        )
+
+
+def _report_query(operator_filter, thresholds):
+    """One pass over the metrics table producing TransformationReport rows"""
+    min_automation = float(thresholds.min_automation_index)
+    min_time_reduction = float(thresholds.min_time_reduction_pct)
+    min_recurring = float(thresholds.min_recurring_revenue_pct)
+    min_weeks = int(thresholds.min_weeks)
+
+    return f"""
+        WITH ordered AS (
+            SELECT
+                *,
+                ROW_NUMBER() OVER (PARTITION BY operator_id ORDER BY week_number) AS from_start,
+                ROW_NUMBER() OVER (PARTITION BY operator_id ORDER BY week_number DESC) AS from_end,
+                COUNT(*) OVER (PARTITION BY operator_id) AS weeks_submitted
+            FROM {TABLE_NAME}
+            {operator_filter}
+        ),
+        edges AS (
+            -- First week and the two latest weeks of each operator
+            SELECT
+                operator_id,
+                MAX(week_number) FILTER (WHERE from_end = 1) AS current_week,
+                MAX(weeks_submitted) AS weeks_submitted,
+                MAX(submission_date) FILTER (WHERE from_start = 1) AS journey_started,
+                MAX(submission_date) FILTER (WHERE from_end = 1) AS latest_update,
+                MAX(CAST(automation_index AS DOUBLE)) FILTER (WHERE from_start = 1) AS automation_index_start,
+                MAX(CAST(automation_index AS DOUBLE)) FILTER (WHERE from_end = 1) AS automation_index,
+                MAX(CAST(total_hours AS DOUBLE)) FILTER (WHERE from_start = 1) AS baseline_hours,
+                MAX(CAST(time_saved_vs_baseline AS DOUBLE)) FILTER (WHERE from_end = 1) AS hours_saved,
+                MAX(CAST(revenue_efficiency_multiple AS DOUBLE)) FILTER (WHERE from_end = 1) AS revenue_efficiency_multiple,
+                MAX(CAST(client_capacity_score AS DOUBLE)) FILTER (WHERE from_end = 1) AS client_capacity_score,
+                MAX(CAST(recurring_revenue_pct AS DOUBLE)) FILTER (WHERE from_end = 1) AS recurring_revenue_pct,
+                MAX(automated_this_week) FILTER (WHERE from_end = 1) AS latest_automated,
+                MAX(biggest_bottleneck) FILTER (WHERE from_end = 1) AS latest_bottleneck,
+                MAX(automated_this_week) FILTER (WHERE from_end = 2) AS previous_automated,
+                MAX(biggest_bottleneck) FILTER (WHERE from_end = 2) AS previous_bottleneck
+            FROM ordered
+            WHERE from_start = 1 OR from_end <= 2
+            GROUP BY operator_id
+        ),
+        kpis AS (
+            SELECT
+                *,
+                automation_index - automation_index_start AS automation_index_change,
+                CASE WHEN baseline_hours > 0
+                     THEN hours_saved / baseline_hours * 100
+                     ELSE 0 END AS time_reduction_pct,
+                CAST({min_automation} AS DOUBLE) AS min_automation_index,
+                CAST({min_time_reduction} AS DOUBLE) AS min_time_reduction_pct,
+                CAST({min_recurring} AS DOUBLE) AS min_recurring_revenue_pct,
+                CAST({min_weeks} AS INTEGER) AS min_weeks
+            FROM edges
+        ),
+        readiness AS ({_graduation_checks("kpis")})
+        SELECT
+            operator_id,
+            current_week,
+            weeks_submitted,
+            journey_started,
+            latest_update,
+            automation_index_start,
+            automation_index,
+            automation_index_change,
+            CAST({REPORT_AUTOMATION_TARGET} AS DOUBLE) - automation_index AS automation_target_gap,
+            baseline_hours,
+            hours_saved,
+            time_reduction_pct,
+            CAST({REPORT_TIME_REDUCTION_TARGET} AS DOUBLE) - time_reduction_pct AS time_reduction_gap,
+            revenue_efficiency_multiple,
+            client_capacity_score,
+            recurring_revenue_pct,
+            CAST({REPORT_RECURRING_REVENUE_TARGET} AS DOUBLE) - recurring_revenue_pct AS recurring_revenue_gap,
+            min_automation_index,
+            min_time_reduction_pct,
+            min_recurring_revenue_pct,
+            min_weeks,
+            meets_automation AS meets_automation_requirement,
+            meets_time_liberation AS meets_time_liberation_requirement,
+            meets_subscription AS meets_subscription_requirement,
+            meets_weeks AS meets_weeks_requirement,
+            requirements_remaining,
+            ready_to_graduate,
+            latest_automated,
+            latest_bottleneck,
+            previous_automated,
+            previous_bottleneck,
+            weeks_submitted >= 2 AS has_previous_week
+        FROM readiness
+        ORDER BY operator_id
+    """
+
+@_instrumented
+def build_transformation_reports(operator_ids=None, thresholds=None):
+    """
+    Build TransformationReport records for many operators in one query
+
+    Returns {operator_id: report}, covering every operator by default.
+    Graduation readiness uses `thresholds` (GraduationThresholds, default:
+    the course requirements).
+    """
+    return {report.operator_id: report for report in iter_transformation_reports(operator_ids, thresholds)}
+
+def iter_transformation_reports(operator_ids=None, thresholds=None, batch_size=ITER_BATCH_ROWS):
+    """
+    Yield TransformationReport records one operator at a time
+
+    Same reports as build_transformation_reports(), streamed from the
+    query `batch_size` rows at a time, so writing out a whole cohort's
+    reports never holds more than one batch.
+    """
+    thresholds = thresholds or DEFAULT_GRADUATION_THRESHOLDS
+
+    if operator_ids is None:
+        query, params = _report_query("", thresholds), None
     else:
-        remaining = sum(1 for _, met in requirements if not met)
-        print(f"\n💪 Keep going! {remaining} requirement(s) remaining.")
-    
-    # Recent wins
-    print("\n" + "-"*80)
-    print("🏆 RECENT PROGRESS")
-    print("-"*80)
-    
-    if df.height >= 2:
-        last_2_weeks = df.tail(2)
-        print(f"\n📝 Week {week_num-1}:")
-        print(f"   Automated: {last_2_weeks['automated_this_week'][0]}")
-        print(f"   Bottleneck: {last_2_weeks['biggest_bottleneck'][0]}")
+        operator_ids = list(operator_ids)
+        if not operator_ids:
+            return
+        placeholders = ", ".join("?" for _ in operator_ids)
+        query, params = _report_query(f"WHERE operator_id IN ({placeholders})", thresholds), operator_ids
+
+    cur = get_session()._stream_cursor()
+    try:
+        with _span("build_transformation_reports.query"):
+            result = cur.execute(query, params)
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            _count("rows_fetched", "build_transformation_reports", len(rows))
+            for row in rows:
+                yield TransformationReport(*row)
+    finally:
+        cur.close()
+
+@_instrumented
+def build_transformation_report(operator_id=DEFAULT_OPERATOR_ID, thresholds=None):
+    """Build one operator's TransformationReport (None if no weeks submitted), cached until the next write"""
+    thresholds = thresholds or DEFAULT_GRADUATION_THRESHOLDS
+    return _cached_result(
+        "report", operator_id, (thresholds,),
+        lambda: build_transformation_reports([operator_id], thresholds).get(operator_id),
+    )
+
+@_instrumented
+def generate_transformation_report(operator_id=DEFAULT_OPERATOR_ID, thresholds=None):
+    """Generate comprehensive transformation report"""
+    report = build_transformation_report(operator_id, thresholds)
     
-    print(f"\n📝 Week {week_num}:")
-    print(f"   Automated: {latest['automated_this_week'][0]}")
-    print(f"   Bottleneck: {latest['biggest_bottleneck'][0]}")
+    if report is None:
+        print("❌ No data yet. Submit your first week's metrics!")
+        return
     
-    print("\n" + "="*80 + "\n")
+    with _span("generate_transformation_report.render"):
+        text = report.render_text()
+    print(text)
 
 # ============================================================================
 # MAIN EXECUTION
@@ -0,0 +1,287 @@
+"""
+Billion Transformation Tracker - Trends & Projections
+Week-over-week changes, rolling averages and when each operator hits the targets
+
+Everything is computed in DuckDB with window functions and aggregates,
+for one operator or all of them in one query, and kept in
+billion_tracker's result cache until the next write to the metrics
+table, so dashboards can ask for trends on every render.
+
+Usage:
+    from billion_trends import get_weekly_trends, get_target_projections, print_trends
+    trends = get_weekly_trends("alice")
+    projections = get_target_projections()          # one row per operator
+    print_trends("alice")
+"""
+
+# ============================================================================
+# SETUP & IMPORTS
+# ============================================================================
+
+import polars as pl
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Metrics that get week-over-week deltas and rolling averages
+TREND_METRICS = [
+    "automation_index",
+    "time_saved_vs_baseline",
+    "revenue_efficiency_multiple",
+    "client_capacity_score",
+    "recurring_revenue_pct",
+]
+
+# Rolling average windows (weeks, including the current one)
+ROLLING_WINDOWS = (3, 4)
+
+# Course targets the projections aim for
+AUTOMATION_TARGET = 80.0
+RECURRING_REVENUE_TARGET = 50.0
+
+# Projections further out than this week count as "not on the current trend"
+MAX_PROJECTED_WEEK = 104
+
+# "robust": Theil-Sen (median of pairwise slopes), insensitive to one odd
+# week; "linear": ordinary least squares
+PROJECTION_METHODS = ("robust", "linear")
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def _cached(session, operator_id, key, compute):
+    """Return compute()'s frame, reusing it while the metrics table is unchanged"""
+    return tracker._cached_result("trends", operator_id, key, compute, session)
+
+def clear_trend_cache():
+    """Drop every cached trend frame"""
+    tracker.clear_result_cache("trends")
+
+# ============================================================================
+# WEEKLY TRENDS
+# ============================================================================
+
+def _operator_filter(operator_id):
+    """WHERE clause reading only `operator_id`'s rows (all rows for None)"""
+    if operator_id is None:
+        return ""
+    return f"WHERE operator_id = {tracker._sql_literal(operator_id)}"
+
+def _weekly_trends_query(operator_id=None):
+    columns = []
+    for metric in TREND_METRICS:
+        value = f"CAST({metric} AS DOUBLE)"
+        columns.append(f"{value} AS {metric}")
+        # Only a directly preceding week counts as week-over-week
+        columns.append(f"""
+            CASE WHEN LAG(week_number) OVER by_week = week_number - 1
+                 THEN {value} - LAG({value}) OVER by_week
+                 END AS {metric}_wow""")
+        for weeks in ROLLING_WINDOWS:
+            columns.append(f"AVG({value}) OVER last_{weeks}_weeks AS {metric}_avg_{weeks}w")
+
+    windows = [f"by_week AS (PARTITION BY operator_id ORDER BY week_number)"] + [
+        f"""last_{weeks}_weeks AS (
+            PARTITION BY operator_id ORDER BY week_number
+            RANGE BETWEEN {weeks - 1} PRECEDING AND CURRENT ROW
+        )"""
+        for weeks in ROLLING_WINDOWS
+    ]
+
+    return f"""
+        SELECT
+            operator_id,
+            week_number,
+            {", ".join(columns)}
+        FROM {tracker.TABLE_NAME}
+        {_operator_filter(operator_id)}
+        WINDOW {", ".join(windows)}
+        ORDER BY operator_id, week_number
+    """
+
+@tracker._instrumented
+def get_weekly_trends(operator_id=None, session=None):
+    """
+    Week-over-week deltas and rolling averages for every stored week
+
+    One row per operator and week with each TREND_METRICS value, its
+    change from the week before (`<metric>_wow`, null when that week is
+    missing) and its average over the last 3 and 4 weeks
+    (`<metric>_avg_3w`, `<metric>_avg_4w`; missing weeks are skipped).
+    All operators unless `operator_id` is given.
+    """
+    session = session or tracker.get_session()
+    return _cached(session, operator_id, "weekly", lambda: tracker._fetch_polars(
+        session.cursor(), _weekly_trends_query(operator_id), operation="get_weekly_trends"
+    ))
+
+# ============================================================================
+# TARGET PROJECTIONS
+# ============================================================================
+
+def _projection_query(method, automation_target, recurring_target, operator_id=None):
+    targets = {
+        "automation": ("automation_index", float(automation_target)),
+        "recurring": ("recurring_revenue_pct", float(recurring_target)),
+    }
+
+    if method == "robust":
+        # Theil-Sen: median slope over all pairs of weeks, then the median
+        # intercept for that slope
+        fit = f"""
+            slopes AS (
+                SELECT
+                    p.operator_id,
+                    {", ".join(
+                        f"median((q.{name} - p.{name}) / (q.week - p.week)) AS {name}_slope"
+                        for name in targets
+                    )}
+                FROM points p
+                JOIN points q ON q.operator_id = p.operator_id AND q.week > p.week
+                GROUP BY p.operator_id
+            ),
+            fit AS (
+                SELECT
+                    p.operator_id,
+                    {", ".join(
+                        f"ANY_VALUE(s.{name}_slope) AS {name}_slope, "
+                        f"median(p.{name} - s.{name}_slope * p.week) AS {name}_intercept"
+                        for name in targets
+                    )}
+                FROM points p
+                JOIN slopes s ON s.operator_id = p.operator_id
+                GROUP BY p.operator_id
+            )"""
+    else:
+        fit = f"""
+            fit AS (
+                SELECT
+                    operator_id,
+                    {", ".join(
+                        f"regr_slope({name}, week) AS {name}_slope, "
+                        f"regr_intercept({name}, week) AS {name}_intercept"
+                        for name in targets
+                    )}
+                FROM points
+                GROUP BY operator_id
+            )"""
+
+    projected = []
+    for name, (_, target) in targets.items():
+        weeks_needed = f"(({target} - f.{name}_intercept) / f.{name}_slope)"
+        projected.append(f"""
+            l.{name} AS current_{name},
+            f.{name}_slope,
+            s.{name}_reached_week IS NOT NULL AS {name}_target_reached,
+            CASE
+                WHEN s.{name}_reached_week IS NOT NULL THEN s.{name}_reached_week
+                WHEN f.{name}_slope > 0 AND {weeks_needed} <= {MAX_PROJECTED_WEEK}
+                    THEN CAST(greatest(ceil({weeks_needed}), l.week + 1) AS INTEGER)
+                END AS {name}_target_week""")
+
+    return f"""
+        WITH points AS (
+            SELECT
+                operator_id,
+                CAST(week_number AS DOUBLE) AS week,
+                {", ".join(f"CAST({column} AS DOUBLE) AS {name}" for name, (column, _) in targets.items())}
+            FROM {tracker.TABLE_NAME}
+            {_operator_filter(operator_id)}
+        ),
+        {fit},
+        latest AS (
+            SELECT operator_id, arg_max(points, week) AS l
+            FROM points
+            GROUP BY operator_id
+        ),
+        reached AS (
+            SELECT
+                operator_id,
+                {", ".join(
+                    f"CAST(min(week) FILTER (WHERE {name} >= {target}) AS INTEGER) AS {name}_reached_week"
+                    for name, (_, target) in targets.items()
+                )}
+            FROM points
+            GROUP BY operator_id
+        )
+        SELECT
+            latest.operator_id,
+            CAST(l.week AS INTEGER) AS latest_week,
+            {", ".join(projected)}
+        FROM latest
+        LEFT JOIN fit f ON f.operator_id = latest.operator_id
+        JOIN reached s ON s.operator_id = latest.operator_id
+        ORDER BY latest.operator_id
+    """
+
+@tracker._instrumented
+def get_target_projections(
+    operator_id=None,
+    method="robust",
+    automation_target=AUTOMATION_TARGET,
+    recurring_target=RECURRING_REVENUE_TARGET,
+    session=None
+):
+    """
+    The week each operator reaches (or is projected to reach) the targets
+
+    Fits a trend through each operator's weekly automation index and
+    recurring revenue % (`method`: "robust" Theil-Sen or "linear" least
+    squares). `<target>_target_week` is the first week the target was
+    met, else the projected week (null if the trend is flat, falling or
+    past MAX_PROJECTED_WEEK). Slopes are in percentage points per week.
+    One row per operator unless `operator_id` is given.
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Unknown projection method: {method} (use one of {', '.join(PROJECTION_METHODS)})")
+
+    session = session or tracker.get_session()
+    key = ("projections", method, float(automation_target), float(recurring_target))
+    return _cached(session, operator_id, key, lambda: tracker._fetch_polars(
+        session.cursor(),
+        _projection_query(method, automation_target, recurring_target, operator_id),
+        operation="get_target_projections",
+    ))
+
+# ============================================================================
+# DISPLAY
+# ============================================================================
+
+def print_trends(operator_id=tracker.DEFAULT_OPERATOR_ID, weeks=4):
+    """Display the last weeks' changes and the projected target weeks"""
+    trends = get_weekly_trends(operator_id).tail(weeks)
+    if trends.height == 0:
+        print("❌ No data yet. Submit your first week's metrics!")
+        return
+
+    print("\n" + "="*80)
+    print("📈 YOUR TRENDS")
+    print("="*80)
+    print(trends.select([
+        pl.col("week_number").alias("Week"),
+        pl.col("automation_index_wow").round(1).alias("Automation Δ"),
+        pl.col("automation_index_avg_3w").round(1).alias("Automation 3w"),
+        pl.col("time_saved_vs_baseline_wow").round(1).alias("Hours Saved Δ"),
+        pl.col("recurring_revenue_pct_wow").round(1).alias("Recurring Δ"),
+        pl.col("recurring_revenue_pct_avg_3w").round(1).alias("Recurring 3w"),
+    ]))
+    print("="*80 + "\n")
+
+    projection = get_target_projections(operator_id).row(0, named=True)
+    for name, label, target in (
+        ("automation", "Automation Index", AUTOMATION_TARGET),
+        ("recurring", "Recurring Revenue", RECURRING_REVENUE_TARGET),
+    ):
+        week = projection[f"{name}_target_week"]
+        if projection[f"{name}_target_reached"]:
+            print(f"✅ {label} reached {target:.0f}% in Week {week}")
+        elif week is not None:
+            print(f"🎯 {label}: {target:.0f}% projected for Week {week} "
+                  f"({projection[f'{name}_slope']:+.1f} points/week)")
+        else:
+            print(f"⚠️  {label}: not on track for {target:.0f}% at the current trend")
+    print()
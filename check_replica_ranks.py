@@ -0,0 +1,94 @@
+"""
+Billion Transformation Tracker - Replica Percentile Rank Check
+Keep a long-lived replica reader's percentile ranks current across publishes
+
+Writes a small cohort, publishes a replica and ranks an operator through
+a ReplicaReader, then writes a stronger cohort for the same week,
+republishes and ranks again. It does that once with a batch and once
+with a single submission, whose cohort statistics are only queued until
+the publish. The reader must follow each new replica: its ranks have to
+match the writer's, not the cut points it read before.
+
+Usage:
+    python check_replica_ranks.py
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+import polars as pl
+
+import billion_tracker as tracker
+from billion_replica import ReplicaReader, publish_replica
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Operators in the first publish; the second adds as many stronger ones
+OPERATORS = 10
+
+FOCUS_OPERATOR = f"op-{OPERATORS:02d}"
+
+def _week_one(first, count, automated_from):
+    """Week 1 rows of `count` operators whose automated hours rise from `automated_from`"""
+    return pl.DataFrame({
+        "operator_id": [f"op-{first + i:02d}" for i in range(count)],
+        "week_number": [1] * count,
+        "total_hours_worked": [40.0] * count,
+        "automated_hours": [float(automated_from + i) for i in range(count)],
+        "active_clients": [3] * count,
+        "revenue_ratio_to_baseline": [1.0] * count,
+        "recurring_revenue_percentage": [10.0 + i for i in range(count)],
+        "what_i_automated_this_week": ["Invoicing"] * count,
+        "biggest_bottleneck_now": ["Sales calls"] * count,
+    })
+
+# ============================================================================
+# CHECK
+# ============================================================================
+
+def check_replica_ranks():
+    """Print the ranks before and after a republish; returns True if the reader followed it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        replica_path = str(Path(tmp) / "replica.db")
+        with tracker.TrackerSession(str(Path(tmp) / "writer.db")) as writer, \
+                ReplicaReader(replica_path) as reader, \
+                contextlib.redirect_stdout(io.StringIO()):
+            writer.init_database()
+            writer.submit_weekly_metrics_batch(_week_one(1, OPERATORS, 1))
+            publish_replica(replica_path, session=writer)
+            ranks = [("first", reader.get_percentile_ranks(FOCUS_OPERATOR),
+                      writer.get_percentile_ranks(FOCUS_OPERATOR))]
+
+            writer.submit_weekly_metrics_batch(_week_one(OPERATORS + 1, OPERATORS, 20))
+            publish_replica(replica_path, session=writer)
+            ranks.append(("batch", reader.get_percentile_ranks(FOCUS_OPERATOR),
+                          writer.get_percentile_ranks(FOCUS_OPERATOR)))
+
+            single = _week_one(2 * OPERATORS + 1, 1, 39).row(0, named=True)
+            writer.submit_weekly_metrics(**single)
+            publish_replica(replica_path, session=writer)
+            ranks.append(("single submit", reader.get_percentile_ranks(FOCUS_OPERATOR),
+                          writer.get_percentile_ranks(FOCUS_OPERATOR)))
+
+    ok = True
+    for label, replica, expected in ranks:
+        print(f"📊 {FOCUS_OPERATOR} automation index rank after {label}: "
+              f"{replica['automation_index']:.1f} (writer: {expected['automation_index']:.1f})")
+        if replica != expected:
+            print(f"❌ Replica reader kept the previous cut points after the {label} publish")
+            ok = False
+    if ok:
+        print("✅ Replica reader ranks follow each publish")
+    return ok
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if check_replica_ranks() else 1)
@@ -0,0 +1,128 @@
+"""
+Billion Transformation Tracker - Startup Time Check
+Keep a submit-only process (cron jobs, CLI scripts) fast to start
+
+Runs `import billion_tracker` plus one weekly submission in a fresh Python
+process against a throwaway database and fails if it takes longer than
+the budget or loads a plotting/dataframe library it doesn't need.
+
+Usage:
+    python check_startup_time.py
+    python check_startup_time.py --budget 0.5 --runs 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Wall-clock seconds for interpreter start + import + one submission
+STARTUP_BUDGET_SECONDS = 0.6
+
+# Modules a submit-only process must never import
+HEAVY_MODULES = ["plotly", "polars", "numpy", "pandas", "pyarrow", "kaleido"]
+
+# Runs in the child process; prints its timings and loaded modules as JSON
+SUBMIT_SCRIPT = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+import billion_tracker
+imported = time.perf_counter()
+billion_tracker.DB_PATH = sys.argv[1]
+with contextlib.redirect_stdout(io.StringIO()):
+    billion_tracker.init_database()
+    billion_tracker.submit_weekly_metrics(
+        week_number=1,
+        total_hours_worked=50.0,
+        automated_hours=5.0,
+        active_clients=3,
+        revenue_ratio_to_baseline=1.0,
+        recurring_revenue_percentage=10.0,
+        what_i_automated_this_week="Startup check",
+        biggest_bottleneck_now="None",
+    )
+billion_tracker.close_session()
+done = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "submit_seconds": done - imported,
+    "modules": sorted({name.split(".")[0] for name in sys.modules}),
+}))
+"""
+
+# ============================================================================
+# CHECK
+# ============================================================================
+
+def measure_submit_startup(runs=5):
+    """
+    Time fresh `import billion_tracker` + submit processes
+
+    Returns the fastest run (least disturbed by other load on the machine)
+    as a dict with total_seconds, import_seconds, submit_seconds, modules.
+    """
+    repo_dir = Path(__file__).resolve().parent
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [str(repo_dir), os.environ.get("PYTHONPATH")])
+    ))
+
+    best = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(runs):
+            db_path = str(Path(tmp) / f"startup_{run}.db")
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-c", SUBMIT_SCRIPT, db_path],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            total = time.perf_counter() - start
+
+            timing = json.loads(result.stdout.strip().splitlines()[-1])
+            timing["total_seconds"] = total
+            if best is None or total < best["total_seconds"]:
+                best = timing
+
+    return best
+
+def check_startup_time(budget=STARTUP_BUDGET_SECONDS, runs=5):
+    """Print the startup timings; returns True if within budget"""
+    timing = measure_submit_startup(runs)
+    heavy = [name for name in HEAVY_MODULES if name in timing["modules"]]
+
+    print(f"⏱️  Import billion_tracker: {timing['import_seconds'] * 1000:.0f} ms")
+    print(f"⏱️  Init + submit one week: {timing['submit_seconds'] * 1000:.0f} ms")
+    print(f"⏱️  Whole process: {timing['total_seconds'] * 1000:.0f} ms "
+          f"(budget {budget * 1000:.0f} ms, best of {runs})")
+
+    ok = True
+    if heavy:
+        print(f"❌ Submit-only process imported: {', '.join(heavy)}")
+        ok = False
+    if timing["total_seconds"] > budget:
+        print("❌ Startup budget exceeded")
+        ok = False
+    if ok:
+        print("✅ Startup within budget")
+    return ok
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS,
+                        help="seconds allowed for import + one submission")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="fresh processes to time (the fastest counts)")
+    args = parser.parse_args()
+
+    sys.exit(0 if check_startup_time(args.budget, args.runs) else 1)
@@ -0,0 +1,133 @@
+"""
+Billion Transformation Tracker - Write Path Agreement Check
+Make sure grouped writes accept and store what single submissions do
+
+Sends the same submissions through submit_weekly_metrics(), a WriteBuffer
+and a default AsyncTracker (both group commit), each into its own
+throwaway database, and fails if any path rejects one or the stored rows
+differ. The submissions carry the types a JSON front end produces: whole
+numbers as floats (week_number=2.0, active_clients=3.0), whole-number
+hours as ints and a client count that has to be rounded. A later week
+without hours must then be rejected by every path with a ValueError.
+
+Usage:
+    python check_write_paths.py
+"""
+
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+import billion_tracker as tracker
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SUBMISSIONS = [
+    dict(operator_id="alice", week_number=1.0, total_hours_worked=50.0, automated_hours=5,
+         active_clients=3.0, revenue_ratio_to_baseline=1.0, recurring_revenue_percentage=10,
+         what_i_automated_this_week="Invoicing", biggest_bottleneck_now="Sales calls"),
+    dict(operator_id="alice", week_number=2.0, total_hours_worked=46, automated_hours=9.5,
+         active_clients=3.0, revenue_ratio_to_baseline=1,
+         recurring_revenue_percentage=15.0,
+         what_i_automated_this_week="Onboarding emails", biggest_bottleneck_now="Proposals"),
+    dict(operator_id="bob", week_number=1, total_hours_worked=40.0, automated_hours=2.0,
+         active_clients=2.5, revenue_ratio_to_baseline=1.0, recurring_revenue_percentage=0.0,
+         what_i_automated_this_week="Nothing yet", biggest_bottleneck_now="Everything"),
+    dict(operator_id="bob", week_number=2, total_hours_worked=38.0, automated_hours=6.0,
+         active_clients=4, revenue_ratio_to_baseline=1.05, recurring_revenue_percentage=5.0,
+         what_i_automated_this_week="Scheduling", biggest_bottleneck_now="Follow-ups"),
+]
+
+# Every ratio divides by the week's hours, so each path must refuse this
+# week after alice's Week 1
+NO_HOURS = dict(SUBMISSIONS[1], week_number=3, total_hours_worked=0.0, automated_hours=0.0)
+
+# ============================================================================
+# WRITE PATHS
+# ============================================================================
+
+def _single(session, submissions):
+    for submission in submissions:
+        session.submit_weekly_metrics(**submission)
+
+def _write_buffer(session, submissions):
+    with tracker.WriteBuffer(session=session) as buffer:
+        acks = [buffer.submit(**submission) for submission in submissions]
+    for ack in acks:
+        ack.result()
+
+def _async_tracker(session, submissions):
+    from billion_async import AsyncTracker
+
+    async def submit_all():
+        async with AsyncTracker(session=session) as async_tracker:
+            await asyncio.gather(*(async_tracker.submit(**submission) for submission in submissions))
+
+    asyncio.run(submit_all())
+
+WRITE_PATHS = {
+    "submit_weekly_metrics": _single,
+    "WriteBuffer": _write_buffer,
+    "AsyncTracker": _async_tracker,
+}
+
+# ============================================================================
+# CHECK
+# ============================================================================
+
+def _stored_rows(write, db_path, submissions=SUBMISSIONS):
+    """Stored rows (without the submission date) after `write`, or the error it raised"""
+    with tracker.TrackerSession(db_path) as session, contextlib.redirect_stdout(io.StringIO()):
+        session.init_database()
+        try:
+            write(session, submissions)
+        except Exception as exc:
+            return exc
+        return session.cursor().execute(f"""
+            SELECT * EXCLUDE (submission_date) FROM {tracker.TABLE_NAME}
+            ORDER BY operator_id, week_number
+        """).fetchall()
+
+def check_write_paths(write_paths=WRITE_PATHS):
+    """Print how each path fared; returns True if every path stored the same rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            name: _stored_rows(write, str(Path(tmp) / f"{i}.db"))
+            for i, (name, write) in enumerate(write_paths.items())
+        }
+        refusals = {
+            name: _stored_rows(write, str(Path(tmp) / f"no-hours-{i}.db"), SUBMISSIONS + [NO_HOURS])
+            for i, (name, write) in enumerate(write_paths.items())
+        }
+
+    reference = results["submit_weekly_metrics"]
+    ok = True
+    for name, rows in results.items():
+        if isinstance(rows, Exception):
+            print(f"❌ {name} rejected a submission: {rows!r}")
+            ok = False
+        elif rows != reference:
+            print(f"❌ {name} stored different rows than submit_weekly_metrics")
+            ok = False
+        else:
+            print(f"✅ {name}: {len(rows)} row(s) stored")
+
+    for name, refusal in refusals.items():
+        if isinstance(refusal, ValueError):
+            print(f"✅ {name} rejected a week without hours")
+        else:
+            print(f"❌ {name} did not reject a week without hours: {refusal!r}")
+            ok = False
+    return ok
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if check_write_paths() else 1)